@@ -3,13 +3,15 @@
 Entry point for running the LetsCloud MCP Server as a module.
 
 Usage:
-    python -m letscloud_mcp_server [--version] [--help]
+    python -m letscloud_mcp_server [--version] [--help] [--sidecar]
 """
 
 import argparse
 import asyncio
 import sys
+from .logging_config import configure_logging
 from .server import main
+from .sidecar import run_daemon
 
 def parse_args():
     """Parse command line arguments."""
@@ -27,13 +29,18 @@ def parse_args():
         action="store_true",
         help="Enable debug logging"
     )
+    parser.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Run the shared cache daemon for local stdio servers"
+    )
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_args()
     
-    if args.debug:
-        import logging
-        logging.basicConfig(level=logging.DEBUG)
-    
-    asyncio.run(main()) 
\ No newline at end of file
+    if args.sidecar:
+        configure_logging("DEBUG" if args.debug else None)
+        asyncio.run(run_daemon())
+    else:
+        asyncio.run(main(log_level="DEBUG" if args.debug else None))
@@ -0,0 +1,159 @@
+"""
+Admission Control
+~~~~~~~~~~~~~~~~~
+
+Early load shedding for the HTTP/WebSocket server.
+
+Tool calls are admitted only while the number of calls in flight and the
+event loop lag (how late a periodic timer fires) are under their limits.
+Rejected calls fail immediately with ``Overloaded`` (mapped to 503 with
+``Retry-After`` or a JSON-RPC busy error) instead of queuing until
+everything times out. Bulk calls are shed first, at a fraction of the
+in-flight limit. WebSocket sessions pause reading while the server is
+overloaded, so TCP flow control pushes back on the client.
+
+Settings:
+    LETSCLOUD_MAX_IN_FLIGHT: Calls admitted at once (default 256)
+    LETSCLOUD_MAX_LOOP_LAG: Event loop lag in seconds above which calls are shed (default 0.5)
+    LETSCLOUD_WS_MAX_PAUSE: Seconds a WebSocket read may be paused (default 5)
+"""
+
+import asyncio
+import contextlib
+import logging
+import math
+from typing import Iterator, Optional
+
+from .config import env_float, env_int
+from .metrics import metrics
+from .scheduler import BULK
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC server error code used for busy responses
+BUSY_ERROR_CODE = -32000
+
+
+class Overloaded(RuntimeError):
+    """The server is shedding load; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Admits or sheds calls based on in-flight work and event loop lag."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 256,
+        max_lag: float = 0.5,
+        bulk_fraction: float = 0.5,
+        interval: float = 0.1,
+        ws_max_pause: float = 5.0
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_in_flight: Calls admitted at once
+            max_lag: Loop lag (seconds) above which calls are shed
+            bulk_fraction: Share of ``max_in_flight`` bulk calls may use
+            interval: Seconds between loop lag samples
+            ws_max_pause: Longest a WebSocket read is paused while overloaded
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_lag = max_lag
+        self.bulk_fraction = bulk_fraction
+        self.interval = interval
+        self.ws_max_pause = ws_max_pause
+        self.in_flight = 0
+        self.lag = 0.0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Build a controller from LETSCLOUD_MAX_* settings."""
+        return cls(
+            max_in_flight=env_int("LETSCLOUD_MAX_IN_FLIGHT", 256),
+            max_lag=env_float("LETSCLOUD_MAX_LOOP_LAG", 0.5),
+            ws_max_pause=env_float("LETSCLOUD_WS_MAX_PAUSE", 5.0),
+        )
+
+    def start(self) -> None:
+        """Start sampling event loop lag on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._monitor())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _monitor(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            # React to spikes at once, recover gradually
+            self.lag = lag if lag > self.lag else self.lag * 0.7 + lag * 0.3
+            metrics.set_gauge("admission.loop_lag_ms", round(self.lag * 1000, 1))
+
+    @property
+    def retry_after(self) -> int:
+        """Suggested seconds before retrying, growing with the lag."""
+        return min(30, max(1, math.ceil(self.lag * 4)))
+
+    def overload_reason(self, priority: int = 0) -> Optional[str]:
+        """Why a call of this priority would be shed now, or None."""
+        limit = self.max_in_flight
+        if priority >= BULK:
+            limit = max(1, int(limit * self.bulk_fraction))
+        if self.in_flight >= limit:
+            return f"{self.in_flight} calls in flight"
+        if self.lag > self.max_lag:
+            return f"event loop lag {self.lag * 1000:.0f}ms"
+        return None
+
+    def check(self, priority: int = 0) -> None:
+        """
+        Shed a call up front, before any work is done for it.
+
+        Raises:
+            Overloaded: If a call of this priority would be shed now
+        """
+        reason = self.overload_reason(priority)
+        if reason is not None:
+            metrics.inc("admission.rejected")
+            raise Overloaded(f"Server busy ({reason}), retry later", self.retry_after)
+
+    @contextlib.contextmanager
+    def admit(self, priority: int = 0) -> Iterator[None]:
+        """
+        Count a call as in flight for the duration of the block.
+
+        Raises:
+            Overloaded: If the call is shed
+        """
+        self.check(priority)
+        self.in_flight += 1
+        metrics.set_gauge("admission.in_flight", self.in_flight)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            metrics.set_gauge("admission.in_flight", self.in_flight)
+
+    async def wait_for_capacity(self) -> None:
+        """Delay a WebSocket read while overloaded (up to ``ws_max_pause``)."""
+        if self.overload_reason() is None:
+            return
+        metrics.inc("admission.ws_paused")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ws_max_pause
+        while self.overload_reason() is not None and loop.time() < deadline:
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,89 @@
+"""
+Circuit Breaker
+~~~~~~~~~~~~~~~
+
+Stops sending requests to the LetsCloud API after repeated failures.
+
+After ``failure_threshold`` consecutive transport errors or 5xx responses
+the circuit opens and requests fail fast for ``reset_timeout`` seconds.
+Then a single trial request is let through (half-open); its outcome closes
+or re-opens the circuit.
+"""
+
+import logging
+import time
+
+import httpx
+
+from .config import env_float, env_int
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """Raised instead of calling the API while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit (0 disables it)
+            reset_timeout: Seconds to stay open before allowing a trial request
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = 0.0
+        self._state = CLOSED
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreaker":
+        """Build a breaker configured by LETSCLOUD_BREAKER_* environment variables."""
+        return cls(
+            failure_threshold=env_int("LETSCLOUD_BREAKER_THRESHOLD", 5),
+            reset_timeout=env_float("LETSCLOUD_BREAKER_RESET", 30.0),
+        )
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout elapsed."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now."""
+        state = self.state
+        if state == HALF_OPEN:
+            # Let one trial request through; others fail fast until it reports back
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            return True
+        return state == CLOSED
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        if self._state != CLOSED:
+            logger.info("Upstream circuit closed")
+        self.failures = 0
+        self._state = CLOSED
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        self.failures += 1
+        if self.failure_threshold > 0 and self.failures >= self.failure_threshold:
+            if self._state == CLOSED:
+                logger.warning("Upstream circuit opened after %d failures", self.failures)
+                metrics.inc("upstream.circuit_opened")
+            self._state = OPEN
+            self._opened_at = time.monotonic()
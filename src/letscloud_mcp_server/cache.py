@@ -0,0 +1,165 @@
+"""
+Persistent Cache
+~~~~~~~~~~~~~~~~
+
+SQLite-backed cache for slow-changing catalog data (plans, images, locations).
+
+Stdio MCP servers are respawned for every session, so an in-memory cache is
+lost between conversations. Entries stored here survive restarts and are
+shared by every server process using the same cache directory. SQLite runs
+in WAL mode so concurrent processes can read while one writes, and every
+write is a single atomic transaction.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .config import env_str
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# Columns added after the first release, with their definitions
+_ADDED_COLUMNS = {"size": "INTEGER NOT NULL DEFAULT 0"}
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached payload with its HTTP validators."""
+
+    data: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = 0.0
+    expires_at: float = 0.0
+    size: int = 0
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the entry can be served without revalidation."""
+        return time.time() < self.expires_at
+
+
+
+class PersistentCache:
+    """Key/value cache stored in a SQLite database under a cache directory."""
+
+    def __init__(self, cache_dir: str, namespace: str = "default"):
+        """
+        Initialize the persistent cache.
+
+        Args:
+            cache_dir: Directory holding the cache database
+            namespace: Prefix isolating entries (e.g. per API token)
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "letscloud-cache.sqlite3")
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+            self._migrate()
+
+    def _migrate(self) -> None:
+        """Add columns missing from databases created by older versions."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        for name, definition in _ADDED_COLUMNS.items():
+            if name not in columns:
+                logger.info("Upgrading persistent cache schema: adding %s", name)
+                self._conn.execute(f"ALTER TABLE entries ADD COLUMN {name} {definition}")
+
+    @classmethod
+    def from_env(cls, api_token: str) -> Optional["PersistentCache"]:
+        """
+        Build a cache from LETSCLOUD_CACHE_DIR, or None when it is not set.
+
+        The namespace is derived from the API token so that different
+        accounts never read each other's entries.
+        """
+        cache_dir = env_str("LETSCLOUD_CACHE_DIR")
+        if not cache_dir:
+            return None
+        namespace = hashlib.sha256(api_token.encode()).hexdigest()[:16]
+        try:
+            return cls(os.path.expanduser(cache_dir), namespace)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Persistent cache disabled: %s", e)
+            return None
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, etag, last_modified, stored_at, expires_at, size "
+                "FROM entries WHERE key = ?",
+                (self._key(key),),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(json.loads(row[0]), row[1], row[2], row[3], row[4], row[5])
+
+    def _put(self, key: str, entry: CacheEntry) -> None:
+        payload = json.dumps(entry.data, separators=(",", ":"))
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, data, etag, last_modified, stored_at, expires_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._key(key), payload, entry.etag, entry.last_modified,
+                 entry.stored_at, entry.expires_at, entry.size),
+            )
+
+    def _delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (self._key(key),))
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        """Read an entry, returning None when missing or unreadable."""
+        try:
+            return await asyncio.to_thread(self._get, key)
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning("Persistent cache read failed for %s: %s", key, e)
+            return None
+
+    async def put(self, key: str, entry: CacheEntry) -> None:
+        """Atomically store an entry."""
+        try:
+            await asyncio.to_thread(self._put, key, entry)
+        except sqlite3.Error as e:
+            logger.warning("Persistent cache write failed for %s: %s", key, e)
+
+    async def invalidate(self, key: str) -> None:
+        """Remove an entry."""
+        try:
+            await asyncio.to_thread(self._delete, key)
+        except sqlite3.Error as e:
+            logger.warning("Persistent cache delete failed for %s: %s", key, e)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
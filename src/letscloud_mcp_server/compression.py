@@ -0,0 +1,181 @@
+"""
+Response Compression
+~~~~~~~~~~~~~~~~~~~~
+
+ASGI middleware that compresses HTTP responses with brotli or gzip.
+
+Only complete, single-body responses above a size threshold are compressed;
+streamed responses (e.g. server-sent events) pass through untouched so that
+compression never delays the first byte. Brotli is used when the optional
+``brotli`` package is installed and the client accepts it.
+"""
+
+import gzip
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config import env_bool, env_int
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+try:  # Optional dependency for brotli support
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+
+def upstream_accept_encoding() -> str:
+    """Accept-Encoding value for requests to the LetsCloud API."""
+    return "br, gzip, deflate" if brotli is not None else "gzip, deflate"
+
+
+def record_upstream_response(encoding: Optional[str], wire_bytes: int, body_bytes: int) -> None:
+    """Record how much an upstream response was compressed on the wire."""
+    if not encoding or encoding == "identity":
+        metrics.inc("upstream.uncompressed_responses")
+        return
+    metrics.inc("upstream.compressed_responses")
+    metrics.inc("upstream.wire_bytes", wire_bytes)
+    metrics.inc("upstream.decoded_bytes", body_bytes)
+    decoded = metrics.get("upstream.decoded_bytes")
+    if decoded:
+        wire = metrics.get("upstream.wire_bytes")
+        metrics.set_gauge("upstream.compression_ratio", wire / decoded)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(name.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """Compress eligible HTTP responses according to Accept-Encoding."""
+
+    def __init__(
+        self,
+        app: Callable[[Scope, Receive, Send], Awaitable[None]],
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            minimum_size: Bodies smaller than this are sent uncompressed
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11)
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    @classmethod
+    def options_from_env(cls) -> Dict[str, int]:
+        """Read middleware options from the environment."""
+        return {
+            "minimum_size": env_int("LETSCLOUD_COMPRESSION_MIN_SIZE", 1024),
+            "gzip_level": env_int("LETSCLOUD_GZIP_LEVEL", 6),
+            "brotli_quality": env_int("LETSCLOUD_BROTLI_QUALITY", 4),
+        }
+
+    @staticmethod
+    def enabled_from_env() -> bool:
+        """Whether HTTP compression is enabled (LETSCLOUD_HTTP_COMPRESSION)."""
+        return env_bool("LETSCLOUD_HTTP_COMPRESSION", True)
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            assert start_message is not None
+            body = message.get("body", b"")
+            response_headers: List[Tuple[bytes, bytes]] = list(start_message.get("headers", []))
+            header_map = {k.lower(): v for k, v in response_headers}
+            content_type = header_map.get(b"content-type", b"").decode("latin-1")
+
+            eligible = (
+                not message.get("more_body", False)
+                and b"content-encoding" not in header_map
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+                and len(body) >= self.minimum_size
+            )
+            if not eligible:
+                passthrough = True
+                if len(body) < self.minimum_size and not message.get("more_body", False):
+                    metrics.inc("http.compression.skipped")
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = self._compress(body, encoding)
+            metrics.inc("http.compression.responses")
+            metrics.inc("http.compression.bytes_in", len(body))
+            metrics.inc("http.compression.bytes_out", len(compressed))
+            bytes_out = metrics.get("http.compression.bytes_out")
+            metrics.set_gauge(
+                "http.compression.ratio", bytes_out / metrics.get("http.compression.bytes_in")
+            )
+
+            response_headers = [
+                (k, v) for k, v in response_headers
+                if k.lower() not in (b"content-length", b"vary", b"etag")
+            ]
+            # A strong ETag names the identity bytes; the encoded body only matches weakly
+            etag = header_map.get(b"etag")
+            if etag is not None:
+                response_headers.append((b"etag", etag if etag.startswith(b"W/") else b"W/" + etag))
+            vary = header_map.get(b"vary")
+            response_headers.append((b"content-encoding", encoding.encode()))
+            response_headers.append((b"content-length", str(len(compressed)).encode()))
+            response_headers.append(
+                (b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding")
+            )
+            await send({**start_message, "headers": response_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
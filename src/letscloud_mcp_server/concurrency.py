@@ -0,0 +1,89 @@
+"""
+Concurrency Helpers
+~~~~~~~~~~~~~~~~~~~
+
+Bounded fan-out and rate limiting of client calls for fleet-wide tools.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Iterable, List, Optional, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def gather_limited(
+    items: Iterable[T],
+    func: Callable[[T], Awaitable[R]],
+    limit: int = 8,
+    on_done: Optional[Callable[[int, int], None]] = None,
+    rate_limiter: Optional["RateLimiter"] = None
+) -> List[Union[R, BaseException]]:
+    """
+    Run ``func`` over items with at most ``limit`` calls in flight.
+
+    Exceptions are returned in place of results so that one failing item
+    does not abort the others.
+
+    Args:
+        items: Inputs to process
+        func: Coroutine function applied to each item
+        limit: Maximum number of concurrent calls
+        on_done: Optional callback receiving (completed, total) after each item
+        rate_limiter: Optional limiter consulted before each call starts
+
+    Returns:
+        Results (or exceptions) in input order
+    """
+    items = list(items)
+    semaphore = asyncio.Semaphore(max(1, limit))
+    completed = 0
+
+    async def run(item: T) -> Union[R, BaseException]:
+        nonlocal completed
+        async with semaphore:
+            try:
+                if rate_limiter is not None:
+                    await rate_limiter.acquire()
+                return await func(item)
+            except Exception as e:
+                return e
+            finally:
+                completed += 1
+                if on_done is not None:
+                    on_done(completed, len(items))
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+class RateLimiter:
+    """Token bucket limiting how many calls start per second."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Sustained calls per second (0 or less disables limiting)
+            burst: Calls allowed back to back before throttling
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a call may start."""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
@@ -0,0 +1,48 @@
+"""
+Runtime Configuration
+~~~~~~~~~~~~~~~~~~~~~
+
+Helpers for reading tunables from environment variables.
+All settings are optional and fall back to the given defaults.
+"""
+
+import os
+from typing import Optional
+
+
+def env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a string setting, treating empty values as unset."""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip()
+
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer setting, falling back to default on bad input."""
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a float setting, falling back to default on bad input."""
+    value = env_str(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Read a boolean setting (1/true/yes/on are truthy)."""
+    value = env_str(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
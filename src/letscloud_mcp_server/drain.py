@@ -0,0 +1,133 @@
+"""
+Connection Draining
+~~~~~~~~~~~~~~~~~~~
+
+Coordinates graceful shutdown of the HTTP server.
+
+Every tool call runs inside ``Drainer.track()``. Once draining starts, new
+calls are refused with ``ServerDraining`` (mapped to 503 / a JSON-RPC
+error), ``/readyz`` reports not ready so load balancers stop routing here,
+and shutdown waits for the calls already running, up to a deadline, before
+uvicorn closes connections and the lifespan releases resources.
+
+The deadline is absolute and set when draining starts: uvicorn's connection
+wait, the lifespan's job drain and any repeated ``drain`` calls only get
+what remains, so the whole shutdown fits in LETSCLOUD_SHUTDOWN_TIMEOUT.
+
+Settings:
+    LETSCLOUD_SHUTDOWN_TIMEOUT: Seconds to wait for in-flight calls (default 30)
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Iterator, Optional
+
+import uvicorn
+
+from .config import env_float
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class ServerDraining(RuntimeError):
+    """The server is shutting down and accepts no new calls."""
+
+
+class Drainer:
+    """Tracks in-flight calls and waits for them during shutdown."""
+
+    def __init__(self, timeout: float = 30.0):
+        """
+        Initialize the drainer.
+
+        Args:
+            timeout: Seconds from the start of draining to the shutdown deadline
+        """
+        self.timeout = timeout
+        self.draining = False
+        self.deadline: Optional[float] = None
+        self.in_flight = 0
+        # Set while nothing is in flight; shared by every drain() waiter
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @classmethod
+    def from_env(cls) -> "Drainer":
+        """Build a drainer from LETSCLOUD_SHUTDOWN_TIMEOUT."""
+        return cls(timeout=env_float("LETSCLOUD_SHUTDOWN_TIMEOUT", 30.0))
+
+    @contextlib.contextmanager
+    def track(self) -> Iterator[None]:
+        """
+        Count a call as in flight for the duration of the block.
+
+        Raises:
+            ServerDraining: If draining has started
+        """
+        if self.draining:
+            metrics.inc("drain.rejected")
+            raise ServerDraining("Server is shutting down, retry on another instance")
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self._idle.set()
+
+    def remaining(self) -> float:
+        """Seconds left until the shutdown deadline (the full timeout before draining)."""
+        if self.deadline is None:
+            return self.timeout
+        return max(0.0, self.deadline - time.monotonic())
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        Refuse new calls and wait for running ones to finish.
+
+        The first call starts the shutdown deadline; later calls only wait
+        for whatever time is left. Safe to call more than once.
+
+        Args:
+            timeout: Wait at most this long, if shorter than the time left
+
+        Returns:
+            True if every call finished before the deadline
+        """
+        if not self.draining:
+            logger.info("Draining %d in-flight call(s)", self.in_flight)
+        self.draining = True
+        if self.deadline is None:
+            self.deadline = time.monotonic() + self.timeout
+        if self.in_flight == 0:
+            return True
+        started = time.monotonic()
+        wait = self.remaining() if timeout is None else min(timeout, self.remaining())
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=wait)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning("Drain deadline passed with %d call(s) still running", self.in_flight)
+            metrics.inc("drain.abandoned", self.in_flight)
+            return False
+        finally:
+            metrics.set_gauge("drain.seconds", round(time.monotonic() - started, 3))
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains tool calls before closing connections."""
+
+    def __init__(self, config: uvicorn.Config, drainer: Drainer):
+        super().__init__(config)
+        self.drainer = drainer
+
+    async def shutdown(self, sockets=None) -> None:
+        # Open WebSockets would otherwise be closed with calls still running
+        await self.drainer.drain()
+        # Waiting for connections to close only gets what is left of the deadline
+        self.config.timeout_graceful_shutdown = self.drainer.remaining()
+        await super().shutdown(sockets)
@@ -0,0 +1,228 @@
+"""
+Fleet Summary
+~~~~~~~~~~~~~
+
+Cost and capacity aggregates for the ``fleet_summary`` tool.
+
+Instances are joined with the (cached) plan catalog in-process: by the plan
+slug when the API includes one, otherwise by matching vCPU, memory and disk.
+``FleetSummary`` keeps running totals per location, plan and status and,
+on each refresh, only subtracts and re-adds the instances that changed, so
+repeated calls over a large, mostly stable fleet do constant work per change
+rather than re-aggregating everything. The plan catalog is compared by a
+content fingerprint, so a freshly decoded but identical catalog (as the
+sidecar returns on every call) keeps the incremental path. Prices are
+summed in cents to avoid float drift across updates.
+"""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import Instance, Plan
+
+logger = logging.getLogger(__name__)
+
+GROUP_BY = ("location", "plan", "status")
+TABLE_COLUMNS = ["servers", "vcpus", "memory_gb", "disk_gb", "monthly_cost"]
+UNKNOWN = "unknown"
+
+
+@dataclass(frozen=True)
+class _Row:
+    """What one instance contributes to the totals."""
+
+    location: str
+    plan: str
+    status: str
+    cpus: int
+    memory_mb: int
+    disk_gb: int
+    monthly_cents: Optional[int]
+
+
+@dataclass
+class Totals:
+    """Running sums for one group."""
+
+    servers: int = 0
+    cpus: int = 0
+    memory_mb: int = 0
+    disk_gb: int = 0
+    monthly_cents: int = 0
+    unpriced: int = 0
+
+    def add(self, row: _Row, sign: int = 1) -> None:
+        """Add (sign=1) or remove (sign=-1) an instance."""
+        self.servers += sign
+        self.cpus += sign * row.cpus
+        self.memory_mb += sign * row.memory_mb
+        self.disk_gb += sign * row.disk_gb
+        if row.monthly_cents is None:
+            self.unpriced += sign
+        else:
+            self.monthly_cents += sign * row.monthly_cents
+
+    def cells(self) -> List[Any]:
+        """Values in TABLE_COLUMNS order."""
+        return [
+            self.servers,
+            self.cpus,
+            round(self.memory_mb / 1024, 1),
+            self.disk_gb,
+            self.monthly_cents / 100,
+        ]
+
+
+def _cents(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int((Decimal(str(value)) * 100).to_integral_value())
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def catalog_fingerprint(plans: List[Dict[str, Any]]) -> str:
+    """Hash of the plan catalog's content, independent of key order."""
+    encoded = json.dumps(plans, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _plan_slug(instance: Instance) -> Optional[str]:
+    """Plan slug from an instance, if the API exposes it."""
+    extra = instance.extra or {}
+    direct = extra.get("plan_slug")
+    if direct:
+        return str(direct)
+    nested = extra.get("plan")
+    if isinstance(nested, dict) and nested.get("slug"):
+        return str(nested["slug"])
+    return None
+
+
+class FleetSummary:
+    """Grouped totals kept up to date incrementally across refreshes."""
+
+    def __init__(self):
+        self.currency: Optional[str] = None
+        self._plans_source: Optional[List[Dict[str, Any]]] = None
+        self._plans_fingerprint: Optional[str] = None
+        self._by_slug: Dict[str, Plan] = {}
+        self._by_shape: Dict[Tuple[Any, ...], Plan] = {}
+        self._rows: Dict[Any, _Row] = {}
+        self._groups: Dict[str, Dict[str, Totals]] = {name: {} for name in GROUP_BY}
+        self.total = Totals()
+
+    def _index_plans(self, plans: List[Dict[str, Any]]) -> bool:
+        """Rebuild the plan index if the catalog changed; returns whether it did."""
+        if plans is self._plans_source:
+            return False
+        fingerprint = catalog_fingerprint(plans)
+        self._plans_source = plans
+        if fingerprint == self._plans_fingerprint:
+            return False
+        self._plans_fingerprint = fingerprint
+        self._by_slug.clear()
+        self._by_shape.clear()
+        self.currency = None
+        for plan in Plan.from_list(plans):
+            if plan.slug:
+                self._by_slug[plan.slug] = plan
+            self._by_shape.setdefault((plan.core, plan.memory, plan.disk), plan)
+            self._by_shape.setdefault((plan.core, plan.memory), plan)
+            self.currency = self.currency or plan.currency
+        return True
+
+    def _match(self, instance: Instance) -> Optional[Plan]:
+        slug = _plan_slug(instance)
+        if slug and slug in self._by_slug:
+            return self._by_slug[slug]
+        return (
+            self._by_shape.get((instance.cpus, instance.memory, instance.disk))
+            or self._by_shape.get((instance.cpus, instance.memory))
+        )
+
+    def _row(self, instance: Instance) -> _Row:
+        plan = self._match(instance)
+        location = instance.location
+        return _Row(
+            location=(location and (location.slug or location.city)) or UNKNOWN,
+            plan=(plan and plan.slug) or _plan_slug(instance) or UNKNOWN,
+            status=instance.status,
+            cpus=instance.cpus or 0,
+            memory_mb=instance.memory or 0,
+            disk_gb=instance.disk or 0,
+            monthly_cents=_cents(plan.monthly_value) if plan else None,
+        )
+
+    def _apply(self, row: _Row, sign: int) -> None:
+        self.total.add(row, sign)
+        for name in GROUP_BY:
+            value = getattr(row, name)
+            groups = self._groups[name]
+            totals = groups.get(value)
+            if totals is None:
+                totals = groups[value] = Totals()
+            totals.add(row, sign)
+            if totals.servers == 0:
+                del groups[value]
+
+    def update(self, instances: List[Instance], plans: List[Dict[str, Any]]) -> int:
+        """
+        Bring the totals in line with the current inventory.
+
+        Args:
+            instances: Current instances
+            plans: Plan catalog (different content triggers a full recompute)
+
+        Returns:
+            Number of instances added, removed or changed since the last update
+        """
+        if self._index_plans(plans):
+            self._rows.clear()
+            self._groups = {name: {} for name in GROUP_BY}
+            self.total = Totals()
+
+        current: Dict[Any, _Row] = {}
+        changed = 0
+        for index, instance in enumerate(instances):
+            key = instance.key if instance.key is not None else f"#{index}"
+            row = self._row(instance)
+            current[key] = row
+            previous = self._rows.get(key)
+            if previous == row:
+                continue
+            if previous is not None:
+                self._apply(previous, -1)
+            self._apply(row, 1)
+            changed += 1
+        for key, row in self._rows.items():
+            if key not in current:
+                self._apply(row, -1)
+                changed += 1
+        self._rows = current
+        return changed
+
+    def table(self, group_by: str = "location") -> Dict[str, Any]:
+        """
+        Grouped totals rendered column-wise.
+
+        Raises:
+            ValueError: If group_by is not a known dimension
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of: {', '.join(GROUP_BY)}")
+        groups = self._groups[group_by]
+        ordered = sorted(groups.items(), key=lambda item: (-item[1].monthly_cents, item[0]))
+        return {
+            "group_by": group_by,
+            "currency": self.currency,
+            "columns": [group_by, *TABLE_COLUMNS],
+            "rows": [[value, *totals.cells()] for value, totals in ordered],
+            "total": self.total.cells(),
+            "unpriced": self.total.unpriced,
+        }
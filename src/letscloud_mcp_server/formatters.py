@@ -0,0 +1,202 @@
+"""
+Output Formatters
+~~~~~~~~~~~~~~~~~
+
+Human-readable rendering of tool results.
+
+Templates are registered per tool and format. Locale strings (pt/en, see
+LANGUAGE_SUPPORT.md) are substituted into a template once, producing a
+plain format string whose bound ``str.format`` is cached; rendering an
+instance is then a single format call plus dict lookups, and the output is
+built with ``str.join`` so cost stays linear in the number of rows.
+
+Formats:
+    detailed: Emoji-rich list (the historical list_servers output)
+    table: Markdown table
+    compact: One line per item
+    json: Compact JSON rows
+
+Settings:
+    LETSCLOUD_LOCALE: Default locale, ``pt`` (default) or ``en``
+"""
+
+import functools
+import json
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .config import env_str
+from .models import Instance
+
+FORMATS = ("detailed", "table", "compact", "json")
+LOCALES: Dict[str, Dict[str, Any]] = {
+    "pt": {
+        "servers_title": "SUAS {count} INSTÂNCIAS LETSCLOUD",
+        "unnamed": "Sem nome",
+        "location": "Local",
+        "resources": "Recursos",
+        "label": "Nome",
+        "status": {
+            "running": "✅ Ativa",
+            "building": "🔄 Construindo",
+            "stopped": "⏹️  Parada",
+            "suspended": "⏸️  Suspensa",
+        },
+        "status_plain": {
+            "running": "ativa",
+            "building": "construindo",
+            "stopped": "parada",
+            "suspended": "suspensa",
+        },
+    },
+    "en": {
+        "servers_title": "YOUR {count} LETSCLOUD INSTANCES",
+        "unnamed": "Unnamed",
+        "location": "Location",
+        "resources": "Resources",
+        "label": "Name",
+        "status": {
+            "running": "✅ Running",
+            "building": "🔄 Building",
+            "stopped": "⏹️  Stopped",
+            "suspended": "⏸️  Suspended",
+        },
+        "status_plain": {
+            "running": "running",
+            "building": "building",
+            "stopped": "stopped",
+            "suspended": "suspended",
+        },
+    },
+}
+
+# Per tool and format: header and row templates. <<key>> is a locale string
+# resolved at compile time; {field} is filled per render.
+TEMPLATES: Dict[str, Dict[str, Dict[str, str]]] = {
+    "list_servers": {
+        "detailed": {
+            "header": "🖥️  **<<servers_title>>:**\n\n",
+            "row": (
+                "**{index}. {label}**\n"
+                "   🆔 ID: {identifier}\n"
+                "   📍 <<location>>: {city}, {country}\n"
+                "   🌐 IP: {ip}\n"
+                "   ⚡ <<resources>>: {cpus} vCPU, {memory} RAM\n"
+                "   📊 Status: {status}\n\n"
+            ),
+        },
+        "table": {
+            "header": (
+                "**<<servers_title>>**\n\n"
+                "| # | <<label>> | ID | <<location>> | IP | <<resources>> | Status |\n"
+                "|---|---|---|---|---|---|---|\n"
+            ),
+            "row": (
+                "| {index} | {label} | {identifier} | {city}, {country} | {ip} "
+                "| {cpus} vCPU, {memory} | {status} |\n"
+            ),
+        },
+        "compact": {
+            "header": "<<servers_title>>\n",
+            "row": (
+                "{index}. {label} [{identifier}] {city}/{country} {ip} "
+                "{cpus}c/{memory} {plain}\n"
+            ),
+        },
+    },
+}
+
+_LOCALE_KEY = re.compile(r"<<(\w+)>>")
+
+
+def default_locale() -> str:
+    """Locale used when a call does not ask for one (LETSCLOUD_LOCALE, default pt)."""
+    locale = (env_str("LETSCLOUD_LOCALE", "pt") or "pt").lower()
+    return locale if locale in LOCALES else "pt"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(tool_name: str, fmt: str, locale: str) -> Dict[str, Callable[..., str]]:
+    """
+    Resolve locale strings into a tool's templates once.
+
+    Returns:
+        Bound ``format`` methods keyed by template part
+    """
+    strings = LOCALES[locale]
+
+    def resolve(match: "re.Match[str]") -> str:
+        return str(strings[match.group(1)])
+
+    return {
+        part: _LOCALE_KEY.sub(resolve, text).format
+        for part, text in TEMPLATES[tool_name][fmt].items()
+    }
+
+
+@functools.lru_cache(maxsize=256)
+def memory_text(megabytes: int) -> str:
+    """Human memory size (few distinct values, so memoized)."""
+    return f"{megabytes // 1024}GB" if megabytes >= 1024 else f"{megabytes}MB"
+
+
+def _server_fields(instance: Instance, strings: Dict[str, Any]) -> Dict[str, Any]:
+    location = instance.location
+    status = instance.status
+    return {
+        "label": instance.label or strings["unnamed"],
+        "identifier": instance.identifier or "N/A",
+        "city": (location and location.city) or "N/A",
+        "country": (location and location.country) or "N/A",
+        "ip": instance.primary_ip or "N/A",
+        "cpus": instance.cpus or 0,
+        "memory": memory_text(instance.memory or 0),
+        "status": strings["status"][status],
+        "plain": strings["status_plain"][status],
+    }
+
+
+def render_servers(
+    instances: List[Instance],
+    fmt: str = "detailed",
+    locale: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Render instances piece by piece (header first, then one piece per row).
+
+    Raises:
+        ValueError: If the format or locale is unknown
+    """
+    locale = locale or default_locale()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+    if locale not in LOCALES:
+        raise ValueError(f"Unknown locale '{locale}'. Use one of: {', '.join(LOCALES)}")
+    strings = LOCALES[locale]
+
+    if fmt == "json":
+        rows = []
+        for instance in instances:
+            fields = _server_fields(instance, strings)
+            rows.append({
+                "identifier": instance.identifier,
+                "label": instance.label,
+                "city": fields["city"],
+                "country": fields["country"],
+                "ip": instance.primary_ip,
+                "cpus": instance.cpus,
+                "memory_mb": instance.memory,
+                "status": instance.status,
+            })
+        yield json.dumps(rows, separators=(",", ":"), ensure_ascii=False)
+        return
+
+    template = compile_template("list_servers", fmt, locale)
+    yield template["header"](count=len(instances))
+    escape = fmt == "table"
+    row = template["row"]
+    for index, instance in enumerate(instances, 1):
+        fields = _server_fields(instance, strings)
+        if escape:
+            fields["label"] = str(fields["label"]).replace("|", "\\|")
+        yield row(index=index, **fields)
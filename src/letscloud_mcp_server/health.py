@@ -0,0 +1,137 @@
+"""
+Health Probes
+~~~~~~~~~~~~~
+
+Cached readiness state for ``/readyz``.
+
+A background task fetches the lightweight ``profile`` endpoint every
+``interval`` seconds, straight from the API so a warm sidecar cache cannot
+mask an upstream outage. Probe
+endpoints only read the cached outcome, combined with the client's circuit
+breaker and connection pool saturation, so orchestrator probes cost
+nothing upstream no matter how often they run.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .breaker import OPEN
+from .config import env_float
+from .letscloud_client import LetsCloudClient
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Periodically probes the LetsCloud API and caches the result."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], LetsCloudClient],
+        interval: float = 15.0,
+        timeout: float = 5.0,
+        max_saturation: float = 0.9
+    ):
+        """
+        Initialize the monitor.
+
+        Args:
+            client_factory: Returns the shared LetsCloud client
+            interval: Seconds between upstream probes
+            timeout: Seconds before a probe counts as failed
+            max_saturation: Pool saturation above which the server is not ready
+        """
+        self.client_factory = client_factory
+        self.interval = interval
+        self.timeout = timeout
+        self.max_saturation = max_saturation
+        self.last_ok: Optional[bool] = None
+        self.last_error: Optional[str] = None
+        self.last_checked: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    def from_env(cls, client_factory: Callable[[], LetsCloudClient]) -> "HealthMonitor":
+        """Build a monitor configured by LETSCLOUD_HEALTH_* environment variables."""
+        return cls(
+            client_factory,
+            interval=env_float("LETSCLOUD_HEALTH_INTERVAL", 15.0),
+            timeout=env_float("LETSCLOUD_HEALTH_TIMEOUT", 5.0),
+            max_saturation=env_float("LETSCLOUD_HEALTH_MAX_SATURATION", 0.9),
+        )
+
+    async def probe(self) -> bool:
+        """Fetch the account profile once and record the outcome."""
+        started = time.monotonic()
+        try:
+            client = self.client_factory()
+            # Bypass the sidecar and validator caches: only a real round trip counts
+            await asyncio.wait_for(client._send("GET", "profile"), self.timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.last_ok, self.last_error = False, str(e) or type(e).__name__
+            logger.warning("Upstream health probe failed: %s", self.last_error)
+        else:
+            self.last_ok, self.last_error = True, None
+        self.last_latency = time.monotonic() - started
+        self.last_checked = time.time()
+        return self.last_ok
+
+    async def _loop(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start background probing on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop background probing."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Combine the cached probe with breaker and pool state (no I/O).
+
+        Returns:
+            Tuple of (ready, details)
+        """
+        details: Dict[str, Any] = {"upstream": "unknown"}
+        reasons = []
+        if self.last_checked is None:
+            reasons.append("upstream not probed yet")
+        else:
+            age = time.time() - self.last_checked
+            details["upstream"] = "ok" if self.last_ok else "failing"
+            details["checked_seconds_ago"] = round(age, 1)
+            details["latency_ms"] = round((self.last_latency or 0) * 1000, 1)
+            if not self.last_ok:
+                reasons.append(f"upstream probe failed: {self.last_error}")
+            elif age > 3 * self.interval + self.timeout:
+                reasons.append("upstream probe is stale")
+
+        try:
+            client = self.client_factory()
+        except Exception as e:
+            if str(e) != self.last_error:
+                reasons.append(str(e))
+        else:
+            details["circuit"] = client.breaker.state
+            details["pool_saturation"] = round(client.pool_saturation, 3)
+            if details["circuit"] == OPEN:
+                reasons.append("upstream circuit is open")
+            if client.pool_saturation >= self.max_saturation:
+                reasons.append("connection pool saturated")
+
+        if reasons:
+            details["reasons"] = reasons
+        return not reasons, details
@@ -0,0 +1,138 @@
+"""
+Request Hedging
+~~~~~~~~~~~~~~~
+
+Duplicate slow idempotent GETs to cut tail latency.
+
+When a GET has not answered by a high percentile of its endpoint class's
+recent latency (from the adaptive timeout histograms), a second identical
+request is sent and whichever answers first wins; the other is cancelled.
+Hedges draw on a budget that earns ``budget`` of a token per request, so
+they add at most that fraction of extra upstream load.
+
+Settings:
+    LETSCLOUD_HEDGE: Enable hedging (default false)
+    LETSCLOUD_HEDGE_PERCENTILE: Latency quantile that triggers a hedge (default 0.95)
+    LETSCLOUD_HEDGE_BUDGET: Maximum extra requests as a fraction of GETs (default 0.05)
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from .config import env_bool, env_float
+from .metrics import metrics
+from .timeouts import TimeoutPolicy, endpoint_class
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    """Decides when to hedge and enforces the hedge budget."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        percentile: float = 0.95,
+        budget: float = 0.05,
+        min_delay: float = 0.05,
+        min_samples: int = 20,
+        max_tokens: float = 10.0
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            enabled: Whether GETs are hedged at all
+            percentile: Latency quantile after which a hedge is sent
+            budget: Hedges allowed per request, on average
+            min_delay: Never hedge sooner than this many seconds
+            min_samples: Latency observations needed before hedging
+            max_tokens: Largest burst of hedges the budget can save up
+        """
+        self.enabled = enabled
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.max_tokens = max_tokens
+        self._tokens = 0.0
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        """Build a policy from LETSCLOUD_HEDGE* settings."""
+        return cls(
+            enabled=env_bool("LETSCLOUD_HEDGE", False),
+            percentile=env_float("LETSCLOUD_HEDGE_PERCENTILE", 0.95),
+            budget=env_float("LETSCLOUD_HEDGE_BUDGET", 0.05),
+        )
+
+    def delay_for(self, method: str, endpoint: str, timeouts: TimeoutPolicy) -> Optional[float]:
+        """
+        Seconds to wait before hedging this request, or None to never hedge.
+
+        Every eligible request also earns budget here.
+        """
+        if not self.enabled or method.upper() != "GET":
+            return None
+        self._tokens = min(self.max_tokens, self._tokens + self.budget)
+        histogram = timeouts.histogram(endpoint_class(method, endpoint))
+        if histogram.count < self.min_samples:
+            return None
+        threshold = histogram.quantile(self.percentile)
+        return max(self.min_delay, threshold or 0.0)
+
+    def try_spend(self) -> bool:
+        """Take one hedge from the budget."""
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        metrics.inc("upstream.hedges.throttled")
+        return False
+
+
+def _settle(task: "asyncio.Future[Any]") -> None:
+    """Cancel a losing attempt, or mark its failure as seen."""
+    if not task.done():
+        task.cancel()
+    elif not task.cancelled():
+        task.exception()
+
+
+async def hedged(
+    attempt: Callable[[], Awaitable[Any]],
+    delay: Optional[float],
+    policy: HedgePolicy
+) -> Any:
+    """
+    Run ``attempt``, starting a second one if the first is slower than delay.
+
+    The first successful result wins. If both attempts fail, the first
+    attempt's error is raised.
+    """
+    if delay is None:
+        return await attempt()
+    first = asyncio.ensure_future(attempt())
+    try:
+        done, _ = await asyncio.wait({first}, timeout=delay)
+    except asyncio.CancelledError:
+        first.cancel()
+        raise
+    if done or not policy.try_spend():
+        return await first
+
+    metrics.inc("upstream.hedges.sent")
+    second = asyncio.ensure_future(attempt())
+    pending = {first, second}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        metrics.inc("upstream.hedges.won")
+                    return task.result()
+        return first.result()
+    finally:
+        _settle(first)
+        _settle(second)
@@ -0,0 +1,134 @@
+"""
+HTTP Response Caching
+~~~~~~~~~~~~~~~~~~~~~
+
+ETag validators and a short-lived response cache for the HTTP API.
+
+``GET /tools`` is static for the life of the process, so its body and
+strong ETag are computed once. Read-only catalog tools called through
+``POST /tools/{tool_name}`` can additionally be served from an in-memory
+cache keyed by tenant and arguments; it is opt-in because results may be
+up to one TTL stale.
+
+Settings:
+    LETSCLOUD_HTTP_CACHE: Enable the tool response cache (default false)
+    LETSCLOUD_HTTP_CACHE_TTL: Seconds a cached tool response is served (default 30)
+    LETSCLOUD_HTTP_CACHE_SIZE: Maximum cached responses (default 1024)
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .config import env_bool, env_float, env_int
+from .metrics import metrics
+
+# Read-only tools whose results are safe to share within a tenant
+CACHEABLE_TOOLS = frozenset({"list_plans", "list_images", "list_locations", "get_account_info"})
+
+
+def strong_etag(body: bytes) -> str:
+    """Strong validator derived from the exact response bytes."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate If-None-Match against an ETag.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    ``W/`` tag produced by a compressing proxy still revalidates.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A serialized response body with its validator."""
+
+    body: bytes
+    etag: str
+    expires_at: float
+
+    @property
+    def max_age(self) -> int:
+        """Seconds of freshness left, for Cache-Control."""
+        return max(0, int(self.expires_at - time.monotonic()))
+
+
+class ResponseCache:
+    """LRU cache of serialized tool responses with a fixed TTL."""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 1024, enabled: bool = True):
+        """
+        Initialize the response cache.
+
+        Args:
+            ttl: Seconds an entry is served before the tool runs again
+            max_entries: Entries kept before the least recently used is dropped
+            enabled: Whether lookups and stores do anything
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple[str, str, str], CachedResponse]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Build a cache from LETSCLOUD_HTTP_CACHE* settings (disabled by default)."""
+        return cls(
+            ttl=env_float("LETSCLOUD_HTTP_CACHE_TTL", 30.0),
+            max_entries=max(1, env_int("LETSCLOUD_HTTP_CACHE_SIZE", 1024)),
+            enabled=env_bool("LETSCLOUD_HTTP_CACHE", False),
+        )
+
+    def cacheable(self, tool_name: str) -> bool:
+        """Whether calls to this tool may be cached."""
+        return self.enabled and self.ttl > 0 and tool_name in CACHEABLE_TOOLS
+
+    @staticmethod
+    def key(tenant: str, tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Cache key; arguments are canonicalized so key order does not matter."""
+        canonical = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+        return tenant, tool_name, canonical
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[CachedResponse]:
+        """Return a fresh entry, or None."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            metrics.inc("http_cache.misses")
+            return None
+        self._entries.move_to_end(key)
+        metrics.inc("http_cache.hits")
+        return entry
+
+    def put(self, key: Tuple[str, str, str], body: bytes) -> CachedResponse:
+        """Store a serialized body and return the entry."""
+        entry = CachedResponse(body, strong_etag(body), time.monotonic() + self.ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        metrics.set_gauge("http_cache.entries", len(self._entries))
+        return entry
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        metrics.set_gauge("http_cache.entries", 0)
@@ -7,29 +7,55 @@ Provides secure remote access via web endpoints.
 """
 
 import asyncio
+import contextlib
 import json
 import os
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 from fastapi import FastAPI, WebSocket, HTTPException, Request, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import uvicorn
 
-from .server import server, mcp_server
+from .admission import BUSY_ERROR_CODE, AdmissionController, Overloaded
+from .compression import CompressionMiddleware
+from .config import env_bool
+from .drain import Drainer, DrainingServer, ServerDraining
+from .health import HealthMonitor
+from .http_cache import ResponseCache, etag_matches, strong_etag
+from .jobs import JOB_TOOLS, JobQueueFull
+from .logging_config import (
+    RequestIdMiddleware,
+    configure_logging,
+    flush_logging,
+    request_context,
+)
+from .metrics import metrics
+from .progress import ProgressReporter, sse_event
+from .scheduler import BULK, FairScheduler, classify, current_tenant, tenant_id
+from .server import mcp_server, job_queue, call_tool as call_mcp_tool
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background probing; on shutdown drain calls and release resources."""
+    health_monitor.start()
+    admission.start()
+    try:
+        yield
+    finally:
+        await shutdown()
+
 # FastAPI app
 app = FastAPI(
     title="LetsCloud MCP Server",
     description="Remote access to LetsCloud infrastructure management via MCP",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -41,19 +67,168 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Response compression (gzip, or brotli when installed)
+if CompressionMiddleware.enabled_from_env():
+    app.add_middleware(CompressionMiddleware, **CompressionMiddleware.options_from_env())
+
+# Request ids for log correlation (outermost, so every log line has one)
+app.add_middleware(RequestIdMiddleware)
+
 # Security
 security = HTTPBearer()
 
-def get_api_key(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Validate API key for HTTP endpoints."""
+# Background upstream probe backing /readyz
+health_monitor = HealthMonitor.from_env(mcp_server.get_letscloud_client)
+
+# In-flight call tracking for graceful shutdown
+drainer = Drainer.from_env()
+
+async def shutdown() -> None:
+    """
+    Drain in-flight calls and jobs within what is left of the shutdown
+    deadline, then stop background work, close the upstream connection pool
+    and flush logs.
+    """
+    await drainer.drain()
+    if not await job_queue.drain(drainer.remaining()):
+        logger.warning("Cancelling background jobs still running at the shutdown deadline")
+    await job_queue.close()
+    await health_monitor.stop()
+    await admission.stop()
+    if mcp_server.letscloud_client is not None:
+        await mcp_server.letscloud_client.close()
+    logger.info("Shutdown complete", extra={"metrics": metrics.snapshot()})
+    flush_logging()
+
+def _draining_error(e: ServerDraining) -> HTTPException:
+    """503 telling the client to retry elsewhere and drop this connection."""
+    return HTTPException(
+        status_code=503, detail=str(e), headers={"Retry-After": "1", "Connection": "close"}
+    )
+
+# Load shedding on in-flight calls and event loop lag
+admission = AdmissionController.from_env()
+
+def _overloaded_error(e: Overloaded) -> HTTPException:
+    """503 asking the client to back off."""
+    return HTTPException(
+        status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)}
+    )
+
+# Per-tenant and per-connection quotas in front of tool calls
+scheduler = FairScheduler.from_env()
+
+def _client_address(connection: Any) -> Optional[str]:
+    """Host of the peer, used to name anonymous WebSocket tenants."""
+    return connection.client.host if connection.client else None
+
+def _http_connection(http_request: Request) -> str:
+    """
+    Connection id of an HTTP request: the peer's host and port.
+    
+    Behind a proxy every request shares the proxy's host, so the host alone
+    would turn the per-connection quota into a global one; the port tells
+    the proxy's upstream connections apart.
+    """
+    client = http_request.client
+    if client is None:
+        return f"http:{id(http_request)}"
+    return f"http:{client.host}:{client.port}"
+
+async def _scheduled_call(
+    tenant: str,
+    connection: Optional[str],
+    tool_name: str,
+    arguments: Dict[str, Any]
+) -> Any:
+    """
+    Call a tool once the scheduler grants a slot.
+    
+    Raises:
+        ServerDraining: If the server is shutting down
+        Overloaded: If the call is shed
+    """
+    priority = classify(tool_name)
+    with drainer.track(), admission.admit(priority):
+        token = current_tenant.set(tenant)
+        try:
+            return await scheduler.run(
+                tenant, connection, priority, lambda: call_mcp_tool(tool_name, arguments)
+            )
+        finally:
+            current_tenant.reset(token)
+
+async def _gated_job(job: Any, call: Any) -> Any:
+    """
+    Run a background job as bulk work of the tenant that submitted it.
+    
+    Jobs wait out a short overload instead of failing outright, then count
+    towards the in-flight limit and the tenant's scheduler quota.
+    """
+    await admission.wait_for_capacity()
+    tenant = job.tenant or "jobs"
+    with admission.admit(BULK):
+        return await scheduler.run(tenant, f"jobs:{tenant}", BULK, call)
+
+job_queue.gate = _gated_job
+
+# Opt-in short-TTL cache for read-only catalog tools
+response_cache = ResponseCache.from_env()
+
+# GET /tools cache lifetime; the ETag lets clients revalidate cheaply afterwards
+TOOLS_CACHE_CONTROL = "private, max-age=300"
+
+def _validated_response(
+    http_request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str
+) -> Response:
+    """Send a JSON body with its validator, or 304 when the client already has it."""
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Authorization"}
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        metrics.inc("http_cache.not_modified")
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+def check_api_key(key: Optional[str]) -> str:
+    """
+    Validate an API key against MCP_API_KEY.
+    
+    Raises:
+        HTTPException: 500 if no key is configured, 401 if the key is wrong
+    """
     expected_key = os.getenv("MCP_API_KEY")
     if not expected_key:
         raise HTTPException(status_code=500, detail="MCP_API_KEY not configured")
     
-    if credentials.credentials != expected_key:
+    if key != expected_key:
         raise HTTPException(status_code=401, detail="Invalid API key")
     
-    return credentials.credentials
+    return key
+
+def get_api_key(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Validate API key for HTTP endpoints."""
+    return check_api_key(credentials.credentials)
+
+def _websocket_tenant(websocket: WebSocket) -> str:
+    """
+    Tenant of a WebSocket session.
+    
+    A Bearer key is validated like on HTTP and hashed the same way, so one
+    key is one tenant on every transport; sessions without one are grouped
+    by client address.
+    
+    Raises:
+        HTTPException: If an Authorization header is sent but is not valid
+    """
+    header = websocket.headers.get("authorization")
+    if header is None:
+        return tenant_id(_client_address(websocket))
+    scheme, _, key = header.partition(" ")
+    if scheme.lower() != "bearer":
+        raise HTTPException(status_code=401, detail="Invalid authentication scheme")
+    return tenant_id(check_api_key(key.strip()))
 
 @app.get("/")
 async def root():
@@ -65,6 +240,8 @@ async def root():
         "endpoints": {
             "websocket": "/mcp",
             "tools": "/tools",
+            "stream": "/tools/{tool_name}/stream",
+            "jobs": "/jobs",
             "docs": "/docs"
         }
     }
@@ -72,31 +249,54 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Detailed health check."""
-    try:
-        # Test LetsCloud client connection
-        client = mcp_server.get_letscloud_client()
-        # Simple API test (without making actual call)
-        return {
-            "status": "healthy",
-            "mcp_server": "running",
-            "letscloud_client": "configured",
-            "tools_available": len(mcp_server._tools)
-        }
-    except Exception as e:
+    ready, details = health_monitor.readiness()
+    if not ready:
         return JSONResponse(
             status_code=503,
             content={
-                "status": "unhealthy", 
-                "error": str(e)
+                "status": "unhealthy",
+                "error": "; ".join(details["reasons"]),
+                **details
             }
         )
+    return {
+        "status": "healthy",
+        "mcp_server": "running",
+        "letscloud_client": "configured",
+        "tools_available": len(mcp_server._tools),
+        **details
+    }
 
-@app.get("/tools")
-async def list_tools(api_key: str = Depends(get_api_key)):
-    """List available MCP tools."""
-    try:
+@app.get("/livez")
+async def liveness_check():
+    """Liveness probe: the process and event loop are responsive."""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe from cached upstream, circuit and pool state (no upstream call)."""
+    ready, details = health_monitor.readiness()
+    if drainer.draining:
+        ready = False
+        details = {**details, "reasons": [*details.get("reasons", []), "draining"]}
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not ready", **details}
+    )
+
+@app.get("/metrics")
+async def get_metrics(api_key: str = Depends(get_api_key)):
+    """Expose in-process counters and gauges."""
+    return {**metrics.snapshot(), "scheduler": scheduler.snapshot()}
+
+_tools_document: Optional[Tuple[bytes, str]] = None
+
+def _get_tools_document() -> Tuple[bytes, str]:
+    """Serialized tool list and its ETag, built once (tools are fixed at import)."""
+    global _tools_document
+    if _tools_document is None:
         tools = mcp_server._tools
-        return {
+        body = JSONResponse({
             "tools": [
                 {
                     "name": tool.name,
@@ -106,45 +306,180 @@ async def list_tools(api_key: str = Depends(get_api_key)):
                 for tool in tools
             ],
             "total": len(tools)
-        }
+        }).body
+        _tools_document = (body, strong_etag(body))
+    return _tools_document
+
+@app.get("/tools")
+async def list_tools(http_request: Request, api_key: str = Depends(get_api_key)):
+    """List available MCP tools."""
+    try:
+        body, etag = _get_tools_document()
+        return _validated_response(http_request, body, etag, TOOLS_CACHE_CONTROL)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _serialize_result(result: Any) -> Dict[str, Any]:
+    """Convert a CallToolResult into a JSON-friendly dict."""
+    return {
+        "content": [
+            {
+                "type": content.type,
+                "text": content.text
+            }
+            for content in result.content
+        ],
+        "isError": getattr(result, 'isError', False)
+    }
+
 @app.post("/tools/{tool_name}")
 async def call_tool(
     tool_name: str,
     request: Dict[str, Any],
+    http_request: Request,
     api_key: str = Depends(get_api_key)
 ):
-    """Call a specific MCP tool via HTTP."""
+    """
+    Call a specific MCP tool via HTTP.
+    
+    When the response cache is enabled, read-only catalog tools are served
+    from it per tenant and arguments, with an ETag for revalidation. Send
+    ``Cache-Control: no-cache`` to force a fresh call.
+    """
+    arguments = request.get("arguments", {})
+    tenant = tenant_id(api_key)
     try:
-        result = await server.call_tool(tool_name, request.get("arguments", {}))
-        
-        return {
-            "tool": tool_name,
-            "result": {
-                "content": [
-                    {
-                        "type": content.type,
-                        "text": content.text
-                    }
-                    for content in result.content
-                ],
-                "isError": getattr(result, 'isError', False)
+        if not response_cache.cacheable(tool_name):
+            result = await _scheduled_call(
+                tenant, _http_connection(http_request), tool_name, arguments
+            )
+            return {
+                "tool": tool_name,
+                "result": _serialize_result(result)
             }
-        }
+        
+        key = response_cache.key(tenant, tool_name, arguments)
+        entry = None
+        if "no-cache" not in http_request.headers.get("cache-control", ""):
+            entry = response_cache.get(key)
+        if entry is None:
+            result = await _scheduled_call(
+                tenant, _http_connection(http_request), tool_name, arguments
+            )
+            body = JSONResponse({"tool": tool_name, "result": _serialize_result(result)}).body
+            if getattr(result, "isError", False):
+                return Response(body, media_type="application/json",
+                                headers={"Cache-Control": "no-store"})
+            entry = response_cache.put(key, body)
+        return _validated_response(
+            http_request, entry.body, entry.etag, f"private, max-age={entry.max_age}"
+        )
+    except ServerDraining as e:
+        raise _draining_error(e)
+    except Overloaded as e:
+        raise _overloaded_error(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/tools/{tool_name}/stream")
+async def stream_tool(
+    tool_name: str,
+    request: Dict[str, Any],
+    http_request: Request,
+    api_key: str = Depends(get_api_key)
+):
+    """
+    Call a tool and stream progress as server-sent events.
+    
+    Progress notifications and partial result chunks are sent as they are
+    produced; the last event carries the full result (or the error).
+    """
+    try:
+        admission.check(classify(tool_name))
+    except Overloaded as e:
+        raise _overloaded_error(e)
+    reporter = ProgressReporter(request.get("progressToken", tool_name))
+    arguments = request.get("arguments", {})
+    tenant, connection = tenant_id(api_key), _http_connection(http_request)
+    
+    async def events():
+        call = lambda: _scheduled_call(tenant, connection, tool_name, arguments)
+        async for event in reporter.run(call):
+            if "result" in event:
+                event = {"jsonrpc": "2.0", "result": _serialize_result(event["result"])}
+            elif "error" in event:
+                event = {"jsonrpc": "2.0", "error": event["error"]}
+            yield sse_event(event)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Dict[str, Any], api_key: str = Depends(get_api_key)):
+    """Queue a tool call and return its job id without waiting for it."""
+    tool_name = request.get("tool_name")
+    if tool_name in JOB_TOOLS or tool_name not in {tool.name for tool in mcp_server._tools}:
+        raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
+    if drainer.draining:
+        raise _draining_error(ServerDraining("Server is shutting down"))
+    try:
+        admission.check(BULK)
+        job = await job_queue.submit(
+            tool_name, request.get("arguments", {}), tenant=tenant_id(api_key)
+        )
+    except Overloaded as e:
+        raise _overloaded_error(e)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return job.describe()
+
+@app.get("/jobs")
+async def list_jobs(status: Optional[str] = None, api_key: str = Depends(get_api_key)):
+    """List background jobs, newest first."""
+    jobs = job_queue.list(status)
+    return {"jobs": [job.describe() for job in jobs], "total": len(jobs)}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, api_key: str = Depends(get_api_key)):
+    """Get a job's status, progress and result."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.describe(include_result=True)
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str, api_key: str = Depends(get_api_key)):
+    """Cancel a queued or running job."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.describe()
+
 @app.websocket("/mcp")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for MCP communication."""
+    if drainer.draining:
+        # 1012: service restart, the client should reconnect elsewhere
+        await websocket.close(code=1012)
+        return
+    try:
+        tenant = _websocket_tenant(websocket)
+    except HTTPException as e:
+        logger.warning("Rejected WebSocket connection: %s", e.detail)
+        # 1008: policy violation
+        await websocket.close(code=1008)
+        return
     await websocket.accept()
     logger.info("WebSocket connection established")
+    connection = f"ws:{id(websocket)}"
     
     try:
         while True:
-            # Receive message from client
+            # Receive message from client (paused while overloaded: backpressure)
+            await admission.wait_for_capacity()
             data = await websocket.receive_text()
             message = json.loads(data)
             
@@ -187,22 +522,44 @@ async def websocket_endpoint(websocket: WebSocket):
                 tool_name = params.get("name")
                 arguments = params.get("arguments", {})
                 
+                progress_token = (params.get("_meta") or {}).get("progressToken")
                 try:
-                    result = await server.call_tool(tool_name, arguments)
+                    admission.check(classify(tool_name))
+                    call = lambda: _scheduled_call(tenant, connection, tool_name, arguments)
+                    # One request id per call on this long-lived connection
+                    with request_context():
+                        if progress_token is None:
+                            result = await call()
+                        else:
+                            result = error = None
+                            reporter = ProgressReporter(progress_token)
+                            async for event in reporter.run(call):
+                                if "result" in event:
+                                    result = event["result"]
+                                elif "error" in event:
+                                    error = event["error"]
+                                else:
+                                    await websocket.send_text(json.dumps(event))
+                            if error is not None:
+                                # Already shaped, busy errors included
+                                await websocket.send_text(json.dumps(
+                                    {"id": message.get("id"), "error": error}))
+                                continue
                     response = {
                         "id": message.get("id"),
-                        "result": {
-                            "content": [
-                                {
-                                    "type": content.type,
-                                    "text": content.text
-                                }
-                                for content in result.content
-                            ],
-                            "isError": getattr(result, 'isError', False)
-                        }
+                        "result": _serialize_result(result)
                     }
                     await websocket.send_text(json.dumps(response))
+                except Overloaded as e:
+                    busy_response = {
+                        "id": message.get("id"),
+                        "error": {
+                            "code": BUSY_ERROR_CODE,
+                            "message": str(e),
+                            "data": {"retryAfter": e.retry_after}
+                        }
+                    }
+                    await websocket.send_text(json.dumps(busy_response))
                 except Exception as e:
                     error_response = {
                         "id": message.get("id"),
@@ -214,7 +571,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     await websocket.send_text(json.dumps(error_response))
             
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
     finally:
         logger.info("WebSocket connection closed")
 
@@ -224,14 +581,18 @@ def create_app() -> FastAPI:
 
 async def run_server(host: str = "0.0.0.0", port: int = 8000):
     """Run the HTTP server."""
+    configure_logging()
     config = uvicorn.Config(
         app=app,
         host=host,
         port=port,
+        log_config=None,
         log_level="info",
-        access_log=True
+        access_log=True,
+        ws_per_message_deflate=env_bool("LETSCLOUD_WS_COMPRESSION", True),
+        timeout_graceful_shutdown=int(drainer.timeout)
     )
-    server_instance = uvicorn.Server(config)
+    server_instance = DrainingServer(config, drainer)
     await server_instance.serve()
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+"""
+Idempotency
+~~~~~~~~~~~
+
+Deduplication of mutating tool calls.
+
+Agents retry turns and WebSocket clients reconnect, which can repeat a
+``create_*`` call and create duplicate (billed) resources. Calls are keyed
+either by an explicit ``idempotency_key`` argument or, failing that, by a
+hash of the tool name and arguments that is remembered for a short window.
+A repeated call joins the in-flight call or gets the original result back
+instead of reaching the API again. Keys are scoped to the calling tenant, so
+tenants of the HTTP server never see each other's results.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .config import env_float, env_int
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Tools whose repeated execution would create duplicate resources
+MUTATING_TOOLS = {
+    "create_server", "create_servers", "create_snapshot", "create_ssh_key", "reconcile_fleet",
+}
+
+# Deduplicated only with an explicit key: repeating them with the same
+# arguments is how callers re-plan against fresh inventory or retry failures
+EXPLICIT_KEY_TOOLS = {"reconcile_fleet"}
+
+IDEMPOTENCY_KEY_PROPERTY = "idempotency_key"
+
+
+@dataclass
+class _Entry:
+    """A remembered call: in flight while ``future`` is pending."""
+
+    future: "asyncio.Future[Any]"
+    expires_at: float
+
+
+class IdempotencyStore:
+    """Bounded store of in-flight and completed mutating calls."""
+
+    def __init__(self, max_entries: int = 1024, key_ttl: float = 3600.0, window: float = 60.0):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum number of remembered calls
+            key_ttl: Seconds a result is kept for an explicit idempotency key
+            window: Seconds a result is kept for a derived (argument hash) key;
+                0 disables derived keys
+        """
+        self.max_entries = max_entries
+        self.key_ttl = key_ttl
+        self.window = window
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyStore":
+        """Build a store from LETSCLOUD_IDEMPOTENCY_* settings."""
+        return cls(
+            max_entries=env_int("LETSCLOUD_IDEMPOTENCY_MAX_ENTRIES", 1024),
+            key_ttl=env_float("LETSCLOUD_IDEMPOTENCY_TTL", 3600.0),
+            window=env_float("LETSCLOUD_IDEMPOTENCY_WINDOW", 60.0),
+        )
+
+    @staticmethod
+    def derive_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Hash a tool call into a stable key."""
+        canonical = json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{tool_name}:{canonical}".encode()).hexdigest()
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, e in self._entries.items() if e.future.done() and e.expires_at <= now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def run(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        call: Callable[[], Awaitable[Any]],
+        idempotency_key: Optional[str] = None,
+        is_failure: Callable[[Any], bool] = lambda result: False,
+        tenant: Optional[str] = None
+    ) -> Any:
+        """
+        Execute a call at most once per key.
+
+        Args:
+            tool_name: Name of the tool being called
+            arguments: Tool arguments (without the idempotency key)
+            call: Coroutine factory performing the real call
+            idempotency_key: Explicit client-supplied key, if any
+            is_failure: Predicate for results that must not be remembered
+            tenant: Tenant the key is scoped to (None for the local stdio user)
+
+        Returns:
+            The result of the original call for this key
+        """
+        scope = f"{tenant or 'local'}:{tool_name}"
+        if idempotency_key:
+            key, ttl = f"{scope}:key:{idempotency_key}", self.key_ttl
+        elif self.window > 0 and tool_name not in EXPLICIT_KEY_TOOLS:
+            key, ttl = f"{scope}:args:{self.derive_key(tool_name, arguments)}", self.window
+        else:
+            return await call()
+
+        now = time.monotonic()
+        self._prune(now)
+        entry = self._entries.get(key)
+        if entry is not None and (not entry.future.done() or entry.expires_at > now):
+            in_flight = not entry.future.done()
+            metrics.inc("idempotency.inflight_joins" if in_flight else "idempotency.hits")
+            logger.info("Deduplicated %s call (%s)", tool_name, key.split(":", 3)[2])
+            return await asyncio.shield(entry.future)
+
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        entry = self._entries[key] = _Entry(future, now + ttl)
+        try:
+            result = await call()
+        except BaseException as e:
+            # Failed calls are forgotten so that a retry can succeed
+            self._entries.pop(key, None)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # Mark retrieved when nobody joined
+            raise
+        if is_failure(result):
+            self._entries.pop(key, None)
+        else:
+            entry.expires_at = time.monotonic() + ttl
+        future.set_result(result)
+        return result
@@ -0,0 +1,310 @@
+"""
+Background Jobs
+~~~~~~~~~~~~~~~
+
+Asynchronous execution of tool calls on a bounded worker pool.
+
+``submit_job`` returns a job id immediately; the call runs on one of a fixed
+number of workers so bursts queue up instead of holding connections open,
+and a client disconnect no longer throws the work away. Status, progress and
+results are polled with ``get_job``/``list_jobs`` and finished jobs are kept
+for a configurable time. A ``gate`` (set by the HTTP server) wraps each job's
+call so background work still passes its scheduler and load shedding.
+"""
+
+import asyncio
+import itertools
+import logging
+import secrets
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config import env_float, env_int
+from .metrics import metrics
+from .progress import ProgressReporter
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Job tools themselves are never run as jobs
+JOB_TOOLS = {"submit_job", "get_job", "list_jobs", "cancel_job"}
+
+Runner = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+Gate = Callable[["Job", Callable[[], Awaitable[Any]]], Awaitable[Any]]
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the queue cannot accept more jobs."""
+
+
+@dataclass
+class Job:
+    """State of one submitted tool call."""
+
+    id: str
+    tool_name: str
+    arguments: Dict[str, Any]
+    tenant: Optional[str] = None
+    status: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Optional[Dict[str, Any]] = None
+    result: Any = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    task: Optional["asyncio.Task[Any]"] = field(default=None, repr=False)
+
+    def describe(self, include_result: bool = False) -> Dict[str, Any]:
+        """JSON-friendly view of the job."""
+        view: Dict[str, Any] = {
+            "job_id": self.id,
+            "tool": self.tool_name,
+            "status": self.status,
+            "created_at": round(self.created_at, 3),
+        }
+        for name in ("started_at", "finished_at"):
+            value = getattr(self, name)
+            if value is not None:
+                view[name] = round(value, 3)
+        if self.cancel_requested and self.status == RUNNING:
+            view["cancel_requested"] = True
+        if self.progress:
+            view["progress"] = self.progress
+        if self.error:
+            view["error"] = self.error
+        if include_result and self.result is not None:
+            view["result"] = [
+                getattr(content, "text", None) for content in getattr(self.result, "content", [])
+            ]
+        return view
+
+
+class _JobProgress(ProgressReporter):
+    """Keeps only the latest progress notification on the job."""
+
+    def __init__(self, job: Job):
+        super().__init__(job.id)
+        self.job = job
+
+    def progress(self, progress: float, total: Optional[float] = None,
+                 message: Optional[str] = None) -> None:
+        update: Dict[str, Any] = {"progress": progress}
+        if total is not None:
+            update["total"] = total
+        if message:
+            update["message"] = message
+        self.job.progress = update
+
+    def chunk(self, text: str) -> None:
+        # Partial results are superseded by the stored final result
+        pass
+
+
+class JobQueue:
+    """Bounded queue of tool calls served by a fixed pool of workers."""
+
+    def __init__(self, runner: Runner, workers: int = 4, max_queued: int = 100,
+                 result_ttl: float = 3600.0):
+        """
+        Initialize the queue.
+
+        Args:
+            runner: Coroutine function executing ``(tool_name, arguments)``
+            workers: Number of concurrent workers
+            max_queued: Jobs allowed to wait before submissions are refused
+            result_ttl: Seconds finished jobs are retained
+        """
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, Job] = {}
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._worker_tasks: List["asyncio.Task[None]"] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sequence = itertools.count(1)
+        self.closing = False
+        # Wraps each job's call, e.g. to admit it through a scheduler
+        self.gate: Optional[Gate] = None
+
+    @classmethod
+    def from_env(cls, runner: Runner) -> "JobQueue":
+        """Build a queue configured by LETSCLOUD_JOB_* environment variables."""
+        return cls(
+            runner,
+            workers=env_int("LETSCLOUD_JOB_WORKERS", 4),
+            max_queued=env_int("LETSCLOUD_JOB_QUEUE_SIZE", 100),
+            result_ttl=env_float("LETSCLOUD_JOB_TTL", 3600.0),
+        )
+
+    def _ensure_workers(self) -> "asyncio.Queue[Job]":
+        """Start workers on the running loop (lazily, and again after a loop change)."""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker_tasks = [
+                loop.create_task(self._work()) for _ in range(self.workers)
+            ]
+        return self._queue
+
+    def _prune(self) -> None:
+        """Forget finished jobs older than the retention period."""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in FINISHED and (job.finished_at or 0) < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _update_gauges(self) -> None:
+        queue = self._queue
+        metrics.set_gauge("jobs.queued", queue.qsize() if queue is not None else 0)
+        metrics.set_gauge(
+            "jobs.running", sum(1 for job in self._jobs.values() if job.status == RUNNING)
+        )
+
+    async def submit(self, tool_name: str, arguments: Dict[str, Any],
+                     tenant: Optional[str] = None) -> Job:
+        """
+        Queue a tool call.
+
+        Args:
+            tool_name: Tool to run
+            arguments: Tool arguments
+            tenant: Tenant the job is scheduled and accounted as
+
+        Raises:
+            JobQueueFull: If ``max_queued`` jobs are already waiting, or the
+                queue is shutting down
+        """
+        if self.closing:
+            metrics.inc("jobs.rejected")
+            raise JobQueueFull("Job queue is shutting down")
+        queue = self._ensure_workers()
+        self._prune()
+        if queue.qsize() >= self.max_queued:
+            metrics.inc("jobs.rejected")
+            raise JobQueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+        job = Job(
+            id=f"job-{next(self._sequence)}-{secrets.token_hex(4)}",
+            tool_name=tool_name,
+            arguments=dict(arguments),
+            tenant=tenant,
+        )
+        self._jobs[job.id] = job
+        queue.put_nowait(job)
+        metrics.inc("jobs.submitted")
+        self._update_gauges()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def list(self, status: Optional[str] = None) -> List[Job]:
+        """Jobs newest first, optionally filtered by status."""
+        self._prune()
+        jobs = [job for job in self._jobs.values() if status is None or job.status == status]
+        return sorted(jobs, key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a queued or running job.
+
+        Finished jobs are returned unchanged.
+        """
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        if job.status == QUEUED:
+            # The worker skips it when dequeued
+            self._finish(job, CANCELLED)
+        elif job.task is not None:
+            job.cancel_requested = True
+            job.task.cancel()
+        return job
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        metrics.inc(f"jobs.{status}")
+        self._update_gauges()
+
+    async def _work(self) -> None:
+        """Worker loop: run queued jobs one at a time."""
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                if job.status == QUEUED:
+                    await self._execute(job)
+            finally:
+                queue.task_done()
+
+    async def _execute(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._update_gauges()
+        call = lambda: self.runner(job.tool_name, job.arguments)
+        with _JobProgress(job).activate():
+            job.task = asyncio.ensure_future(call() if self.gate is None else self.gate(job, call))
+        try:
+            job.result = await job.task
+        except asyncio.CancelledError:
+            if not job.cancel_requested:
+                # The worker itself is being stopped
+                self._finish(job, CANCELLED, "Worker stopped")
+                raise
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            logger.warning("Job %s (%s) failed: %s", job.id, job.tool_name, e)
+            self._finish(job, FAILED, str(e))
+        else:
+            if getattr(job.result, "isError", False):
+                texts = [getattr(c, "text", "") for c in getattr(job.result, "content", [])]
+                self._finish(job, FAILED, "; ".join(texts) or "Tool returned an error")
+            else:
+                self._finish(job, SUCCEEDED)
+        finally:
+            job.task = None
+
+    async def drain(self, timeout: float) -> bool:
+        """
+        Refuse new jobs and wait for queued and running ones to finish.
+
+        Returns:
+            True if the queue emptied before the timeout
+        """
+        self.closing = True
+        queue = self._queue
+        if queue is None or self._loop is not asyncio.get_running_loop():
+            return True
+        try:
+            await asyncio.wait_for(queue.join(), timeout=max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def close(self) -> None:
+        """Stop the workers; queued and running jobs are cancelled."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        for job in self._jobs.values():
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED, "Worker stopped")
+        self._worker_tasks = []
+        self._queue = None
@@ -5,42 +5,151 @@ LetsCloud API Client
 Async client for LetsCloud API integration with MCP server.
 """
 
-import asyncio
+import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
 import httpx
 import logging
 
+from .breaker import CircuitBreaker, CircuitOpenError
+from .cache import CacheEntry, PersistentCache
+from .compression import record_upstream_response, upstream_accept_encoding
+from .config import env_int
+from .hedging import HedgePolicy, hedged
+from .metrics import metrics
+from .models import Instance
+from .replay import transport_from_env
+from .sidecar import SidecarClient, SidecarUnavailable
+from .timeouts import TimeoutPolicy
+
 logger = logging.getLogger(__name__)
 
 class LetsCloudClient:
     """Async LetsCloud API client."""
     
-    def __init__(self, api_token: str, base_url: str = "https://core.letscloud.io/api"):
+    def __init__(
+        self,
+        api_token: str,
+        base_url: str = "https://core.letscloud.io/api",
+        cache: Optional[PersistentCache] = None,
+        catalog_ttl: float = 900.0,
+        max_validators: int = 256,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        sidecar: Optional[SidecarClient] = None
+    ):
         """
         Initialize the LetsCloud client.
         
         Args:
             api_token: LetsCloud API token
             base_url: Base URL for the LetsCloud API
+            cache: Optional persistent cache for catalog data
+            catalog_ttl: Seconds catalog data is served without revalidation
+            max_validators: Number of GET responses kept for conditional requests
+            transport: Custom httpx transport (default: recording/replay per
+                LETSCLOUD_HTTP_RECORD/LETSCLOUD_HTTP_REPLAY, else direct)
+            sidecar: Optional shared cache daemon used for GETs when running
         """
         self.api_token = api_token
         self.base_url = base_url
         self.headers = {
             "api-token": api_token,
             "Content-Type": "application/json",
+            "Accept-Encoding": upstream_accept_encoding(),
             "User-Agent": "LetsCloud-MCP-Server/1.0.0"
         }
         self._client: Optional[httpx.AsyncClient] = None
+        self.cache = cache
+        self.catalog_ttl = catalog_ttl
+        self._catalog: Dict[str, CacheEntry] = {}
+        self.max_validators = max_validators
+        self._validators: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._snapshots: Dict[str, CacheEntry] = {}
+        self.breaker = CircuitBreaker.from_env()
+        self.timeouts = TimeoutPolicy.from_env()
+        self.hedging = HedgePolicy.from_env()
+        self.max_connections = env_int("LETSCLOUD_HTTP_MAX_CONNECTIONS", 100)
+        self.in_flight = 0
+        self.transport = transport
+        self.sidecar = sidecar
 
     async def _get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client."""
         if self._client is None:
+            limits = httpx.Limits(max_connections=self.max_connections)
             self._client = httpx.AsyncClient(
                 timeout=30.0,
-                headers=self.headers
+                headers=self.headers,
+                limits=limits,
+                transport=self.transport or transport_from_env(limits)
             )
         return self._client
 
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request and return the raw response.
+        
+        A 304 Not Modified is returned as-is so callers can reuse cached data.
+        Transport errors and 5xx responses feed the circuit breaker; while it
+        is open requests fail fast with ``CircuitOpenError``. The timeout
+        comes from the adaptive per-endpoint policy unless one is passed, and
+        slow GETs may be hedged with a duplicate request.
+        
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        client = await self._get_client()
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        
+        if not self.breaker.allow():
+            metrics.inc("upstream.circuit_rejected")
+            raise CircuitOpenError(f"LetsCloud API unavailable, not sending {method} {url}")
+        
+        timeout = kwargs.pop("timeout", None) or self.timeouts.timeout_for(method, endpoint)
+        self.in_flight += 1
+        started = time.monotonic()
+        try:
+            response = await hedged(
+                lambda: client.request(method, url, timeout=timeout, **kwargs),
+                self.hedging.delay_for(method, endpoint, self.timeouts),
+                self.hedging
+            )
+            self.timeouts.observe(method, endpoint, time.monotonic() - started)
+            elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+            logger.info(
+                "%s %s -> %d", method, url, response.status_code,
+                extra={"sampled": True, "duration_ms": elapsed_ms}
+            )
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            if response.status_code != 304:
+                response.raise_for_status()
+                record_upstream_response(
+                    response.headers.get("Content-Encoding"),
+                    response.num_bytes_downloaded,
+                    len(response.content),
+                )
+            return response
+        except httpx.HTTPError as e:
+            if isinstance(e, httpx.TimeoutException):
+                self.timeouts.observe(method, endpoint, time.monotonic() - started, timed_out=True)
+            if isinstance(e, httpx.TransportError):
+                self.breaker.record_failure()
+            logger.error("HTTP error in %s %s: %s", method, url, e)
+            raise
+        except Exception as e:
+            logger.error("Unexpected error in %s %s: %s", method, url, e)
+            raise
+        finally:
+            self.in_flight -= 1
+
     async def _make_request(
         self, 
         method: str, 
@@ -61,24 +170,121 @@ class LetsCloudClient:
         Raises:
             httpx.HTTPError: If the request fails
         """
-        client = await self._get_client()
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        if method.upper() == "GET":
+            if self.sidecar is not None and self.sidecar.available:
+                try:
+                    return await self.sidecar.get(
+                        self.api_token,
+                        endpoint,
+                        f"{self.base_url}/{endpoint.lstrip('/')}",
+                        kwargs.get("params")
+                    )
+                except SidecarUnavailable as e:
+                    logger.warning("Sidecar cache unavailable, calling the API directly: %s", e)
+            return await self._conditional_get(endpoint, **kwargs)
+        response = await self._send(method, endpoint, **kwargs)
+        if self.sidecar is not None and self.sidecar.available:
+            # Other processes must not keep serving what this call just changed
+            await self.sidecar.invalidate(self.api_token, endpoint.lstrip("/").split("/")[0])
+        if response.content:
+            return response.json()
+        return {}
+
+    async def _conditional_get(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """
+        Perform a GET using stored ETag/Last-Modified validators.
         
-        logger.info(f"Making {method} request to {url}")
+        On 304 Not Modified the previously parsed object is returned without
+        decoding any JSON. Callers must treat the returned object as read-only
+        because it is shared with the validator store.
+        """
+        params = kwargs.get("params")
+        key = f"{endpoint}?{sorted(params.items())}" if params else endpoint
+        cached = self._validators.get(key)
         
-        try:
-            response = await client.request(method, url, **kwargs)
-            response.raise_for_status()
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        
+        response = await self._send("GET", endpoint, headers=headers, **kwargs)
+        if response.status_code == 304 and cached is not None:
+            self._validators.move_to_end(key)
+            metrics.inc("upstream.not_modified")
+            metrics.inc("upstream.bytes_saved", cached.size)
+            return cached.data
+        
+        data = response.json() if response.content else {}
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators[key] = CacheEntry(
+                data=data,
+                etag=etag,
+                last_modified=last_modified,
+                size=len(response.content),
+            )
+            self._validators.move_to_end(key)
+            while len(self._validators) > self.max_validators:
+                self._validators.popitem(last=False)
+        else:
+            self._validators.pop(key, None)
+        return data
+
+    async def _get_catalog(self, endpoint: str) -> List[Dict[str, Any]]:
+        """
+        Fetch slow-changing catalog data through the cache.
+        
+        Fresh entries are served from memory or the persistent cache with no
+        network round trip. Stale entries are revalidated with
+        If-None-Match/If-Modified-Since so unchanged data is not re-downloaded.
+        
+        Args:
+            endpoint: Catalog endpoint (plans, images, locations)
             
-            if response.content:
-                return response.json()
-            return {}
-        except httpx.HTTPError as e:
-            logger.error(f"HTTP error in {method} {url}: {str(e)}")
-            raise
-        except Exception as e:
-            logger.error(f"Unexpected error in {method} {url}: {str(e)}")
-            raise
+        Returns:
+            List of catalog objects
+        """
+        entry = self._catalog.get(endpoint)
+        if entry is None and self.cache is not None:
+            entry = await self.cache.get(endpoint)
+        if entry is not None and entry.fresh:
+            self._catalog[endpoint] = entry
+            return entry.data
+        
+        if entry is not None and endpoint not in self._validators:
+            # Seed validators from the persistent cache so a restarted
+            # process can still revalidate instead of re-downloading
+            self._validators[endpoint] = CacheEntry(
+                data={"data": entry.data},
+                etag=entry.etag,
+                last_modified=entry.last_modified,
+                size=entry.size,
+            )
+        
+        payload = await self._make_request("GET", endpoint)
+        validator = self._validators.get(endpoint)
+        now = time.time()
+        entry = CacheEntry(
+            data=payload.get("data", []),
+            etag=validator.etag if validator else None,
+            last_modified=validator.last_modified if validator else None,
+            stored_at=now,
+            expires_at=now + self.catalog_ttl,
+            size=validator.size if validator else 0,
+        )
+        
+        self._catalog[endpoint] = entry
+        if self.cache is not None:
+            await self.cache.put(endpoint, entry)
+        return entry.data
+
+    @property
+    def pool_saturation(self) -> float:
+        """Fraction of the connection pool in use by in-flight requests."""
+        return self.in_flight / max(1, self.max_connections)
 
     async def close(self):
         """Close the HTTP client."""
@@ -97,6 +303,15 @@ class LetsCloudClient:
         response = await self._make_request("GET", "instances")
         return response.get("data", [])
 
+    async def list_instances(self) -> List[Instance]:
+        """
+        List all servers as typed models.
+        
+        Returns:
+            List of Instance models
+        """
+        return Instance.from_list(await self.list_servers())
+
     async def get_server(self, server_id: int) -> Dict[str, Any]:
         """
         Get server details by ID.
@@ -138,6 +353,7 @@ class LetsCloudClient:
             server_id: Server ID to delete
         """
         await self._make_request("DELETE", f"instances/{server_id}")
+        self.invalidate_snapshots(server_id)
 
     async def reboot_server(self, server_id: int) -> Dict[str, Any]:
         """
@@ -227,18 +443,29 @@ class LetsCloudClient:
         await self._make_request("DELETE", f"ssh-keys/{key_id}")
 
     # Snapshot Management Methods
-    async def list_snapshots(self, server_id: int) -> List[Dict[str, Any]]:
+    async def list_snapshots(self, server_id: int, max_age: float = 0.0) -> List[Dict[str, Any]]:
         """
         List all snapshots for a server.
         
         Args:
             server_id: Server ID
+            max_age: Serve a cached list if it is younger than this many
+                seconds (0 always fetches)
             
         Returns:
             List of snapshot objects
         """
+        cached = self._snapshots.get(str(server_id))
+        if max_age > 0 and cached is not None and time.time() - cached.stored_at < max_age:
+            return cached.data
         response = await self._make_request("GET", f"instances/{server_id}/snapshots")
-        return response.get("data", [])
+        snapshots = response.get("data", [])
+        self._snapshots[str(server_id)] = CacheEntry(data=snapshots, stored_at=time.time())
+        return snapshots
+
+    def invalidate_snapshots(self, server_id: Any) -> None:
+        """Forget the cached snapshot list of a server."""
+        self._snapshots.pop(str(server_id), None)
 
     async def get_snapshot(self, server_id: int, snapshot_id: int) -> Dict[str, Any]:
         """
@@ -268,6 +495,7 @@ class LetsCloudClient:
             Created snapshot object
         """
         response = await self._make_request("POST", f"instances/{server_id}/snapshots", json=data)
+        self.invalidate_snapshots(server_id)
         return response.get("data", {})
 
     async def delete_snapshot(self, server_id: int, snapshot_id: int) -> None:
@@ -279,6 +507,7 @@ class LetsCloudClient:
             snapshot_id: Snapshot ID to delete
         """
         await self._make_request("DELETE", f"instances/{server_id}/snapshots/{snapshot_id}")
+        self.invalidate_snapshots(server_id)
 
     async def restore_snapshot(self, server_id: int, snapshot_id: int) -> Dict[str, Any]:
         """
@@ -302,8 +531,7 @@ class LetsCloudClient:
         Returns:
             List of plan objects
         """
-        response = await self._make_request("GET", "plans")
-        return response.get("data", [])
+        return await self._get_catalog("plans")
 
     async def list_images(self) -> List[Dict[str, Any]]:
         """
@@ -312,8 +540,7 @@ class LetsCloudClient:
         Returns:
             List of image objects
         """
-        response = await self._make_request("GET", "images")
-        return response.get("data", [])
+        return await self._get_catalog("images")
 
     async def list_locations(self) -> List[Dict[str, Any]]:
         """
@@ -322,8 +549,7 @@ class LetsCloudClient:
         Returns:
             List of location objects
         """
-        response = await self._make_request("GET", "locations")
-        return response.get("data", [])
+        return await self._get_catalog("locations")
 
     async def get_account_info(self) -> Dict[str, Any]:
         """
@@ -336,11 +562,7 @@ class LetsCloudClient:
         return response.get("data", {})
 
     def __del__(self):
-        """Cleanup on deletion."""
-        if hasattr(self, '_client') and self._client:
-            # Try to close the client if it exists
-            try:
-                asyncio.get_event_loop().create_task(self.close())
-            except RuntimeError:
-                # Event loop might be closed already
-                pass 
\ No newline at end of file
+        """Note clients dropped while open; callers must ``await close()``."""
+        client = getattr(self, "_client", None)
+        if client is not None and not client.is_closed:
+            logger.debug("LetsCloudClient garbage collected without close()")
@@ -0,0 +1,261 @@
+"""
+Logging Configuration
+~~~~~~~~~~~~~~~~~~~~~
+
+Structured, sampled and non-blocking logging for the server processes.
+
+``configure_logging`` is called once by the entry points (never at import
+time). Records are formatted lazily, only when a handler actually emits
+them, and are handed to a background ``QueueListener`` so writing to
+stderr never blocks the event loop.
+
+Settings:
+    LETSCLOUD_LOG_LEVEL: Root level (default INFO)
+    LETSCLOUD_LOG_LEVELS: Per-logger levels, e.g. ``httpx=INFO,uvicorn.access=ERROR``
+    LETSCLOUD_LOG_FORMAT: ``json`` (default) or ``text``
+    LETSCLOUD_LOG_SAMPLE_RATE: Fraction of sampled INFO/DEBUG records kept (default 1.0)
+
+Every record carries the current request id and, when OpenTelemetry is
+installed and a span is active, its trace and span ids.
+"""
+
+import atexit
+import contextlib
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from .config import env_float, env_str
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - optional dependency
+    otel_trace = None
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "letscloud_request_id", default=None
+)
+
+# Attributes every LogRecord has; anything else came from ``extra``
+_RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_CONTEXT_FIELDS = ("request_id", "trace_id", "span_id")
+
+# httpx logs every request at INFO, duplicating the client's sampled line
+DEFAULT_LEVELS = {"httpx": logging.WARNING, "httpcore": logging.WARNING}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def current_request_id() -> Optional[str]:
+    """Request id of the current call, if any."""
+    return _request_id.get()
+
+
+@contextlib.contextmanager
+def request_context(request_id: Optional[str] = None) -> Iterator[str]:
+    """Tag log records emitted inside the block (and its tasks) with a request id."""
+    request_id = request_id or uuid.uuid4().hex[:16]
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Attach request and trace ids to records at the call site."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        record.trace_id = record.span_id = None
+        if otel_trace is not None:
+            context = otel_trace.get_current_span().get_span_context()
+            if context.is_valid:
+                record.trace_id = format(context.trace_id, "032x")
+                record.span_id = format(context.span_id, "016x")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of high-volume records.
+
+    Only records logged with ``extra={"sampled": True}`` below WARNING are
+    sampled. The decision is a hash of the request id, so a request is
+    either logged completely or not at all.
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+        self._counter = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if not getattr(record, "sampled", False):
+            return True
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            bucket = zlib.crc32(request_id.encode()) % 10000
+        else:
+            self._counter += 1
+            bucket = (self._counter * 7919) % 10000
+        return bucket < self.rate * 10000
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in _CONTEXT_FIELDS:
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in _CONTEXT_FIELDS and key != "sampled":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Classic text lines with the request id appended when present."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        return f"{line} [request_id={request_id}]" if request_id else line
+
+
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records without formatting them in the calling thread.
+
+    Arguments that are immutable primitives are passed through and
+    interpolated on the listener thread; anything else is rendered now so
+    later mutation cannot change the message.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        args = record.args if isinstance(record.args, tuple) else (record.args,)
+        if record.args and not all(isinstance(arg, _IMMUTABLE) for arg in args):
+            record.msg, record.args = record.getMessage(), None
+        return record
+
+
+class RequestIdMiddleware:
+    """ASGI middleware giving each HTTP request or WebSocket a request id.
+
+    An incoming ``X-Request-ID`` header is reused; the id is echoed back in
+    the response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        incoming = dict(scope.get("headers") or []).get(b"x-request-id", b"")
+        with request_context(incoming.decode("latin-1")[:64] or None) as request_id:
+            async def send_with_id(message):
+                if message["type"] == "http.response.start":
+                    headers = [*message.get("headers", []), (b"x-request-id", request_id.encode())]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_id)
+
+
+def parse_levels(value: Optional[str]) -> Dict[str, int]:
+    """Parse ``logger=LEVEL`` pairs separated by commas."""
+    levels: Dict[str, int] = {}
+    for pair in (value or "").split(","):
+        name, _, level = pair.partition("=")
+        number = logging.getLevelName(level.strip().upper())
+        if name.strip() and isinstance(number, int):
+            levels[name.strip()] = number
+    return levels
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Install the queued, structured handler on the root logger.
+
+    Safe to call more than once; later calls replace the configuration.
+
+    Args:
+        level: Root level overriding LETSCLOUD_LOG_LEVEL (e.g. from ``--debug``)
+    """
+    global _listener
+    shutdown_logging()
+
+    stream = logging.StreamHandler(sys.stderr)
+    if (env_str("LETSCLOUD_LOG_FORMAT", "json") or "json").lower() == "text":
+        stream.setFormatter(TextFormatter())
+    else:
+        stream.setFormatter(JsonFormatter())
+
+    # Filters run in the calling thread, where the context variables are set
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = DeferredQueueHandler(records)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(SamplingFilter(env_float("LETSCLOUD_LOG_SAMPLE_RATE", 1.0)))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel((level or env_str("LETSCLOUD_LOG_LEVEL", "INFO") or "INFO").upper())
+    levels = dict(DEFAULT_LEVELS)
+    levels.update(parse_levels(env_str("LETSCLOUD_LOG_LEVELS")))
+    for name, logger_level in levels.items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def flush_logging() -> None:
+    """Write out every queued record now, keeping logging configured."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,51 @@
+"""
+Metrics
+~~~~~~~
+
+Lightweight in-process metrics registry.
+
+Counters and gauges are plain floats keyed by name, cheap enough to update on
+every request. ``snapshot()`` returns a JSON-serializable view that the HTTP
+server exposes on ``/metrics``.
+"""
+
+from typing import Dict
+
+
+class Metrics:
+    """Registry of named counters and gauges."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+
+    def inc(self, name: str, value: float = 1.0) -> None:
+        """Increment a counter."""
+        self.counters[name] = self.counters.get(name, 0.0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to an absolute value."""
+        self.gauges[name] = value
+
+    def get(self, name: str) -> float:
+        """Read a counter or gauge, defaulting to zero."""
+        if name in self.counters:
+            return self.counters[name]
+        return self.gauges.get(name, 0.0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return a copy of all metrics."""
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+        }
+
+    def reset(self) -> None:
+        """Clear all metrics."""
+        self.counters.clear()
+        self.gauges.clear()
+
+
+# Global registry shared by the client and the transports
+metrics = Metrics()
@@ -0,0 +1,223 @@
+"""
+API Models
+~~~~~~~~~~
+
+Typed, slotted views of LetsCloud API resources.
+
+Each model declares the fields the server actually reads; anything else
+the API sends is carried untouched in ``extra`` so ``to_dict()`` round-trips
+the original payload. Slotted instances are several times smaller than the
+equivalent dicts, and nested objects (locations, IP addresses) are decoded
+once instead of being re-walked with ``.get()`` chains by every consumer.
+"""
+
+import json
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Type, TypeVar, Union
+
+M = TypeVar("M", bound="Model")
+
+
+class Model:
+    """Base class providing decoding and round-tripping."""
+
+    __slots__ = ()
+
+    # Nested fields: name -> (model class, is_list)
+    NESTED: ClassVar[Dict[str, Tuple[Type["Model"], bool]]] = {}
+    _known: ClassVar[Optional[Dict[str, None]]] = None
+
+    @classmethod
+    def _field_names(cls) -> Dict[str, None]:
+        """Declared field names in order (an ordered set)."""
+        known = cls.__dict__.get("_known")
+        if known is None:
+            known = dict.fromkeys(field.name for field in fields(cls) if field.name != "extra")
+            cls._known = known
+        return known
+
+    @classmethod
+    def from_api(cls: Type[M], data: Dict[str, Any]) -> M:
+        """Build a model from a decoded API object."""
+        known = cls._field_names()
+        values: Dict[str, Any] = {}
+        extra: Dict[str, Any] = {}
+        for key, value in data.items():
+            if key not in known:
+                extra[key] = value
+                continue
+            nested = cls.NESTED.get(key)
+            if nested is not None and value is not None:
+                model, is_list = nested
+                if is_list:
+                    value = tuple(model.from_api(item) for item in value if isinstance(item, dict))
+                elif isinstance(value, dict):
+                    value = model.from_api(value)
+            values[key] = value
+        return cls(**values, extra=extra or None)  # type: ignore[call-arg]
+
+    @classmethod
+    def from_list(cls: Type[M], items: List[Dict[str, Any]]) -> List[M]:
+        """Build models from a list of API objects."""
+        return [cls.from_api(item) for item in items if isinstance(item, dict)]
+
+    @classmethod
+    def decode(cls: Type[M], content: Union[bytes, str]) -> Union[M, List[M]]:
+        """Decode a response body (with or without the ``data`` envelope)."""
+        payload = json.loads(content)
+        if isinstance(payload, dict) and "data" in payload:
+            payload = payload["data"]
+        if isinstance(payload, list):
+            return cls.from_list(payload)
+        return cls.from_api(payload)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to the API's dict shape, omitting unset fields."""
+        result: Dict[str, Any] = {}
+        for name in self._field_names():
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, tuple) and name in self.NESTED:
+                value = [item.to_dict() for item in value]
+            result[name] = value
+        if self.extra:  # type: ignore[attr-defined]
+            result.update(self.extra)  # type: ignore[attr-defined]
+        return result
+
+
+@dataclass(slots=True)
+class Location(Model):
+    """A data center location."""
+
+    slug: Optional[str] = None
+    city: Optional[str] = None
+    country: Optional[str] = None
+    available: Optional[bool] = None
+    extra: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class IpAddress(Model):
+    """An address assigned to an instance."""
+
+    address: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class Instance(Model):
+    """A server instance."""
+
+    NESTED: ClassVar[Dict[str, Tuple[Type[Model], bool]]] = {
+        "location": (Location, False),
+        "ip_addresses": (IpAddress, True),
+    }
+
+    identifier: Optional[str] = None
+    id: Optional[int] = None
+    label: Optional[str] = None
+    hostname: Optional[str] = None
+    built: Optional[bool] = None
+    booted: Optional[bool] = None
+    suspended: Optional[bool] = None
+    cpus: Optional[int] = None
+    memory: Optional[int] = None
+    disk: Optional[int] = None
+    location: Optional[Location] = None
+    ip_addresses: Tuple[IpAddress, ...] = ()
+    created_at: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    @property
+    def key(self) -> Any:
+        """Identifier used in instance URLs."""
+        return self.identifier or self.id
+
+    @property
+    def primary_ip(self) -> Optional[str]:
+        """First IP address, if any."""
+        return self.ip_addresses[0].address if self.ip_addresses else None
+
+    @property
+    def status(self) -> str:
+        """One of ``building``, ``stopped``, ``suspended`` or ``running``."""
+        if not self.built:
+            return "building"
+        if not self.booted:
+            return "stopped"
+        if self.suspended:
+            return "suspended"
+        return "running"
+
+
+@dataclass(slots=True)
+class SshKey(Model):
+    """An SSH public key registered in the account."""
+
+    id: Optional[int] = None
+    title: Optional[str] = None
+    fingerprint: Optional[str] = None
+    created_at: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class Snapshot(Model):
+    """A server snapshot."""
+
+    id: Optional[int] = None
+    label: Optional[str] = None
+    description: Optional[str] = None
+    size: Optional[Any] = None
+    status: Optional[str] = None
+    created_at: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class Plan(Model):
+    """A server plan (size and price)."""
+
+    NESTED: ClassVar[Dict[str, Tuple[Type[Model], bool]]] = {"locations": (Location, True)}
+
+    slug: Optional[str] = None
+    shortcode: Optional[str] = None
+    core: Optional[int] = None
+    memory: Optional[int] = None
+    disk: Optional[int] = None
+    bandwidth: Optional[int] = None
+    monthly_value: Optional[Any] = None
+    hourly_value: Optional[Any] = None
+    currency: Optional[str] = None
+    locations: Tuple[Location, ...] = ()
+    extra: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class Image(Model):
+    """An OS image."""
+
+    NESTED: ClassVar[Dict[str, Tuple[Type[Model], bool]]] = {"locations": (Location, True)}
+
+    slug: Optional[str] = None
+    distro: Optional[str] = None
+    os: Optional[str] = None
+    version: Optional[str] = None
+    locations: Tuple[Location, ...] = ()
+    extra: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
+class Account(Model):
+    """The account profile."""
+
+    name: Optional[str] = None
+    email: Optional[str] = None
+    company_name: Optional[str] = None
+    balance: Optional[Any] = None
+    currency: Optional[str] = None
+    created_at: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
@@ -0,0 +1,122 @@
+"""
+Progress Reporting
+~~~~~~~~~~~~~~~~~~
+
+Progress notifications and incremental result chunks for long-running tools.
+
+Handlers call ``report_progress`` and ``emit_chunk`` freely; both are no-ops
+unless the call runs under ``ProgressReporter.activate``, which the
+streaming HTTP and WebSocket transports do. Events use the MCP
+``notifications/progress`` shape so clients can reuse their parsers.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Union
+
+from .admission import BUSY_ERROR_CODE, Overloaded
+
+_current: contextvars.ContextVar[Optional["ProgressReporter"]] = contextvars.ContextVar(
+    "letscloud_progress_reporter", default=None
+)
+
+Event = Dict[str, Any]
+
+
+class ProgressReporter:
+    """Collects progress events for one tool call."""
+
+    def __init__(self, progress_token: Union[str, int, None] = None):
+        """
+        Initialize the reporter.
+
+        Args:
+            progress_token: Token echoed back in progress notifications
+        """
+        self.progress_token = progress_token
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+
+    def progress(self, progress: float, total: Optional[float] = None,
+                 message: Optional[str] = None) -> None:
+        """Queue a progress notification."""
+        params: Dict[str, Any] = {"progressToken": self.progress_token, "progress": progress}
+        if total is not None:
+            params["total"] = total
+        if message:
+            params["message"] = message
+        self.queue.put_nowait(
+            {"jsonrpc": "2.0", "method": "notifications/progress", "params": params}
+        )
+
+    def chunk(self, text: str) -> None:
+        """Queue an incremental piece of the result."""
+        self.queue.put_nowait({
+            "jsonrpc": "2.0",
+            "method": "notifications/message",
+            "params": {"progressToken": self.progress_token, "type": "text", "text": text},
+        })
+
+    @contextlib.contextmanager
+    def activate(self) -> Iterator["ProgressReporter"]:
+        """Make this reporter current; tasks created inside inherit it."""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+
+    async def run(self, call: Callable[[], Awaitable[Any]]) -> AsyncIterator[Event]:
+        """
+        Run a call with this reporter active and yield events as they happen.
+
+        The final event is ``{"result": ...}`` or ``{"error": ...}``; a shed
+        call gets the same busy error as the non-streaming transports.
+        """
+        with self.activate():
+            task = asyncio.ensure_future(call())
+        task.add_done_callback(lambda _: self.queue.put_nowait(None))
+
+        try:
+            while True:
+                event = await self.queue.get()
+                if event is None:
+                    break
+                yield event
+            while not self.queue.empty():
+                event = self.queue.get_nowait()
+                if event is not None:
+                    yield event
+            try:
+                yield {"result": task.result()}
+            except Overloaded as e:
+                yield {"error": {"code": BUSY_ERROR_CODE, "message": str(e),
+                                 "data": {"retryAfter": e.retry_after}}}
+            except Exception as e:
+                yield {"error": {"code": -32603, "message": str(e)}}
+        finally:
+            if not task.done():
+                task.cancel()
+
+
+def report_progress(progress: float, total: Optional[float] = None,
+                    message: Optional[str] = None) -> None:
+    """Report progress for the current tool call, if anyone is listening."""
+    reporter = _current.get()
+    if reporter is not None:
+        reporter.progress(progress, total, message)
+
+
+def emit_chunk(text: str) -> None:
+    """Emit a partial result for the current tool call, if anyone is listening."""
+    reporter = _current.get()
+    if reporter is not None:
+        reporter.chunk(text)
+
+
+def sse_event(event: Event) -> str:
+    """Format an event as a server-sent event frame."""
+    name = "message" if "method" in event else ("error" if "error" in event else "result")
+    data = json.dumps(event, separators=(",", ":"), ensure_ascii=False)
+    return f"event: {name}\ndata: {data}\n\n"
@@ -0,0 +1,128 @@
+"""
+Bulk Provisioning
+~~~~~~~~~~~~~~~~~
+
+Parallel creation of identical servers from a template for ``create_servers``.
+
+The template is validated once (see validation.py) before any instance is
+created, creations run concurrently under a cap, and the optional wait
+polls a single ``list_servers`` call per interval for the whole batch
+instead of one ``get_server`` per instance.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .concurrency import gather_limited
+from .config import env_float, env_int
+from .letscloud_client import LetsCloudClient
+from .progress import report_progress
+from .snapshots import server_key
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_FIELDS = ("plan_slug", "image_slug", "location_slug", "ssh_keys", "password")
+MAX_BATCH_SIZE = 100
+
+
+def provision_concurrency() -> int:
+    """Maximum concurrent create requests (LETSCLOUD_PROVISION_CONCURRENCY)."""
+    return env_int("LETSCLOUD_PROVISION_CONCURRENCY", 5)
+
+
+def poll_interval() -> float:
+    """Seconds between build status polls (LETSCLOUD_POLL_INTERVAL)."""
+    return env_float("LETSCLOUD_POLL_INTERVAL", 10.0)
+
+
+def build_labels(args: Dict[str, Any]) -> List[str]:
+    """
+    Work out the labels to create from ``labels`` or ``count``/``label_prefix``.
+
+    Raises:
+        ValueError: If neither is given, count is below 1 or the batch is too large
+    """
+    labels = args.get("labels")
+    if labels:
+        labels = [str(label) for label in labels]
+        if len(set(labels)) != len(labels):
+            raise ValueError("labels must be unique")
+    elif args.get("count") is not None:
+        count = int(args["count"])
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        prefix = args.get("label_prefix") or "server"
+        labels = [f"{prefix}-{index}" for index in range(1, count + 1)]
+    else:
+        raise ValueError("Either labels or count is required")
+    if len(labels) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} servers can be created per call")
+    return labels
+
+
+async def create_batch(
+    client: LetsCloudClient,
+    template: Dict[str, Any],
+    labels: List[str]
+) -> List[Dict[str, Any]]:
+    """
+    Create one server per label concurrently.
+
+    Returns:
+        One report item per label with status ``created`` or ``failed``
+    """
+    body = {key: template[key] for key in TEMPLATE_FIELDS if template.get(key) is not None}
+
+    async def create(label: str) -> Dict[str, Any]:
+        return await client.create_server({**body, "label": label})
+
+    results = await gather_limited(
+        labels,
+        create,
+        limit=provision_concurrency(),
+        on_done=lambda done, total: report_progress(done, total, "Creating servers"),
+    )
+    report = []
+    for label, result in zip(labels, results):
+        if isinstance(result, BaseException):
+            logger.warning("Creating server %s failed: %s", label, result)
+            report.append({"label": label, "status": "failed", "error": str(result)})
+        else:
+            report.append({"label": label, "status": "created", "id": server_key(result)})
+    return report
+
+
+async def wait_until_built(
+    client: LetsCloudClient,
+    report: List[Dict[str, Any]],
+    timeout: float,
+    interval: Optional[float] = None
+) -> bool:
+    """
+    Poll the instance list until every created server is built.
+
+    Updates ``built`` on the report items in place.
+
+    Returns:
+        True if all created servers finished building before the timeout
+    """
+    interval = poll_interval() if interval is None else interval
+    pending = {str(item["id"]): item for item in report if item["status"] == "created"}
+    total = len(pending)
+    deadline = time.monotonic() + timeout
+    while pending:
+        instances = await client.list_servers()
+        for instance in instances:
+            item = pending.get(str(server_key(instance)))
+            if item is not None and instance.get("built"):
+                item["built"] = True
+                del pending[str(server_key(instance))]
+        report_progress(total - len(pending), total, "Waiting for servers to build")
+        if not pending or time.monotonic() + interval > deadline:
+            break
+        await asyncio.sleep(interval)
+    for item in pending.values():
+        item["built"] = False
+    return not pending
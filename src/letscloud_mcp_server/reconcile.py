@@ -0,0 +1,294 @@
+"""
+Fleet Reconciliation
+~~~~~~~~~~~~~~~~~~~~
+
+Declarative plan/apply for the ``reconcile_fleet`` tool.
+
+A desired-state spec (labels, plans, images, locations, power state and SSH
+keys) is diffed against a single inventory fetch. The result is a list of
+actions with dependencies (e.g. a new server must be built before it can be
+powered off), which ``apply_plan`` runs as a concurrent DAG under the fleet
+concurrency limit and a rate limit.
+
+SSH keys can only be attached when a server is created; key differences on
+existing servers are reported as drift when the API exposes their keys.
+
+Pruning is guarded: an empty spec without ``label_prefix`` would delete
+every server in the account, so it needs ``confirm_delete_all``, and plans
+deleting more servers than the configured maximum are refused.
+
+Settings:
+    LETSCLOUD_RECONCILE_RATE: Actions started per second (default 2, 0 = unlimited)
+    LETSCLOUD_RECONCILE_MAX_DELETES: Most deletions one plan may contain (default 10)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .concurrency import RateLimiter
+from .config import env_float, env_int
+from .letscloud_client import LetsCloudClient
+from .progress import report_progress
+from .provisioning import TEMPLATE_FIELDS, wait_until_built
+from .snapshots import fleet_concurrency, server_key
+from .validation import validate_server_request
+
+logger = logging.getLogger(__name__)
+
+POWER_STATES = ("on", "off")
+
+
+def action_rate() -> float:
+    """Reconcile actions started per second (LETSCLOUD_RECONCILE_RATE, 0 = unlimited)."""
+    return env_float("LETSCLOUD_RECONCILE_RATE", 2.0)
+
+
+def max_deletes() -> int:
+    """Most deletions a single plan may contain (LETSCLOUD_RECONCILE_MAX_DELETES)."""
+    return env_int("LETSCLOUD_RECONCILE_MAX_DELETES", 10)
+
+
+@dataclass
+class Action:
+    """A single step of a reconciliation plan."""
+
+    id: str
+    kind: str
+    label: str
+    reason: str
+    server_id: Any = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-friendly view used in plan output."""
+        view = {"id": self.id, "action": self.kind, "label": self.label, "reason": self.reason}
+        if self.server_id is not None:
+            view["server_id"] = self.server_id
+        if self.depends_on:
+            view["depends_on"] = self.depends_on
+        return view
+
+
+@dataclass
+class Plan:
+    """Actions plus differences that cannot be fixed in place."""
+
+    actions: List[Action] = field(default_factory=list)
+    drift: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+
+def _current_slug(instance: Dict[str, Any], name: str) -> Optional[str]:
+    """Read a plan/location slug from an instance, if the API exposes it."""
+    direct = instance.get(f"{name}_slug")
+    if direct:
+        return str(direct)
+    nested = instance.get(name)
+    if isinstance(nested, dict) and nested.get("slug"):
+        return str(nested["slug"])
+    return None
+
+
+def _key_ids(keys: Any) -> Optional[List[str]]:
+    """Sorted SSH key IDs from a list of IDs or key objects, or None if unknown."""
+    if not isinstance(keys, list):
+        return None
+    ids = []
+    for key in keys:
+        value = key.get("id") if isinstance(key, dict) else key
+        if value is not None:
+            ids.append(str(value))
+    return sorted(ids)
+
+
+def _is_on(instance: Dict[str, Any]) -> bool:
+    return bool(instance.get("booted")) and not instance.get("suspended")
+
+
+def build_plan(
+    spec: List[Dict[str, Any]],
+    inventory: List[Dict[str, Any]],
+    prune: bool = False,
+    label_prefix: Optional[str] = None,
+    confirm_delete_all: bool = False,
+    delete_limit: Optional[int] = None
+) -> Plan:
+    """
+    Diff desired servers against the current inventory.
+
+    Servers are matched by label. With ``prune`` every server in scope
+    (label starts with ``label_prefix`` when given) that is not in the spec
+    is deleted.
+
+    Args:
+        spec: Desired servers
+        inventory: Current servers
+        prune: Delete servers in scope that are not in the spec
+        label_prefix: Limits pruning to labels with this prefix
+        confirm_delete_all: Allow pruning with an empty spec and no prefix
+        delete_limit: Most deletions allowed (defaults to ``max_deletes()``)
+
+    Raises:
+        ValueError: If the spec is malformed or pruning is not allowed
+    """
+    if prune and not spec and not label_prefix and not confirm_delete_all:
+        raise ValueError(
+            "prune with no desired servers and no label_prefix would delete every server; "
+            "set label_prefix or confirm_delete_all"
+        )
+    plan = Plan()
+    desired: Dict[str, Dict[str, Any]] = {}
+    for entry in spec:
+        label = entry.get("label")
+        if not label:
+            raise ValueError("Every desired server needs a label")
+        if label in desired:
+            raise ValueError(f"Duplicate label '{label}' in desired state")
+        if entry.get("power", "on") not in POWER_STATES:
+            raise ValueError(f"power must be 'on' or 'off' for '{label}'")
+        desired[label] = entry
+
+    by_label: Dict[str, List[Dict[str, Any]]] = {}
+    for instance in inventory:
+        by_label.setdefault(str(instance.get("label")), []).append(instance)
+
+    for label, entry in desired.items():
+        matches = by_label.get(label, [])
+        power = entry.get("power", "on")
+        if not matches:
+            create = Action(
+                id=f"create:{label}", kind="create", label=label, reason="missing",
+                params={key: entry[key] for key in TEMPLATE_FIELDS if entry.get(key) is not None},
+            )
+            plan.actions.append(create)
+            if power == "off":
+                plan.actions.append(Action(
+                    id=f"shutdown:{label}", kind="shutdown", label=label,
+                    reason="desired power off after creation", depends_on=[create.id],
+                ))
+            continue
+
+        if len(matches) > 1:
+            plan.drift.append({"label": label, "issue": f"{len(matches)} servers share this label"})
+        instance = matches[0]
+        server_id = server_key(instance)
+        changed = False
+        for name in ("plan", "location"):
+            wanted = entry.get(f"{name}_slug")
+            current = _current_slug(instance, name)
+            if wanted and current and wanted != current:
+                issue = f"{name} is {current}, desired {wanted} (requires replacement)"
+                plan.drift.append({"label": label, "issue": issue})
+                changed = True
+        wanted_keys = _key_ids(entry.get("ssh_keys"))
+        current_keys = _key_ids(instance.get("ssh_keys"))
+        if wanted_keys is not None and current_keys is not None and wanted_keys != current_keys:
+            issue = (f"ssh keys are {current_keys or 'none'}, desired {wanted_keys} "
+                     "(keys are only attached at creation)")
+            plan.drift.append({"label": label, "issue": issue})
+            changed = True
+        if power == "on" and not _is_on(instance) and instance.get("built", True):
+            plan.actions.append(Action(id=f"start:{label}", kind="start", label=label,
+                                       reason="desired power on", server_id=server_id))
+            changed = True
+        elif power == "off" and _is_on(instance):
+            plan.actions.append(Action(id=f"shutdown:{label}", kind="shutdown", label=label,
+                                       reason="desired power off", server_id=server_id))
+            changed = True
+        if not changed:
+            plan.unchanged.append(label)
+
+    if prune:
+        for label, instances in by_label.items():
+            if label in desired or (label_prefix and not label.startswith(label_prefix)):
+                continue
+            for instance in instances:
+                server_id = server_key(instance)
+                plan.actions.append(Action(id=f"delete:{server_id}", kind="delete", label=label,
+                                           reason="not in desired state", server_id=server_id))
+        limit = max_deletes() if delete_limit is None else delete_limit
+        deletes = sum(1 for action in plan.actions if action.kind == "delete")
+        if deletes > limit:
+            raise ValueError(
+                f"Plan would delete {deletes} servers, more than the limit of {limit} "
+                "(LETSCLOUD_RECONCILE_MAX_DELETES)"
+            )
+    return plan
+
+
+async def validate_plan(client: LetsCloudClient, plan: Plan) -> List[str]:
+    """Pre-flight validate every create action."""
+    problems = []
+    for action in plan.actions:
+        if action.kind == "create":
+            for problem in await validate_server_request(client, action.params):
+                problems.append(f"{action.label}: {problem}")
+    return problems
+
+
+async def apply_plan(client: LetsCloudClient, plan: Plan,
+                     build_timeout: float = 600.0) -> List[Dict[str, Any]]:
+    """
+    Execute plan actions as a dependency-aware concurrent DAG.
+
+    An action starts once all of its dependencies succeeded; if any
+    dependency failed it is skipped. At most ``fleet_concurrency()`` actions
+    run at once and starts are rate limited.
+
+    Returns:
+        One result per action with status ``done``, ``failed`` or ``skipped``
+    """
+    semaphore = asyncio.Semaphore(max(1, fleet_concurrency()))
+    limiter = RateLimiter(action_rate(), burst=fleet_concurrency())
+    tasks: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+    created: Dict[str, Any] = {}
+    completed = 0
+
+    async def perform(action: Action) -> Any:
+        if action.kind == "create":
+            result = await client.create_server({**action.params, "label": action.label})
+            created[action.label] = server_key(result)
+            return created[action.label]
+        server_id = action.server_id if action.server_id is not None else created.get(action.label)
+        if action.kind == "shutdown" and action.server_id is None:
+            # Freshly created servers must finish building before power changes
+            report = [{"status": "created", "id": server_id}]
+            if not await wait_until_built(client, report, timeout=build_timeout):
+                raise TimeoutError(f"{action.label} did not finish building")
+        calls: Dict[str, Callable[[Any], Awaitable[Any]]] = {
+            "start": client.start_server,
+            "shutdown": client.shutdown_server,
+            "delete": client.delete_server,
+        }
+        return await calls[action.kind](server_id)
+
+    async def run(action: Action) -> Dict[str, Any]:
+        nonlocal completed
+        outcome = action.describe()
+        try:
+            for dependency in action.depends_on:
+                if (await tasks[dependency])["status"] != "done":
+                    outcome["status"] = "skipped"
+                    outcome["error"] = f"dependency {dependency} did not succeed"
+                    return outcome
+            async with semaphore:
+                await limiter.acquire()
+                await perform(action)
+            outcome["status"] = "done"
+            if action.label in created and action.kind == "create":
+                outcome["server_id"] = created[action.label]
+        except Exception as e:
+            logger.warning("Reconcile action %s failed: %s", action.id, e)
+            outcome["status"] = "failed"
+            outcome["error"] = str(e)
+        finally:
+            completed += 1
+            report_progress(completed, len(plan.actions), f"{action.kind} {action.label}")
+        return outcome
+
+    for action in plan.actions:
+        tasks[action.id] = asyncio.ensure_future(run(action))
+    return list(await asyncio.gather(*tasks.values()))
@@ -0,0 +1,245 @@
+"""
+Record/Replay Transport
+~~~~~~~~~~~~~~~~~~~~~~~
+
+httpx transports that capture LetsCloud API traffic and play it back.
+
+``RecordingTransport`` forwards requests to the real API and appends each
+exchange to a JSON Lines file (gzip-compressed when the name ends in
+``.gz``). ``ReplayTransport`` serves those exchanges offline, in recorded
+order per request, sleeping for the recorded latency scaled by
+``latency_scale`` plus ``extra_latency`` so load tests and benchmarks are
+reproducible without network access.
+
+Request headers and bodies are never written, so the API token and any
+passwords sent on create calls stay out of recordings.
+
+Settings:
+    LETSCLOUD_HTTP_RECORD: Record traffic to this file
+    LETSCLOUD_HTTP_REPLAY: Serve traffic from this file instead of the API
+    LETSCLOUD_REPLAY_LATENCY_SCALE: Multiplier for recorded latency (default 1.0, 0 = instant)
+    LETSCLOUD_REPLAY_EXTRA_LATENCY: Seconds added to every replayed response (default 0)
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import IO, Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from .config import env_float, env_str
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth replaying (validators matter for conditional GETs)
+RECORDED_HEADERS = ("content-type", "etag", "last-modified", "retry-after")
+
+
+class ReplayMissError(httpx.RequestError):
+    """A request has no recorded response."""
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+
+def _target(request: httpx.Request) -> str:
+    """Path and query of a request, the part that identifies it in a recording."""
+    return request.url.raw_path.decode("ascii")
+
+
+def encode_exchange(
+    request: httpx.Request,
+    status: int,
+    headers: httpx.Headers,
+    content: bytes,
+    offset: float,
+    latency: float
+) -> Dict[str, Any]:
+    """Build the compact record of one request/response pair."""
+    entry: Dict[str, Any] = {
+        "t": round(offset, 4),
+        "method": request.method,
+        "target": _target(request),
+        "status": status,
+        "latency": round(latency, 4),
+    }
+    kept = {name: headers[name] for name in RECORDED_HEADERS if name in headers}
+    if kept:
+        entry["headers"] = kept
+    if content:
+        try:
+            entry["body"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["body_b64"] = base64.b64encode(content).decode("ascii")
+    return entry
+
+
+def decode_body(entry: Dict[str, Any]) -> bytes:
+    """Response body of a recorded exchange."""
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    """Read every exchange from a recording file."""
+    with _open(path, "r") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forward requests to a real transport and append each exchange to a file."""
+
+    def __init__(self, path: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: Recording file (appended to; ``.gz`` for compression)
+            transport: Transport doing the real I/O (default: a new HTTP transport)
+        """
+        self.path = path
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = _open(path, "a")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        try:
+            raw = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        latency = time.monotonic() - started
+        # The body is stored decoded, but passed on as it came off the wire
+        content = httpx.Response(
+            response.status_code, headers=response.headers, content=raw
+        ).content
+
+        headers = httpx.Headers([
+            (name, value) for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ])
+        entry = encode_exchange(
+            request, response.status_code, headers, content, started - self._started, latency
+        )
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False))
+                self._file.write("\n")
+                self._file.flush()
+        metrics.inc("replay.recorded")
+        return httpx.Response(
+            response.status_code, headers=response.headers, stream=httpx.ByteStream(raw),
+            request=request
+        )
+
+    async def aclose(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serve recorded exchanges instead of calling the API.
+
+    Each (method, path) keeps its recorded responses in order; once they
+    run out the last one is repeated, so replay is deterministic however
+    many times a request is made.
+    """
+
+    def __init__(
+        self,
+        entries: List[Dict[str, Any]],
+        latency_scale: float = 1.0,
+        extra_latency: float = 0.0
+    ):
+        """
+        Initialize the replayer.
+
+        Args:
+            entries: Exchanges as produced by ``RecordingTransport``
+            latency_scale: Multiplier for recorded latency (0 serves instantly)
+            extra_latency: Seconds added to every response
+        """
+        self.entries = entries
+        self.latency_scale = latency_scale
+        self.extra_latency = extra_latency
+        self._queues: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+        for entry in entries:
+            self._queues.setdefault((entry["method"], entry["target"]), deque()).append(entry)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: float) -> "ReplayTransport":
+        """Load a recording file."""
+        return cls(load_recording(path), **kwargs)
+
+    def schedule(self, time_scale: float = 1.0) -> List[Tuple[float, str, str]]:
+        """
+        Recorded arrival pattern as (offset seconds, method, target).
+
+        Load generators can re-issue calls at these offsets to reproduce a
+        production traffic shape; ``time_scale`` < 1 compresses it.
+        """
+        return [
+            (entry["t"] * time_scale, entry["method"], entry["target"])
+            for entry in self.entries
+        ]
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        queue = self._queues.get((request.method, _target(request)))
+        if not queue:
+            metrics.inc("replay.misses")
+            raise ReplayMissError(
+                f"No recorded response for {request.method} {_target(request)}", request=request
+            )
+        entry = queue.popleft() if len(queue) > 1 else queue[0]
+        delay = entry.get("latency", 0.0) * self.latency_scale + self.extra_latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+        metrics.inc("replay.served")
+        return httpx.Response(
+            entry["status"],
+            headers=entry.get("headers", {}),
+            content=decode_body(entry),
+            request=request
+        )
+
+
+def transport_from_env(
+    limits: Optional[httpx.Limits] = None
+) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    Recording or replay transport selected by LETSCLOUD_HTTP_RECORD/REPLAY.
+
+    Returns:
+        The transport, or None to let httpx talk to the API directly
+    """
+    replay = env_str("LETSCLOUD_HTTP_REPLAY")
+    if replay:
+        logger.info("Replaying LetsCloud API traffic from %s", replay)
+        return ReplayTransport.from_file(
+            replay,
+            latency_scale=env_float("LETSCLOUD_REPLAY_LATENCY_SCALE", 1.0),
+            extra_latency=env_float("LETSCLOUD_REPLAY_EXTRA_LATENCY", 0.0),
+        )
+    record = env_str("LETSCLOUD_HTTP_RECORD")
+    if record:
+        logger.info("Recording LetsCloud API traffic to %s", record)
+        inner = httpx.AsyncHTTPTransport(limits=limits) if limits else None
+        return RecordingTransport(record, inner)
+    return None
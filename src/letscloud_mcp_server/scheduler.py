@@ -0,0 +1,278 @@
+"""
+Fair Scheduling
+~~~~~~~~~~~~~~~
+
+Admission of tool calls from the HTTP and WebSocket transports.
+
+Every caller shares one event loop and one upstream client, so without
+isolation a single agent running a large loop starves everyone else. The
+``FairScheduler`` caps calls in flight globally, per tenant (API key) and
+per connection. Waiting calls are ordered by priority class (interactive
+reads, then mutations, then bulk fleet operations) and, within a class, by
+weighted fair queuing across tenants. Calls that waited longer than the
+aging threshold are promoted to the top class so bulk work cannot starve.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from .config import env_float, env_int, env_str
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+READ = 0
+WRITE = 1
+BULK = 2
+PRIORITY_NAMES = {READ: "read", WRITE: "write", BULK: "bulk"}
+
+# Tools that fan out over the whole fleet, and submit_job, which queues background work
+BULK_TOOLS = {
+    "create_servers", "reconcile_fleet", "apply_snapshot_retention", "list_all_snapshots",
+    "submit_job",
+}
+READ_PREFIXES = ("list_", "get_")
+READ_TOOLS = {"fleet_summary"}
+
+# Tenant of the tool call being handled, so jobs it submits are charged to it
+current_tenant: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar(
+    "letscloud_tenant", default=None
+)
+
+
+def classify(tool_name: str) -> int:
+    """Priority class of a tool call."""
+    if tool_name in BULK_TOOLS:
+        return BULK
+    if tool_name in READ_TOOLS or tool_name.startswith(READ_PREFIXES):
+        return READ
+    return WRITE
+
+
+def tenant_id(credential: Optional[str]) -> str:
+    """Stable, non-reversible tenant name for an API key or client address."""
+    if not credential:
+        return "anonymous"
+    return hashlib.sha256(credential.encode()).hexdigest()[:12]
+
+
+def parse_weights(value: Optional[str]) -> Dict[str, float]:
+    """Parse ``tenant=weight`` pairs separated by commas."""
+    weights: Dict[str, float] = {}
+    for pair in (value or "").split(","):
+        name, _, weight = pair.partition("=")
+        try:
+            weights[name.strip()] = max(0.01, float(weight))
+        except ValueError:
+            continue
+    return weights
+
+
+@dataclass
+class _Waiter:
+    tenant: str
+    connection: str
+    priority: int
+    tag: float
+    seq: int
+    enqueued: float
+    future: "asyncio.Future[None]" = field(repr=False)
+
+
+class FairScheduler:
+    """Weighted fair, priority-aware admission with in-flight quotas."""
+
+    def __init__(
+        self,
+        max_in_flight: int = 32,
+        tenant_limit: int = 8,
+        connection_limit: int = 4,
+        aging: float = 5.0,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_in_flight: Calls running at once across all tenants
+            tenant_limit: Calls running at once per tenant
+            connection_limit: Calls running at once per connection
+            aging: Seconds after which a waiting call is promoted to the top class
+            weights: Relative share per tenant id (default 1.0)
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.tenant_limit = max(1, tenant_limit)
+        self.connection_limit = max(1, connection_limit)
+        self.aging = aging
+        self.weights = weights or {}
+        self._waiters: List[_Waiter] = []
+        self._in_flight = 0
+        self._by_tenant: Dict[str, int] = {}
+        self._by_connection: Dict[str, int] = {}
+        # Virtual finish time per tenant and the scheduler's virtual clock
+        self._finish: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._sequence = itertools.count()
+
+    @classmethod
+    def from_env(cls) -> "FairScheduler":
+        """Build a scheduler configured by LETSCLOUD_SCHED_* environment variables."""
+        return cls(
+            max_in_flight=env_int("LETSCLOUD_SCHED_MAX_IN_FLIGHT", 32),
+            tenant_limit=env_int("LETSCLOUD_SCHED_TENANT_LIMIT", 8),
+            connection_limit=env_int("LETSCLOUD_SCHED_CONNECTION_LIMIT", 4),
+            aging=env_float("LETSCLOUD_SCHED_AGING", 5.0),
+            weights=parse_weights(env_str("LETSCLOUD_SCHED_WEIGHTS")),
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _eligible(self, tenant: str, connection: str) -> bool:
+        return (
+            self._by_tenant.get(tenant, 0) < self.tenant_limit
+            and self._by_connection.get(connection, 0) < self.connection_limit
+        )
+
+    def _pick(self) -> Optional[_Waiter]:
+        """Best eligible waiter: (effective class, virtual finish tag, arrival)."""
+        now = time.monotonic()
+        best: Optional[_Waiter] = None
+        best_key = None
+        for waiter in self._waiters:
+            if waiter.future.done() or not self._eligible(waiter.tenant, waiter.connection):
+                continue
+            priority = READ if now - waiter.enqueued >= self.aging else waiter.priority
+            key = (priority, waiter.tag, waiter.seq)
+            if best_key is None or key < best_key:
+                best, best_key = waiter, key
+        return best
+
+    def _grant(self, tenant: str, connection: str) -> None:
+        self._in_flight += 1
+        self._by_tenant[tenant] = self._by_tenant.get(tenant, 0) + 1
+        self._by_connection[connection] = self._by_connection.get(connection, 0) + 1
+
+    def _release(self, tenant: str, connection: str) -> None:
+        self._in_flight -= 1
+        for counts, key in ((self._by_tenant, tenant), (self._by_connection, connection)):
+            counts[key] -= 1
+            if not counts[key]:
+                del counts[key]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit waiters while capacity allows."""
+        self._waiters = [waiter for waiter in self._waiters if not waiter.future.done()]
+        while self._in_flight < self.max_in_flight:
+            waiter = self._pick()
+            if waiter is None:
+                break
+            self._waiters.remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.tag)
+            self._grant(waiter.tenant, waiter.connection)
+            self._record_wait(waiter)
+            waiter.future.set_result(None)
+        self._update_gauges()
+
+    def _record_wait(self, waiter: _Waiter) -> None:
+        waited = time.monotonic() - waiter.enqueued
+        metrics.inc("sched.admitted")
+        metrics.inc(f"sched.wait_seconds.{PRIORITY_NAMES[waiter.priority]}", waited)
+        if waited > metrics.get("sched.max_wait_seconds"):
+            metrics.set_gauge("sched.max_wait_seconds", waited)
+
+    def _update_gauges(self) -> None:
+        metrics.set_gauge("sched.in_flight", self._in_flight)
+        metrics.set_gauge("sched.queued", len(self._waiters))
+        for priority, name in PRIORITY_NAMES.items():
+            metrics.set_gauge(
+                f"sched.queued.{name}",
+                sum(1 for waiter in self._waiters if waiter.priority == priority),
+            )
+
+    @contextlib.asynccontextmanager
+    async def slot(self, tenant: str, connection: Optional[str] = None,
+                   priority: int = READ) -> AsyncIterator[None]:
+        """
+        Hold an execution slot for the duration of the block.
+
+        Args:
+            tenant: Tenant id (see ``tenant_id``)
+            connection: Connection id; defaults to one connection per tenant
+            priority: READ, WRITE or BULK
+        """
+        connection = connection or tenant
+        busy = self._in_flight >= self.max_in_flight or not self._eligible(tenant, connection)
+        if busy or self._waiters:
+            waiter = self._enqueue(tenant, connection, priority)
+            self._dispatch()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # Admitted just as we were cancelled
+                    self._release(tenant, connection)
+                else:
+                    waiter.future.cancel()
+                    self._dispatch()
+                raise
+        else:
+            self._charge(tenant, priority)
+            self._grant(tenant, connection)
+            metrics.inc("sched.admitted")
+            self._update_gauges()
+        try:
+            yield
+        finally:
+            self._release(tenant, connection)
+
+    def _charge(self, tenant: str, priority: int) -> float:
+        """Advance the tenant's virtual finish time; bulk calls cost more."""
+        weight = self.weights.get(tenant, 1.0)
+        start = max(self._virtual_time, self._finish.get(tenant, 0.0))
+        self._finish[tenant] = start + (1 + priority) / weight
+        return self._finish[tenant]
+
+    def _enqueue(self, tenant: str, connection: str, priority: int) -> _Waiter:
+        waiter = _Waiter(
+            tenant=tenant,
+            connection=connection,
+            priority=priority,
+            tag=self._charge(tenant, priority),
+            seq=next(self._sequence),
+            enqueued=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        metrics.inc("sched.queued_total")
+        self._update_gauges()
+        return waiter
+
+    async def run(self, tenant: str, connection: Optional[str], priority: int,
+                  call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``call`` once a slot is available."""
+        async with self.slot(tenant, connection, priority):
+            return await call()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current queue state for diagnostics."""
+        return {
+            "in_flight": self._in_flight,
+            "queued": len(self._waiters),
+            "tenants_in_flight": dict(self._by_tenant),
+        }
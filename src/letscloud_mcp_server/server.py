@@ -23,8 +23,12 @@ from mcp.server import Server, NotificationOptions
 from mcp.server.models import InitializationOptions
 from mcp.server.session import ServerSession
 from mcp.types import (
+    INTERNAL_ERROR,
+    INVALID_REQUEST,
+    METHOD_NOT_FOUND,
     CallToolRequest,
     CallToolResult,
+    ErrorData,
     ListToolsRequest,
     ListToolsResult,
     TextContent,
@@ -32,11 +36,35 @@ from mcp.types import (
 )
 from mcp import McpError
 
+from .cache import PersistentCache
+from .config import env_float
+from .fleet import GROUP_BY, FleetSummary
+from .formatters import render_servers
+from .idempotency import IDEMPOTENCY_KEY_PROPERTY, MUTATING_TOOLS, IdempotencyStore
+from .jobs import JOB_TOOLS, JobQueue, JobQueueFull
 from .letscloud_client import LetsCloudClient
+from .logging_config import configure_logging
+from .progress import emit_chunk, report_progress
+from .provisioning import build_labels, create_batch, wait_until_built
+from .reconcile import apply_plan, build_plan, validate_plan
+from .scheduler import current_tenant
+from .shaping import CursorError, shape_result
+from .sidecar import SidecarClient
+from .validation import validate_server_request
+from .snapshots import (
+    collect_fleet_snapshots,
+    delete_snapshots,
+    filter_rows,
+    plan_retention,
+    sort_rows,
+    to_table,
+)
 from .tools import (
     list_servers_tool,
     get_server_tool,
     create_server_tool,
+    create_servers_tool,
+    reconcile_fleet_tool,
     delete_server_tool,
     reboot_server_tool,
     shutdown_server_tool,
@@ -50,14 +78,19 @@ from .tools import (
     list_snapshots_tool,
     delete_snapshot_tool,
     restore_snapshot_tool,
+    list_all_snapshots_tool,
+    apply_snapshot_retention_tool,
     list_plans_tool,
     list_images_tool,
     list_locations_tool,
     get_account_info_tool,
+    fleet_summary_tool,
+    submit_job_tool,
+    get_job_tool,
+    list_jobs_tool,
+    cancel_job_tool,
 )
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Global server instance
@@ -74,6 +107,8 @@ class LetsCloudMCPServer:
             list_servers_tool,
             get_server_tool,
             create_server_tool,
+            create_servers_tool,
+            reconcile_fleet_tool,
             delete_server_tool,
             reboot_server_tool,
             shutdown_server_tool,
@@ -89,11 +124,19 @@ class LetsCloudMCPServer:
             list_snapshots_tool,
             delete_snapshot_tool,
             restore_snapshot_tool,
+            list_all_snapshots_tool,
+            apply_snapshot_retention_tool,
             # Resource information tools
             list_plans_tool,
             list_images_tool,
             list_locations_tool,
             get_account_info_tool,
+            fleet_summary_tool,
+            # Background job tools
+            submit_job_tool,
+            get_job_tool,
+            list_jobs_tool,
+            cancel_job_tool,
         ]
 
     def get_letscloud_client(self) -> LetsCloudClient:
@@ -101,13 +144,24 @@ class LetsCloudMCPServer:
         if self.letscloud_client is None:
             api_token = os.getenv("LETSCLOUD_API_TOKEN")
             if not api_token:
-                raise McpError("LETSCLOUD_API_TOKEN environment variable is required")
-            self.letscloud_client = LetsCloudClient(api_token)
+                raise McpError(ErrorData(
+                    code=INVALID_REQUEST,
+                    message="LETSCLOUD_API_TOKEN environment variable is required"
+                ))
+            self.letscloud_client = LetsCloudClient(
+                api_token,
+                cache=PersistentCache.from_env(api_token),
+                catalog_ttl=env_float("LETSCLOUD_CATALOG_TTL", 900.0),
+                sidecar=SidecarClient.from_env()
+            )
         return self.letscloud_client
 
 # Create global server instance
 mcp_server = LetsCloudMCPServer()
 
+# Remembers mutating calls so retries do not create duplicate resources
+idempotency_store = IdempotencyStore.from_env()
+
 @server.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
@@ -116,6 +170,26 @@ async def list_tools() -> list[Tool]:
 @server.call_tool()
 async def call_tool(name: str, arguments: dict[str, Any] | None) -> CallToolResult:
     """Handle tool calls."""
+    arguments = dict(arguments or {})
+    if name in JOB_TOOLS:
+        return await _dispatch_job_tool(name, arguments)
+    idempotency_key = arguments.pop(IDEMPOTENCY_KEY_PROPERTY, None)
+    if name in MUTATING_TOOLS:
+        return await idempotency_store.run(
+            name,
+            arguments,
+            lambda: _dispatch_tool(name, arguments),
+            idempotency_key=idempotency_key,
+            is_failure=lambda result: bool(getattr(result, "isError", False)),
+            tenant=current_tenant.get()
+        )
+    return await _dispatch_tool(name, arguments)
+
+# Runs submit_job calls on a bounded worker pool
+job_queue = JobQueue.from_env(call_tool)
+
+async def _dispatch_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
+    """Route a tool call to its handler."""
     try:
         client = mcp_server.get_letscloud_client()
         
@@ -127,6 +201,10 @@ async def call_tool(name: str, arguments: dict[str, Any] | None) -> CallToolResu
             return await _handle_get_server(client, arguments or {})
         elif name == "create_server":
             return await _handle_create_server(client, arguments or {})
+        elif name == "create_servers":
+            return await _handle_create_servers(client, arguments or {})
+        elif name == "reconcile_fleet":
+            return await _handle_reconcile_fleet(client, arguments or {})
         elif name == "delete_server":
             return await _handle_delete_server(client, arguments or {})
         elif name == "reboot_server":
@@ -155,6 +233,10 @@ async def call_tool(name: str, arguments: dict[str, Any] | None) -> CallToolResu
             return await _handle_delete_snapshot(client, arguments or {})
         elif name == "restore_snapshot":
             return await _handle_restore_snapshot(client, arguments or {})
+        elif name == "list_all_snapshots":
+            return await _handle_list_all_snapshots(client, arguments or {})
+        elif name == "apply_snapshot_retention":
+            return await _handle_apply_snapshot_retention(client, arguments or {})
         # Resource information
         elif name == "list_plans":
             return await _handle_list_plans(client, arguments or {})
@@ -164,19 +246,21 @@ async def call_tool(name: str, arguments: dict[str, Any] | None) -> CallToolResu
             return await _handle_list_locations(client, arguments or {})
         elif name == "get_account_info":
             return await _handle_get_account_info(client, arguments or {})
+        elif name == "fleet_summary":
+            return await _handle_fleet_summary(client, arguments or {})
         else:
-            raise McpError(
-                "Method not found",
-                f"Tool '{name}' not found"
-            )
+            raise McpError(ErrorData(
+                code=METHOD_NOT_FOUND,
+                message=f"Tool '{name}' not found"
+            ))
     except McpError:
         raise
     except Exception as e:
-        logger.error(f"Error calling tool {name}: {str(e)}")
-        raise McpError(
-            "Internal error",
-            f"Internal error: {str(e)}"
-        )
+        logger.error("Error calling tool %s: %s", name, e)
+        raise McpError(ErrorData(
+            code=INTERNAL_ERROR,
+            message=f"Internal error: {str(e)}"
+        ))
 
 def _create_success_result(text: str) -> CallToolResult:
     """Create a successful CallToolResult with proper structure."""
@@ -191,47 +275,28 @@ def _create_error_result(error_message: str) -> CallToolResult:
         isError=True
     )
 
+def _create_shaped_result(tool_name: str, data: Any, args: Dict[str, Any]) -> CallToolResult:
+    """Create a CallToolResult shaped by the requested output profile."""
+    try:
+        return _create_success_result(shape_result(tool_name, data, args))
+    except CursorError as e:
+        return _create_error_result(str(e))
+
 # Tool handlers
 async def _handle_list_servers(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
     """Handle list servers tool call."""
     try:
-        servers = await client.list_servers()
+        servers = await client.list_instances()
+        report_progress(0, len(servers), f"Fetched {len(servers)} instances")
         
-        # Format servers data for better display
-        formatted_output = f"🖥️  **SUAS {len(servers)} INSTÂNCIAS LETSCLOUD:**\n\n"
+        pieces = []
+        for piece in render_servers(servers, args.get("format", "detailed"), args.get("locale")):
+            pieces.append(piece)
+            emit_chunk(piece)
         
-        for i, instance in enumerate(servers, 1):
-            label = instance.get('label', 'Sem nome')
-            location = instance.get('location', {})
-            city = location.get('city', 'N/A')
-            country = location.get('country', 'N/A')
-            ip_addresses = instance.get('ip_addresses', [])
-            primary_ip = ip_addresses[0].get('address') if ip_addresses else 'N/A'
-            memory = instance.get('memory', 0)
-            cpus = instance.get('cpus', 0)
-            identifier = instance.get('identifier', 'N/A')
-            
-            memory_gb = f"{memory // 1024}GB" if memory >= 1024 else f"{memory}MB"
-            
-            # Status
-            status = "✅ Ativa"
-            if not instance.get('built'):
-                status = "🔄 Construindo"
-            elif not instance.get('booted'):
-                status = "⏹️  Parada"
-            elif instance.get('suspended'):
-                status = "⏸️  Suspensa"
-            
-            formatted_output += f"**{i}. {label}**\n"
-            formatted_output += f"   🆔 ID: {identifier}\n"
-            formatted_output += f"   📍 Local: {city}, {country}\n"
-            formatted_output += f"   🌐 IP: {primary_ip}\n"
-            formatted_output += f"   ⚡ Recursos: {cpus} vCPU, {memory_gb} RAM\n"
-            formatted_output += f"   📊 Status: {status}\n\n"
-        
-        return _create_success_result(formatted_output)
+        return _create_success_result("".join(pieces))
     except Exception as e:
-        logger.error(f"Error listing servers: {str(e)}")
+        logger.error("Error listing servers: %s", e)
         return _create_error_result(f"Failed to list servers: {str(e)}")
 
 async def _handle_get_server(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -242,9 +307,9 @@ async def _handle_get_server(client: LetsCloudClient, args: Dict[str, Any]) -> C
     
     try:
         server_info = await client.get_server(int(server_id))
-        return _create_success_result(json.dumps(server_info, indent=2))
+        return _create_shaped_result("get_server", server_info, args)
     except Exception as e:
-        logger.error(f"Error getting server {server_id}: {str(e)}")
+        logger.error("Error getting server %s: %s", server_id, e)
         return _create_error_result(f"Failed to get server: {str(e)}")
 
 async def _handle_create_server(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -255,12 +320,97 @@ async def _handle_create_server(client: LetsCloudClient, args: Dict[str, Any]) -
             return _create_error_result(f"{field} is required")
     
     try:
+        problems = await validate_server_request(client, args)
+        if problems:
+            return _create_error_result("; ".join(problems))
+        
         server_info = await client.create_server(args)
         return _create_success_result(json.dumps(server_info, indent=2))
     except Exception as e:
-        logger.error(f"Error creating server: {str(e)}")
+        logger.error("Error creating server: %s", e)
         return _create_error_result(f"Failed to create server: {str(e)}")
 
+async def _handle_create_servers(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
+    """Handle bulk create servers tool call."""
+    try:
+        labels = build_labels(args)
+    except ValueError as e:
+        return _create_error_result(str(e))
+    
+    try:
+        problems = await validate_server_request(client, args)
+        if problems:
+            return _create_error_result("; ".join(problems))
+        
+        report = await create_batch(client, args, labels)
+        summary: Dict[str, Any] = {
+            "requested": len(labels),
+            "created": sum(1 for item in report if item["status"] == "created"),
+            "failed": sum(1 for item in report if item["status"] == "failed")
+        }
+        if summary["failed"]:
+            # Results are remembered per idempotency key; retry these with new arguments
+            summary["failed_labels"] = [
+                item["label"] for item in report if item["status"] == "failed"
+            ]
+    except Exception as e:
+        logger.error("Error creating servers: %s", e)
+        return _create_error_result(f"Failed to create servers: {str(e)}")
+    
+    if args.get("wait") and summary["created"]:
+        # The servers exist now: a failed wait must not hide the report
+        try:
+            summary["all_built"] = await wait_until_built(
+                client, report, timeout=float(args.get("wait_timeout", 600))
+            )
+        except Exception as e:
+            logger.warning("Waiting for servers to build failed: %s", e)
+            summary["all_built"] = False
+            summary["wait_error"] = str(e)
+    summary["servers"] = report
+    return _create_success_result(
+        json.dumps(summary, separators=(",", ":"), ensure_ascii=False)
+    )
+
+async def _handle_reconcile_fleet(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
+    """Handle reconcile fleet tool call."""
+    dry_run = bool(args.get("dry_run", True))
+    try:
+        inventory = await client.list_servers()
+        try:
+            plan = build_plan(
+                args.get("servers") or [],
+                inventory,
+                prune=bool(args.get("prune", False)),
+                label_prefix=args.get("label_prefix"),
+                confirm_delete_all=bool(args.get("confirm_delete_all", False))
+            )
+        except ValueError as e:
+            return _create_error_result(str(e))
+        
+        problems = await validate_plan(client, plan)
+        if problems:
+            return _create_error_result("; ".join(problems))
+        
+        report: Dict[str, Any] = {
+            "dry_run": dry_run,
+            "plan": [action.describe() for action in plan.actions],
+            "unchanged": plan.unchanged
+        }
+        if plan.drift:
+            report["drift"] = plan.drift
+        if not dry_run and plan.actions:
+            results = await apply_plan(
+                client, plan, build_timeout=float(args.get("build_timeout", 600))
+            )
+            report.pop("plan")
+            report["results"] = results
+            report["failed"] = sum(1 for item in results if item["status"] != "done")
+        return _create_success_result(json.dumps(report, separators=(",", ":"), ensure_ascii=False))
+    except Exception as e:
+        logger.error("Error reconciling fleet: %s", e)
+        return _create_error_result(f"Failed to reconcile fleet: {str(e)}")
+
 async def _handle_delete_server(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
     """Handle delete server tool call."""
     server_id = args.get("server_id")
@@ -271,16 +421,16 @@ async def _handle_delete_server(client: LetsCloudClient, args: Dict[str, Any]) -
         await client.delete_server(int(server_id))
         return _create_success_result(f"Server {server_id} deleted successfully")
     except Exception as e:
-        logger.error(f"Error deleting server {server_id}: {str(e)}")
+        logger.error("Error deleting server %s: %s", server_id, e)
         return _create_error_result(f"Failed to delete server: {str(e)}")
 
 async def _handle_list_ssh_keys(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
     """Handle list SSH keys tool call."""
     try:
         ssh_keys = await client.list_ssh_keys()
-        return _create_success_result(json.dumps(ssh_keys, indent=2))
+        return _create_shaped_result("list_ssh_keys", ssh_keys, args)
     except Exception as e:
-        logger.error(f"Error listing SSH keys: {str(e)}")
+        logger.error("Error listing SSH keys: %s", e)
         return _create_error_result(f"Failed to list SSH keys: {str(e)}")
 
 async def _handle_create_ssh_key(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -294,7 +444,7 @@ async def _handle_create_ssh_key(client: LetsCloudClient, args: Dict[str, Any])
         ssh_key = await client.create_ssh_key(args)
         return _create_success_result(json.dumps(ssh_key, indent=2))
     except Exception as e:
-        logger.error(f"Error creating SSH key: {str(e)}")
+        logger.error("Error creating SSH key: %s", e)
         return _create_error_result(f"Failed to create SSH key: {str(e)}")
 
 async def _handle_delete_ssh_key(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -307,7 +457,7 @@ async def _handle_delete_ssh_key(client: LetsCloudClient, args: Dict[str, Any])
         await client.delete_ssh_key(int(key_id))
         return _create_success_result(f"SSH key {key_id} deleted successfully")
     except Exception as e:
-        logger.error(f"Error deleting SSH key {key_id}: {str(e)}")
+        logger.error("Error deleting SSH key %s: %s", key_id, e)
         return _create_error_result(f"Failed to delete SSH key: {str(e)}")
 
 async def _handle_create_snapshot(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -320,7 +470,7 @@ async def _handle_create_snapshot(client: LetsCloudClient, args: Dict[str, Any])
         snapshot = await client.create_snapshot(int(server_id), args)
         return _create_success_result(json.dumps(snapshot, indent=2))
     except Exception as e:
-        logger.error(f"Error creating snapshot: {str(e)}")
+        logger.error("Error creating snapshot: %s", e)
         return _create_error_result(f"Failed to create snapshot: {str(e)}")
 
 async def _handle_list_snapshots(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -331,9 +481,9 @@ async def _handle_list_snapshots(client: LetsCloudClient, args: Dict[str, Any])
     
     try:
         snapshots = await client.list_snapshots(int(server_id))
-        return _create_success_result(json.dumps(snapshots, indent=2))
+        return _create_shaped_result("list_snapshots", snapshots, args)
     except Exception as e:
-        logger.error(f"Error listing snapshots: {str(e)}")
+        logger.error("Error listing snapshots: %s", e)
         return _create_error_result(f"Failed to list snapshots: {str(e)}")
 
 async def _handle_delete_snapshot(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -347,7 +497,7 @@ async def _handle_delete_snapshot(client: LetsCloudClient, args: Dict[str, Any])
         await client.delete_snapshot(int(server_id), int(snapshot_id))
         return _create_success_result(f"Snapshot {snapshot_id} deleted successfully")
     except Exception as e:
-        logger.error(f"Error deleting snapshot: {str(e)}")
+        logger.error("Error deleting snapshot: %s", e)
         return _create_error_result(f"Failed to delete snapshot: {str(e)}")
 
 async def _handle_restore_snapshot(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -361,7 +511,7 @@ async def _handle_restore_snapshot(client: LetsCloudClient, args: Dict[str, Any]
         result = await client.restore_snapshot(int(server_id), int(snapshot_id))
         return _create_success_result(json.dumps(result, indent=2))
     except Exception as e:
-        logger.error(f"Error restoring snapshot: {str(e)}")
+        logger.error("Error restoring snapshot: %s", e)
         return _create_error_result(f"Failed to restore snapshot: {str(e)}")
 
 async def _handle_reboot_server(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -374,7 +524,7 @@ async def _handle_reboot_server(client: LetsCloudClient, args: Dict[str, Any]) -
         result = await client.reboot_server(int(server_id))
         return _create_success_result(json.dumps(result, indent=2))
     except Exception as e:
-        logger.error(f"Error rebooting server {server_id}: {str(e)}")
+        logger.error("Error rebooting server %s: %s", server_id, e)
         return _create_error_result(f"Failed to reboot server: {str(e)}")
 
 async def _handle_shutdown_server(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -387,7 +537,7 @@ async def _handle_shutdown_server(client: LetsCloudClient, args: Dict[str, Any])
         result = await client.shutdown_server(int(server_id))
         return _create_success_result(json.dumps(result, indent=2))
     except Exception as e:
-        logger.error(f"Error shutting down server {server_id}: {str(e)}")
+        logger.error("Error shutting down server %s: %s", server_id, e)
         return _create_error_result(f"Failed to shutdown server: {str(e)}")
 
 async def _handle_start_server(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
@@ -400,7 +550,7 @@ async def _handle_start_server(client: LetsCloudClient, args: Dict[str, Any]) ->
         result = await client.start_server(int(server_id))
         return _create_success_result(json.dumps(result, indent=2))
     except Exception as e:
-        logger.error(f"Error starting server {server_id}: {str(e)}")
+        logger.error("Error starting server %s: %s", server_id, e)
         return _create_error_result(f"Failed to start server: {str(e)}")
 
 # SSH key management handlers
@@ -412,9 +562,9 @@ async def _handle_get_ssh_key(client: LetsCloudClient, args: Dict[str, Any]) ->
     
     try:
         ssh_key = await client.get_ssh_key(int(key_id))
-        return _create_success_result(json.dumps(ssh_key, indent=2))
+        return _create_shaped_result("get_ssh_key", ssh_key, args)
     except Exception as e:
-        logger.error(f"Error getting SSH key {key_id}: {str(e)}")
+        logger.error("Error getting SSH key %s: %s", key_id, e)
         return _create_error_result(f"Failed to get SSH key: {str(e)}")
 
 # Snapshot management handlers
@@ -427,73 +577,223 @@ async def _handle_get_snapshot(client: LetsCloudClient, args: Dict[str, Any]) ->
     
     try:
         snapshot = await client.get_snapshot(int(server_id), int(snapshot_id))
-        return _create_success_result(json.dumps(snapshot, indent=2))
+        return _create_shaped_result("get_snapshot", snapshot, args)
     except Exception as e:
-        logger.error(f"Error getting snapshot: {str(e)}")
+        logger.error("Error getting snapshot: %s", e)
         return _create_error_result(f"Failed to get snapshot: {str(e)}")
 
+async def _handle_list_all_snapshots(
+    client: LetsCloudClient,
+    args: Dict[str, Any]
+) -> CallToolResult:
+    """Handle list all snapshots tool call."""
+    try:
+        rows, errors = await collect_fleet_snapshots(
+            client,
+            server_ids=args.get("server_ids"),
+            refresh=bool(args.get("refresh", False))
+        )
+        rows = filter_rows(
+            rows,
+            older_than_days=args.get("older_than_days"),
+            newer_than_days=args.get("newer_than_days"),
+            label_contains=args.get("label_contains"),
+            min_size=args.get("min_size")
+        )
+        rows = sort_rows(rows, args.get("sort_by", "age"), bool(args.get("descending", True)))
+        total = len(rows)
+        if args.get("limit"):
+            rows = rows[:int(args["limit"])]
+        
+        table = to_table(rows)
+        table["total"] = total
+        if errors:
+            table["errors"] = errors
+        return _create_success_result(json.dumps(table, separators=(",", ":"), ensure_ascii=False))
+    except Exception as e:
+        logger.error("Error listing all snapshots: %s", e)
+        return _create_error_result(f"Failed to list all snapshots: {str(e)}")
+
+async def _handle_apply_snapshot_retention(
+    client: LetsCloudClient,
+    args: Dict[str, Any]
+) -> CallToolResult:
+    """Handle apply snapshot retention tool call."""
+    dry_run = bool(args.get("dry_run", True))
+    try:
+        # Always plan deletions against fresh data
+        rows, errors = await collect_fleet_snapshots(
+            client,
+            server_ids=args.get("server_ids"),
+            refresh=not dry_run
+        )
+        if args.get("label_contains"):
+            rows = filter_rows(rows, label_contains=args["label_contains"])
+        try:
+            keep, delete = plan_retention(
+                rows,
+                keep_last=int(args.get("keep_last", 0)),
+                keep_daily=int(args.get("keep_daily", 0)),
+                keep_weekly=int(args.get("keep_weekly", 0))
+            )
+        except ValueError as e:
+            return _create_error_result(str(e))
+        
+        delete = sort_rows(delete, "server", descending=False)
+        report: Dict[str, Any] = {
+            "dry_run": dry_run,
+            "kept": len(keep),
+            "to_delete": len(delete),
+            "plan": to_table(delete)
+        }
+        if errors:
+            report["errors"] = errors
+        if not dry_run and delete:
+            results = await delete_snapshots(client, delete)
+            report["deleted"] = sum(1 for item in results if item["status"] == "deleted")
+            report["failed"] = [item for item in results if item["status"] == "failed"]
+        return _create_success_result(json.dumps(report, separators=(",", ":"), ensure_ascii=False))
+    except Exception as e:
+        logger.error("Error applying snapshot retention: %s", e)
+        return _create_error_result(f"Failed to apply snapshot retention: {str(e)}")
+
 # Resource information handlers
 async def _handle_list_plans(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
     """Handle list plans tool call."""
     try:
         plans = await client.list_plans()
-        return _create_success_result(json.dumps(plans, indent=2))
+        return _create_shaped_result("list_plans", plans, args)
     except Exception as e:
-        logger.error(f"Error listing plans: {str(e)}")
+        logger.error("Error listing plans: %s", e)
         return _create_error_result(f"Failed to list plans: {str(e)}")
 
 async def _handle_list_images(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
     """Handle list images tool call."""
     try:
         images = await client.list_images()
-        return _create_success_result(json.dumps(images, indent=2))
+        return _create_shaped_result("list_images", images, args)
     except Exception as e:
-        logger.error(f"Error listing images: {str(e)}")
+        logger.error("Error listing images: %s", e)
         return _create_error_result(f"Failed to list images: {str(e)}")
 
 async def _handle_list_locations(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
     """Handle list locations tool call."""
     try:
         locations = await client.list_locations()
-        return _create_success_result(json.dumps(locations, indent=2))
+        return _create_shaped_result("list_locations", locations, args)
     except Exception as e:
-        logger.error(f"Error listing locations: {str(e)}")
+        logger.error("Error listing locations: %s", e)
         return _create_error_result(f"Failed to list locations: {str(e)}")
 
 async def _handle_get_account_info(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
     """Handle get account info tool call."""
     try:
         account_info = await client.get_account_info()
-        return _create_success_result(json.dumps(account_info, indent=2))
+        return _create_shaped_result("get_account_info", account_info, args)
     except Exception as e:
-        logger.error(f"Error getting account info: {str(e)}")
+        logger.error("Error getting account info: %s", e)
         return _create_error_result(f"Failed to get account info: {str(e)}")
 
+# Totals reused across fleet_summary calls so a refresh only processes changes
+fleet_summary = FleetSummary()
+
+async def _handle_fleet_summary(client: LetsCloudClient, args: Dict[str, Any]) -> CallToolResult:
+    """Handle fleet summary tool call."""
+    group_by = args.get("group_by", "location")
+    if group_by not in GROUP_BY:
+        return _create_error_result(f"group_by must be one of: {', '.join(GROUP_BY)}")
+    
+    try:
+        instances, plans = await asyncio.gather(client.list_instances(), client.list_plans())
+        changed = fleet_summary.update(instances, plans)
+        summary = fleet_summary.table(group_by)
+        summary["changed"] = changed
+        return _create_success_result(
+            json.dumps(summary, separators=(",", ":"), ensure_ascii=False)
+        )
+    except Exception as e:
+        logger.error("Error summarizing fleet: %s", e)
+        return _create_error_result(f"Failed to summarize fleet: {str(e)}")
+
+# Background job handlers
+async def _dispatch_job_tool(name: str, args: Dict[str, Any]) -> CallToolResult:
+    """Route a job tool call; these never need the LetsCloud client."""
+    if name == "submit_job":
+        return await _handle_submit_job(args)
+    elif name == "get_job":
+        return _handle_get_job(args)
+    elif name == "list_jobs":
+        return _handle_list_jobs(args)
+    return _handle_cancel_job(args)
+
+async def _handle_submit_job(args: Dict[str, Any]) -> CallToolResult:
+    """Handle submit job tool call."""
+    tool_name = args.get("tool_name")
+    if not tool_name:
+        return _create_error_result("tool_name is required")
+    if tool_name in JOB_TOOLS or tool_name not in {tool.name for tool in mcp_server._tools}:
+        return _create_error_result(f"Tool '{tool_name}' cannot be run as a job")
+    
+    try:
+        job = await job_queue.submit(
+            tool_name, args.get("arguments") or {}, tenant=current_tenant.get()
+        )
+        return _create_success_result(json.dumps(job.describe(), separators=(",", ":")))
+    except JobQueueFull as e:
+        return _create_error_result(str(e))
+
+def _handle_get_job(args: Dict[str, Any]) -> CallToolResult:
+    """Handle get job tool call."""
+    job = job_queue.get(str(args.get("job_id")))
+    if job is None:
+        return _create_error_result(f"Job {args.get('job_id')} not found")
+    return _create_success_result(
+        json.dumps(job.describe(include_result=True), separators=(",", ":"), ensure_ascii=False)
+    )
+
+def _handle_list_jobs(args: Dict[str, Any]) -> CallToolResult:
+    """Handle list jobs tool call."""
+    jobs = [job.describe() for job in job_queue.list(args.get("status"))]
+    return _create_success_result(json.dumps(jobs, separators=(",", ":")))
+
+def _handle_cancel_job(args: Dict[str, Any]) -> CallToolResult:
+    """Handle cancel job tool call."""
+    job = job_queue.cancel(str(args.get("job_id")))
+    if job is None:
+        return _create_error_result(f"Job {args.get('job_id')} not found")
+    return _create_success_result(json.dumps(job.describe(), separators=(",", ":")))
+
 def create_server():
     """Create and return the MCP server instance."""
     return server
 
-async def main():
+async def main(log_level: Optional[str] = None):
     """Main entry point for the MCP server."""
     from mcp.server.stdio import stdio_server
     
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="letscloud-mcp",
-                server_version="1.0.0",
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(
-                        tools_changed=True,
-                        prompts_changed=False,
-                        resources_changed=False
+    configure_logging(log_level)
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="letscloud-mcp",
+                    server_version="1.0.0",
+                    capabilities=server.get_capabilities(
+                        notification_options=NotificationOptions(
+                            tools_changed=True,
+                            prompts_changed=False,
+                            resources_changed=False
+                        ),
+                        experimental_capabilities={},
                     ),
-                    experimental_capabilities={},
                 ),
-            ),
-        )
+            )
+    finally:
+        await job_queue.close()
+        if mcp_server.letscloud_client is not None:
+            await mcp_server.letscloud_client.close()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Response Shaping
+~~~~~~~~~~~~~~~~
+
+Output profiles, field whitelists and budget-aware truncation for tool results.
+
+Read tools accept an ``output_profile`` argument:
+
+- ``summary``: only the handful of fields needed to identify a resource
+- ``compact``: the commonly useful fields, serialized without whitespace
+- ``full``: the upstream payload unchanged, pretty-printed
+
+List results that exceed the configured character or token budget are cut
+and wrapped with a ``next_cursor`` that can be passed back as ``cursor``.
+"""
+
+import base64
+import binascii
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from .config import env_int, env_str
+
+logger = logging.getLogger(__name__)
+
+try:  # Optional dependency for exact token counting
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on environment
+    tiktoken = None
+
+PROFILES = ("summary", "compact", "full")
+DEFAULT_PROFILE = "compact"
+
+# Dotted paths select nested keys; paths through lists apply to each element.
+FIELD_WHITELISTS: Dict[str, Dict[str, List[str]]] = {
+    "server": {
+        "summary": ["identifier", "label", "built", "booted", "suspended"],
+        "compact": [
+            "identifier", "label", "hostname", "built", "booted", "suspended",
+            "cpus", "memory", "disk", "location.slug", "location.city",
+            "location.country", "ip_addresses.address", "created_at",
+        ],
+    },
+    "plan": {
+        "summary": ["slug", "shortcode", "core", "memory", "disk", "monthly_value"],
+        "compact": [
+            "slug", "shortcode", "core", "memory", "disk", "bandwidth",
+            "monthly_value", "hourly_value", "currency", "locations.slug",
+        ],
+    },
+    "image": {
+        "summary": ["slug", "distro"],
+        "compact": ["slug", "distro", "os", "version", "locations.slug"],
+    },
+    "location": {
+        "summary": ["slug", "city", "country"],
+        "compact": ["slug", "city", "country", "available"],
+    },
+    "ssh_key": {
+        "summary": ["id", "title"],
+        "compact": ["id", "title", "fingerprint", "created_at"],
+    },
+    "snapshot": {
+        "summary": ["id", "label", "created_at"],
+        "compact": ["id", "label", "description", "size", "status", "created_at"],
+    },
+    "account": {
+        "summary": ["name", "email", "balance"],
+        "compact": ["name", "email", "company_name", "balance", "currency", "created_at"],
+    },
+}
+
+TOOL_RESOURCES: Dict[str, str] = {
+    "get_server": "server",
+    "list_ssh_keys": "ssh_key",
+    "get_ssh_key": "ssh_key",
+    "list_snapshots": "snapshot",
+    "get_snapshot": "snapshot",
+    "list_plans": "plan",
+    "list_images": "image",
+    "list_locations": "location",
+    "get_account_info": "account",
+}
+
+_encoding: Any = None
+_TREES: Dict[tuple, Dict[str, Any]] = {}
+
+
+class CursorError(ValueError):
+    """Raised when a continuation cursor cannot be decoded."""
+
+
+def max_result_chars() -> int:
+    """Character budget for a single tool result."""
+    return env_int("LETSCLOUD_MAX_RESULT_CHARS", 24000)
+
+
+def max_result_tokens() -> int:
+    """Token budget for a single tool result (0 disables the check)."""
+    return env_int("LETSCLOUD_MAX_RESULT_TOKENS", 6000)
+
+
+def resolve_profile(args: Dict[str, Any]) -> str:
+    """Pick the output profile for a call, falling back to the configured default."""
+    profile = args.get("output_profile") or env_str("LETSCLOUD_OUTPUT_PROFILE", DEFAULT_PROFILE)
+    return profile if profile in PROFILES else DEFAULT_PROFILE
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when available, otherwise estimate."""
+    global _encoding
+    if tiktoken is not None and _encoding is None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:  # Encoding files may be unavailable offline
+            logger.debug("tiktoken unavailable, estimating tokens: %s", e)
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+def encode_cursor(tool_name: str, offset: int) -> str:
+    """Build an opaque continuation cursor."""
+    raw = json.dumps({"t": tool_name, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(tool_name: str, cursor: Optional[str]) -> int:
+    """Decode a continuation cursor into a list offset."""
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(payload["o"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise CursorError(f"Invalid cursor: {cursor}") from e
+    if payload.get("t") != tool_name or offset < 0:
+        raise CursorError(f"Cursor does not belong to {tool_name}")
+    return offset
+
+
+def _field_tree(fields: List[str]) -> Dict[str, Any]:
+    """Turn dotted field paths into a nested selection tree."""
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        for key in field.split("."):
+            node = node.setdefault(key, {})
+    return tree
+
+
+def _select(value: Any, tree: Dict[str, Any]) -> Any:
+    """Apply a selection tree to a value, mapping over lists."""
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_select(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _select(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+def project_fields(item: Any, fields: List[str]) -> Any:
+    """Keep only the whitelisted fields of an item."""
+    if not isinstance(item, dict):
+        return item
+    key = tuple(fields)
+    tree = _TREES.get(key)
+    if tree is None:
+        tree = _TREES[key] = _field_tree(fields)
+    shaped = _select(item, tree)
+    # Never hide a resource completely because the upstream schema changed
+    return shaped or item
+
+
+def _dumps(data: Any, profile: str) -> str:
+    """Serialize according to the profile."""
+    if profile == "full":
+        return json.dumps(data, indent=2)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _shape_item(item: Any, resource: Optional[str], profile: str) -> Any:
+    """Apply the whitelist for a resource type."""
+    if profile == "full" or resource is None:
+        return item
+    fields = FIELD_WHITELISTS.get(resource, {}).get(profile)
+    return project_fields(item, fields) if fields else item
+
+
+def shape_result(tool_name: str, data: Any, args: Dict[str, Any]) -> str:
+    """
+    Shape a tool result according to the requested profile and budgets.
+
+    Args:
+        tool_name: Name of the tool that produced the data
+        data: Raw upstream data (dict or list)
+        args: Tool call arguments (output_profile, cursor)
+
+    Returns:
+        Serialized result text
+
+    Raises:
+        CursorError: If the cursor is invalid for this tool
+    """
+    profile = resolve_profile(args)
+    resource = TOOL_RESOURCES.get(tool_name)
+
+    if not isinstance(data, list):
+        return _dumps(_shape_item(data, resource, profile), profile)
+
+    offset = decode_cursor(tool_name, args.get("cursor"))
+    char_budget = max_result_chars()
+    token_budget = max_result_tokens()
+
+    if offset == 0:
+        text = _dumps([_shape_item(item, resource, profile) for item in data], profile)
+        if _within_budget(text, char_budget, token_budget):
+            return text
+
+    chunks: List[str] = []
+    used_chars = 2
+    used_tokens = 1
+    index = offset
+    while index < len(data):
+        text = _dumps(_shape_item(data[index], resource, profile), profile)
+        tokens = count_tokens(text) if token_budget > 0 else 0
+        over_chars = char_budget > 0 and used_chars + len(text) + 1 > char_budget
+        over_tokens = token_budget > 0 and used_tokens + tokens > token_budget
+        if chunks and (over_chars or over_tokens):
+            break
+        chunks.append(text)
+        used_chars += len(text) + 1
+        used_tokens += tokens
+        index += 1
+
+    envelope = {
+        "total": len(data),
+        "offset": offset,
+        "returned": len(chunks),
+        "next_cursor": encode_cursor(tool_name, index) if index < len(data) else None,
+    }
+    separator = ",\n" if profile == "full" else ","
+    head = _dumps(envelope, "compact")
+    return head[:-1] + ',"items":[' + separator.join(chunks) + "]}"
+
+
+def _within_budget(text: str, char_budget: int, token_budget: int) -> bool:
+    """Check a serialized result against the configured budgets."""
+    if char_budget > 0 and len(text) > char_budget:
+        return False
+    return token_budget <= 0 or count_tokens(text) <= token_budget
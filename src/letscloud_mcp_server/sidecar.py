@@ -0,0 +1,408 @@
+"""
+Sidecar Cache Daemon
+~~~~~~~~~~~~~~~~~~~~
+
+Shares LetsCloud GET results between stdio server processes.
+
+MCP hosts spawn one stdio server per conversation. When the daemon is
+running (``python -m letscloud_mcp_server --sidecar``), those processes
+send their GETs to it over a Unix socket. The daemon serves fresh entries
+from a shared cache, coalesces concurrent identical requests into one
+upstream call, and spends a single per-account rate budget. Without the
+daemon the client falls back to calling the API directly.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "get", "token": ..., "endpoint": ..., "params": {...}}
+    {"op": "invalidate", "token": ..., "prefix": ...}
+Replies are ``{"data": ...}`` or ``{"error": {"status": ..., "message": ...}}``.
+
+Requests carry the API token, so the socket is created with mode 0600 and
+clients only connect to a socket owned by their own user, not accessible
+by others, in a directory other users cannot replace it in. Without
+``XDG_RUNTIME_DIR`` the default socket lives in a private 0700 directory
+under the temp dir. Messages larger than LETSCLOUD_SIDECAR_MAX_MESSAGE make
+the client fall back to calling the API directly.
+
+Settings:
+    LETSCLOUD_SIDECAR: Use the daemon when its socket exists (default true)
+    LETSCLOUD_SIDECAR_SOCKET: Socket path (default $XDG_RUNTIME_DIR or the temp dir)
+    LETSCLOUD_SIDECAR_TTL: Seconds live data (instances, profile...) is shared (default 5)
+    LETSCLOUD_SIDECAR_RATE: Upstream requests per second per account (default 10)
+    LETSCLOUD_SIDECAR_MAX_MESSAGE: Largest message in bytes (default 64 MiB)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from .concurrency import RateLimiter
+from .config import env_bool, env_float, env_int, env_str
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Slow-changing endpoints shared for the catalog TTL rather than the live one
+CATALOG_ENDPOINTS = frozenset({"plans", "images", "locations"})
+
+
+def default_socket_path() -> str:
+    """Per-user socket location."""
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"letscloud-mcp-{os.getuid()}.sock")
+    # The temp dir is shared, so keep the socket in a private directory
+    return os.path.join(tempfile.gettempdir(), f"letscloud-mcp-{os.getuid()}", "sidecar.sock")
+
+
+def max_message_size() -> int:
+    """Largest protocol message in bytes (LETSCLOUD_SIDECAR_MAX_MESSAGE)."""
+    return env_int("LETSCLOUD_SIDECAR_MAX_MESSAGE", 64 * 1024 * 1024)
+
+
+def untrusted_reason(path: str) -> Optional[str]:
+    """
+    Why a socket must not be sent tokens, or None if it is safe.
+
+    The socket must belong to the current user, be closed to group and
+    others, and sit in a directory only its owner (or root) can modify,
+    or a sticky one, so nobody else can swap it.
+    """
+    try:
+        info = os.lstat(path)
+        parent = os.stat(os.path.dirname(path) or ".")
+    except OSError as e:
+        return str(e)
+    if not stat.S_ISSOCK(info.st_mode):
+        return "not a socket"
+    if info.st_uid != os.getuid():
+        return f"owned by uid {info.st_uid}"
+    if info.st_mode & 0o077:
+        return "accessible by other users"
+    if parent.st_uid not in (os.getuid(), 0):
+        return f"directory owned by uid {parent.st_uid}"
+    if parent.st_mode & 0o022 and not parent.st_mode & stat.S_ISVTX:
+        return "directory writable by other users"
+    return None
+
+
+def socket_path() -> str:
+    """Socket path from LETSCLOUD_SIDECAR_SOCKET or the default."""
+    return env_str("LETSCLOUD_SIDECAR_SOCKET") or default_socket_path()
+
+
+class SidecarUnavailable(Exception):
+    """The daemon could not be reached; the caller should go direct."""
+
+
+class SidecarClient:
+    """Client side of the daemon protocol used by ``LetsCloudClient``."""
+
+    def __init__(self, path: str, timeout: float = 60.0, retry_interval: float = 30.0):
+        """
+        Initialize the sidecar client.
+
+        Args:
+            path: Daemon socket path
+            timeout: Seconds to wait for a reply
+            retry_interval: Seconds to go direct after the daemon was unreachable
+        """
+        self.path = path
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        self.max_message = max_message_size()
+        self._down_until = 0.0
+        self._warned = False
+
+    @classmethod
+    def from_env(cls) -> Optional["SidecarClient"]:
+        """Build a client unless LETSCLOUD_SIDECAR is disabled."""
+        if not env_bool("LETSCLOUD_SIDECAR", True):
+            return None
+        return cls(socket_path())
+
+    @property
+    def available(self) -> bool:
+        """Whether a request is worth trying (trusted socket present, not backing off)."""
+        if time.monotonic() < self._down_until or not os.path.exists(self.path):
+            return False
+        reason = untrusted_reason(self.path)
+        if reason is not None:
+            if not self._warned:
+                logger.warning("Not using sidecar socket %s: %s", self.path, reason)
+                self._warned = True
+            metrics.inc("sidecar.untrusted")
+            return False
+        return True
+
+    async def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_unix_connection(self.path, limit=self.max_message), timeout=1.0
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            self._down_until = time.monotonic() + self.retry_interval
+            metrics.inc("sidecar.unavailable")
+            raise SidecarUnavailable(str(e)) from e
+        try:
+            writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+            await writer.drain()
+            line = await asyncio.wait_for(reader.readline(), timeout=self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            self._down_until = time.monotonic() + self.retry_interval
+            raise SidecarUnavailable(str(e)) from e
+        except ValueError as e:
+            # Reply larger than the stream limit
+            metrics.inc("sidecar.oversized")
+            raise SidecarUnavailable(f"reply too large: {e}") from e
+        finally:
+            writer.close()
+        if not line:
+            raise SidecarUnavailable("daemon closed the connection")
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            raise SidecarUnavailable(f"invalid reply: {e}") from e
+
+    async def get(
+        self,
+        token: str,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch a GET endpoint through the daemon.
+
+        Raises:
+            SidecarUnavailable: If the daemon cannot be reached
+            httpx.HTTPStatusError: If the API answered with an error status
+            httpx.RequestError: If the daemon could not reach the API
+        """
+        reply = await self._request(
+            {"op": "get", "token": token, "endpoint": endpoint, "params": params or {}}
+        )
+        error = reply.get("error")
+        if error is None:
+            metrics.inc("sidecar.served")
+            return reply.get("data", {})
+        request = httpx.Request("GET", url, params=params)
+        if error.get("status"):
+            response = httpx.Response(
+                error["status"], json={"message": error.get("message")}, request=request
+            )
+            response.raise_for_status()
+        raise httpx.RequestError(error.get("message", "sidecar request failed"), request=request)
+
+    async def invalidate(self, token: str, prefix: str) -> None:
+        """Drop the daemon's cached entries under an endpoint prefix (best effort)."""
+        try:
+            await self._request({"op": "invalidate", "token": token, "prefix": prefix})
+        except SidecarUnavailable:
+            pass
+
+
+class CacheDaemon:
+    """Shared read-through cache with request coalescing and per-account budgets."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[str], Any],
+        ttl: float = 5.0,
+        catalog_ttl: float = 900.0,
+        rate: float = 10.0,
+        max_entries: int = 4096
+    ):
+        """
+        Initialize the daemon.
+
+        Args:
+            client_factory: Builds an upstream ``LetsCloudClient`` for a token
+            ttl: Seconds live data is shared
+            catalog_ttl: Seconds catalog data is shared
+            rate: Upstream requests per second per account (0 disables)
+            max_entries: Cached responses kept across all accounts
+        """
+        self.client_factory = client_factory
+        self.ttl = ttl
+        self.catalog_ttl = catalog_ttl
+        self.rate = rate
+        self.max_entries = max_entries
+        self.max_message = max_message_size()
+        self._clients: Dict[str, Any] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], "asyncio.Future[Any]"] = {}
+
+    @classmethod
+    def from_env(cls, client_factory: Callable[[str], Any]) -> "CacheDaemon":
+        """Build a daemon from LETSCLOUD_SIDECAR_* settings."""
+        return cls(
+            client_factory,
+            ttl=env_float("LETSCLOUD_SIDECAR_TTL", 5.0),
+            catalog_ttl=env_float("LETSCLOUD_CATALOG_TTL", 900.0),
+            rate=env_float("LETSCLOUD_SIDECAR_RATE", 10.0),
+            max_entries=env_int("LETSCLOUD_SIDECAR_SIZE", 4096),
+        )
+
+    @staticmethod
+    def _account(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+    async def fetch(self, token: str, endpoint: str, params: Dict[str, Any]) -> Any:
+        """Serve a GET from the shared cache, joining or starting the upstream call."""
+        account = self._account(token)
+        path = endpoint.strip("/")
+        key = (account, f"{path}?{sorted(params.items())}" if params else path)
+
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            metrics.inc("sidecar.hits")
+            return cached[1]
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            metrics.inc("sidecar.coalesced")
+            return await asyncio.shield(pending)
+
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            client = self._clients.get(account)
+            if client is None:
+                client = self._clients[account] = self.client_factory(token)
+            limiter = self._limiters.get(account)
+            if limiter is None:
+                limiter = RateLimiter(self.rate, burst=max(1, int(self.rate)))
+                self._limiters[account] = limiter
+            await limiter.acquire()
+            metrics.inc("sidecar.upstream")
+            data = await client._make_request("GET", path, params=params or None)
+            ttl = self.catalog_ttl if path in CATALOG_ENDPOINTS else self.ttl
+            self._entries[key] = (time.monotonic() + ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            future.set_result(data)
+            return data
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an error nobody else awaited is not logged as lost
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def invalidate(self, token: str, prefix: str) -> int:
+        """Drop an account's entries whose path starts with prefix."""
+        account = self._account(token)
+        prefix = prefix.strip("/")
+        stale = [key for key in self._entries if key[0] == account and key[1].startswith(prefix)]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    async def _reply(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        token = message.get("token")
+        if not token:
+            return {"error": {"status": 401, "message": "token is required"}}
+        if message.get("op") == "invalidate":
+            return {"data": self.invalidate(token, message.get("prefix", ""))}
+        if message.get("op") != "get":
+            return {"error": {"status": 400, "message": f"Unknown op {message.get('op')!r}"}}
+        try:
+            data = await self.fetch(token, message["endpoint"], message.get("params") or {})
+            return {"data": data}
+        except httpx.HTTPStatusError as e:
+            return {"error": {"status": e.response.status_code, "message": str(e)}}
+        except Exception as e:
+            return {"error": {"status": 0, "message": str(e)}}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer requests on one connection until the peer closes it."""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Oversized request; the stream cannot be resynchronized
+                    reply = {"error": {"status": 413, "message": "request too large"}}
+                    writer.write(json.dumps(reply).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    reply = await self._reply(json.loads(line))
+                except ValueError:
+                    reply = {"error": {"status": 400, "message": "invalid JSON"}}
+                encoded = json.dumps(reply, separators=(",", ":"), default=str)
+                writer.write(encoded.encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, path: str) -> asyncio.AbstractServer:
+        """
+        Listen on a Unix socket readable only by the current user.
+
+        Raises:
+            RuntimeError: If the socket's directory or an existing file at
+                the path could let another user intercept tokens
+        """
+        directory = os.path.dirname(path) or "."
+        if not os.path.exists(directory):
+            os.makedirs(directory, mode=0o700)
+        if os.path.lexists(path):
+            if os.lstat(path).st_uid != os.getuid():
+                raise RuntimeError(f"{path} belongs to another user")
+            os.unlink(path)
+        old_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                self.handle, path=path, limit=self.max_message
+            )
+        finally:
+            os.umask(old_umask)
+        reason = untrusted_reason(path)
+        if reason is not None:
+            server.close()
+            raise RuntimeError(f"Refusing to serve on {path}: {reason}")
+        logger.info("Sidecar cache listening on %s", path)
+        return server
+
+    async def close(self) -> None:
+        """Close upstream clients."""
+        for client in self._clients.values():
+            await client.close()
+        self._clients.clear()
+
+
+async def run_daemon(path: Optional[str] = None) -> None:
+    """Run the sidecar daemon until cancelled."""
+    from .letscloud_client import LetsCloudClient
+
+    daemon = CacheDaemon.from_env(lambda token: LetsCloudClient(token))
+    path = path or socket_path()
+    server = await daemon.serve(path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await daemon.close()
+        if os.path.exists(path):
+            os.unlink(path)
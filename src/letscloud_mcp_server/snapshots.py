@@ -0,0 +1,260 @@
+"""
+Fleet Snapshots
+~~~~~~~~~~~~~~~
+
+Account-wide snapshot collection and retention.
+
+``list_all_snapshots`` enumerates instances once and fetches each server's
+snapshots concurrently under a limit. The per-server lists are cached by the
+client and invalidated when a snapshot is created or deleted through it.
+
+``apply_snapshot_retention`` evaluates keep-last/daily/weekly policies over
+the same rows in-process and deletes the rest concurrently, rate limited.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .concurrency import RateLimiter, gather_limited
+from .config import env_float, env_int
+from .letscloud_client import LetsCloudClient
+from .progress import report_progress
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ("age", "size", "server", "label", "created_at")
+TABLE_COLUMNS = [
+    "server_id", "server_label", "snapshot_id", "label", "size", "created_at", "age_days",
+]
+
+
+def fleet_concurrency() -> int:
+    """Maximum number of per-server requests in flight (LETSCLOUD_FLEET_CONCURRENCY)."""
+    return env_int("LETSCLOUD_FLEET_CONCURRENCY", 8)
+
+
+def delete_rate() -> float:
+    """Snapshot deletions started per second (LETSCLOUD_DELETE_RATE, 0 = unlimited)."""
+    return env_float("LETSCLOUD_DELETE_RATE", 2.0)
+
+
+def snapshot_cache_ttl() -> float:
+    """Seconds a per-server snapshot list may be reused (LETSCLOUD_SNAPSHOT_CACHE_TTL)."""
+    return env_float("LETSCLOUD_SNAPSHOT_CACHE_TTL", 300.0)
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse an API timestamp (ISO 8601 or 'YYYY-MM-DD HH:MM:SS') as UTC."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def server_key(instance: Dict[str, Any]) -> Any:
+    """Identifier used in instance URLs."""
+    return instance.get("identifier") or instance.get("id")
+
+
+def _row(instance: Dict[str, Any], snapshot: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    created = parse_timestamp(snapshot.get("created_at"))
+    return {
+        "server_id": server_key(instance),
+        "server_label": instance.get("label"),
+        "snapshot_id": snapshot.get("id"),
+        "label": snapshot.get("label"),
+        "size": snapshot.get("size"),
+        "created_at": snapshot.get("created_at"),
+        "age_days": round((now - created).total_seconds() / 86400, 1) if created else None,
+    }
+
+
+async def collect_fleet_snapshots(
+    client: LetsCloudClient,
+    server_ids: Optional[Iterable[Any]] = None,
+    refresh: bool = False
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Fetch snapshots for many servers concurrently.
+
+    Args:
+        client: LetsCloud API client
+        server_ids: Restrict to these servers (default: every instance)
+        refresh: Ignore cached per-server lists
+
+    Returns:
+        Tuple of (snapshot rows, errors keyed by server id)
+    """
+    instances = await client.list_servers()
+    if server_ids is not None:
+        wanted = {str(server_id) for server_id in server_ids}
+        instances = [
+            instance for instance in instances
+            if str(server_key(instance)) in wanted or str(instance.get("id")) in wanted
+        ]
+
+    max_age = 0.0 if refresh else snapshot_cache_ttl()
+    results = await gather_limited(
+        instances,
+        lambda instance: client.list_snapshots(server_key(instance), max_age=max_age),
+        limit=fleet_concurrency(),
+        on_done=lambda done, total: report_progress(done, total),
+    )
+
+    now = datetime.now(timezone.utc)
+    rows: List[Dict[str, Any]] = []
+    errors: Dict[str, str] = {}
+    for instance, result in zip(instances, results):
+        if isinstance(result, BaseException):
+            logger.warning("Listing snapshots failed for %s: %s", server_key(instance), result)
+            errors[str(server_key(instance))] = str(result)
+            continue
+        rows.extend(_row(instance, snapshot, now) for snapshot in result)
+    return rows, errors
+
+
+def _as_number(value: Any) -> float:
+    """Best-effort numeric value of a size field."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def filter_rows(
+    rows: List[Dict[str, Any]],
+    older_than_days: Optional[float] = None,
+    newer_than_days: Optional[float] = None,
+    label_contains: Optional[str] = None,
+    min_size: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """Apply the optional age, label and size filters."""
+    needle = label_contains.lower() if label_contains else None
+
+    def keep(row: Dict[str, Any]) -> bool:
+        age = row["age_days"]
+        if older_than_days is not None and (age is None or age < older_than_days):
+            return False
+        if newer_than_days is not None and (age is None or age > newer_than_days):
+            return False
+        if needle and needle not in str(row["label"] or "").lower():
+            return False
+        if min_size is not None and _as_number(row["size"]) < min_size:
+            return False
+        return True
+
+    return [row for row in rows if keep(row)]
+
+
+def sort_rows(rows: List[Dict[str, Any]], sort_by: str = "age",
+              descending: bool = True) -> List[Dict[str, Any]]:
+    """Sort rows by one of SORT_KEYS; rows missing the key sort last."""
+    field = {
+        "age": "age_days",
+        "size": "size",
+        "server": "server_label",
+        "label": "label",
+        "created_at": "created_at",
+    }.get(sort_by, "age_days")
+    present = [row for row in rows if row[field] is not None]
+    missing = [row for row in rows if row[field] is None]
+    # Numbers compare numerically; anything else compares as text
+    present.sort(
+        key=lambda row: (0, row[field], "") if isinstance(row[field], (int, float))
+        else (1, 0, str(row[field]).lower()),
+        reverse=descending,
+    )
+    return present + missing
+
+
+def to_table(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Render rows column-wise, which is far smaller than a list of dicts."""
+    return {
+        "columns": TABLE_COLUMNS,
+        "rows": [[row[column] for column in TABLE_COLUMNS] for row in rows],
+    }
+
+
+def plan_retention(
+    rows: List[Dict[str, Any]],
+    keep_last: int = 0,
+    keep_daily: int = 0,
+    keep_weekly: int = 0
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split snapshot rows into keep and delete sets, per server.
+
+    For each server, snapshots are ordered newest first. ``keep_last`` keeps
+    the newest N; ``keep_daily``/``keep_weekly`` keep the newest snapshot of
+    each of the N most recent days/ISO weeks that have one. Snapshots with
+    an unknown creation time are always kept.
+
+    Returns:
+        Tuple of (rows to keep, rows to delete)
+
+    Raises:
+        ValueError: If no policy would keep anything
+    """
+    if keep_last <= 0 and keep_daily <= 0 and keep_weekly <= 0:
+        raise ValueError("At least one of keep_last, keep_daily or keep_weekly must be positive")
+
+    by_server: Dict[Any, List[Tuple[datetime, Dict[str, Any]]]] = {}
+    keep: List[Dict[str, Any]] = []
+    for row in rows:
+        created = parse_timestamp(row["created_at"])
+        if created is None:
+            keep.append(row)
+            continue
+        by_server.setdefault(row["server_id"], []).append((created, row))
+
+    delete: List[Dict[str, Any]] = []
+    for entries in by_server.values():
+        entries.sort(key=lambda entry: entry[0], reverse=True)
+        kept = set()
+        for index in range(min(keep_last, len(entries))):
+            kept.add(index)
+        for count, bucket in ((keep_daily, lambda d: d.date()),
+                              (keep_weekly, lambda d: d.isocalendar()[:2])):
+            seen = set()
+            for index, (created, _) in enumerate(entries):
+                if len(seen) >= count:
+                    break
+                period = bucket(created)
+                if period not in seen:
+                    seen.add(period)
+                    kept.add(index)
+        for index, (_, row) in enumerate(entries):
+            (keep if index in kept else delete).append(row)
+    return keep, delete
+
+
+async def delete_snapshots(
+    client: LetsCloudClient,
+    rows: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Delete snapshots concurrently under the fleet limit and delete rate.
+
+    Returns:
+        One result per row with status ``deleted`` or ``failed``
+    """
+    results = await gather_limited(
+        rows,
+        lambda row: client.delete_snapshot(row["server_id"], row["snapshot_id"]),
+        limit=fleet_concurrency(),
+        on_done=lambda done, total: report_progress(done, total, "Deleting snapshots"),
+        rate_limiter=RateLimiter(delete_rate(), burst=fleet_concurrency()),
+    )
+    report = []
+    for row, result in zip(rows, results):
+        item = {"server_id": row["server_id"], "snapshot_id": row["snapshot_id"],
+                "label": row["label"], "status": "deleted"}
+        if isinstance(result, BaseException):
+            item["status"] = "failed"
+            item["error"] = str(result)
+        report.append(item)
+    return report
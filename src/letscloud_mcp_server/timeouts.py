@@ -0,0 +1,204 @@
+"""
+Adaptive Timeouts
+~~~~~~~~~~~~~~~~~
+
+Per-endpoint-class request timeouts derived from observed latency.
+
+Requests are grouped into classes (cheap catalog reads, other reads,
+writes, slow writes such as instance creation and snapshot restore). Each
+class keeps a rolling latency histogram; its timeout is a multiple of the
+recent p99, clamped between a floor and a ceiling, and starts at the
+ceiling until enough samples exist. A hung ``profile`` call therefore fails
+in seconds while ``restore`` keeps the time it needs. p50/p95/p99 per class
+are published as ``upstream.latency.<class>.*`` gauges.
+
+Settings:
+    LETSCLOUD_TIMEOUTS: Per-class ``floor:ceiling`` (or fixed seconds), e.g.
+        ``catalog=0.5:5,slow=60:600,read=15``
+    LETSCLOUD_TIMEOUT_MULTIPLIER: Multiple of p99 used as the timeout (default 3)
+"""
+
+import bisect
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .config import env_float, env_str
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CATALOG_ENDPOINTS = frozenset({"plans", "images", "locations", "profile"})
+
+# Class -> (floor, ceiling) in seconds
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "catalog": (1.0, 10.0),
+    "read": (2.0, 30.0),
+    "write": (5.0, 60.0),
+    "slow": (30.0, 300.0),
+}
+
+
+def endpoint_class(method: str, endpoint: str) -> str:
+    """Timeout class of a request."""
+    path = endpoint.strip("/")
+    if method.upper() == "GET":
+        return "catalog" if path.split("/", 1)[0] in CATALOG_ENDPOINTS else "read"
+    if method.upper() == "POST" and (
+        path == "instances" or path.endswith("/restore") or path.endswith("/snapshots")
+    ):
+        return "slow"
+    return "write"
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram over a rolling window.
+
+    Two generations of counts are kept; every ``window`` seconds the older
+    one is dropped, so quantiles reflect the last one to two windows.
+    Recording and quantile queries are O(log buckets) and O(buckets).
+    """
+
+    # 1ms .. ~10min, each bucket 20% wider than the previous
+    BOUNDS: List[float] = [0.001 * 1.2 ** i for i in range(74)]
+
+    def __init__(self, window: float = 300.0):
+        self.window = window
+        self._current = [0] * (len(self.BOUNDS) + 1)
+        self._previous = [0] * (len(self.BOUNDS) + 1)
+        self._rotated = time.monotonic()
+
+    def _rotate(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._rotated
+        if elapsed >= self.window:
+            empty = [0] * len(self._current)
+            # After a whole idle window the current counts are too old to keep
+            self._previous = self._current if elapsed < 2 * self.window else empty
+            self._current = list(empty)
+            self._rotated = now
+
+    def record(self, seconds: float) -> None:
+        """Add one observation."""
+        self._rotate()
+        self._current[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+
+    @property
+    def count(self) -> int:
+        """Observations in the window."""
+        self._rotate()
+        return sum(self._current) + sum(self._previous)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile q, or None without data."""
+        self._rotate()
+        counts = [a + b for a, b in zip(self._current, self._previous)]
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = math.ceil(q * total)
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return self.BOUNDS[min(index, len(self.BOUNDS) - 1)]
+        return self.BOUNDS[-1]
+
+
+@dataclass
+class _ClassState:
+    floor: float
+    ceiling: float
+    histogram: LatencyHistogram
+    timeout: float
+    pending: int = 0
+
+
+def parse_limits(value: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    """Parse ``class=floor:ceiling`` / ``class=seconds`` pairs, ignoring bad ones."""
+    limits: Dict[str, Tuple[float, float]] = {}
+    for pair in (value or "").split(","):
+        name, _, spec = pair.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_LIMITS:
+            continue
+        low, _, high = spec.partition(":")
+        try:
+            floor = float(low)
+            ceiling = float(high) if high else floor
+        except ValueError:
+            continue
+        if 0 < floor <= ceiling:
+            limits[name] = (floor, ceiling)
+    return limits
+
+
+class TimeoutPolicy:
+    """Chooses a timeout per request class and learns from observed latency."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        multiplier: float = 3.0,
+        min_samples: int = 20,
+        refresh_every: int = 10
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            limits: Per-class (floor, ceiling) overriding DEFAULT_LIMITS
+            multiplier: Timeout as a multiple of the class p99
+            min_samples: Observations needed before adapting (until then the ceiling applies)
+            refresh_every: Observations between recomputing a class timeout
+        """
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.refresh_every = max(1, refresh_every)
+        merged = {**DEFAULT_LIMITS, **(limits or {})}
+        self._classes = {
+            name: _ClassState(floor, ceiling, LatencyHistogram(), ceiling)
+            for name, (floor, ceiling) in merged.items()
+        }
+
+    @classmethod
+    def from_env(cls) -> "TimeoutPolicy":
+        """Build a policy from LETSCLOUD_TIMEOUTS and LETSCLOUD_TIMEOUT_MULTIPLIER."""
+        return cls(
+            limits=parse_limits(env_str("LETSCLOUD_TIMEOUTS")),
+            multiplier=env_float("LETSCLOUD_TIMEOUT_MULTIPLIER", 3.0),
+        )
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Latency histogram of a class."""
+        return self._classes[name].histogram
+
+    def timeout_for(self, method: str, endpoint: str) -> float:
+        """Seconds to allow a request before giving up."""
+        return self._classes[endpoint_class(method, endpoint)].timeout
+
+    def observe(self, method: str, endpoint: str, seconds: float, timed_out: bool = False) -> None:
+        """Record how long a request took (or that it hit its timeout)."""
+        name = endpoint_class(method, endpoint)
+        state = self._classes[name]
+        state.histogram.record(seconds)
+        if timed_out:
+            metrics.inc(f"upstream.timeouts.{name}")
+        state.pending += 1
+        if state.pending >= self.refresh_every:
+            state.pending = 0
+            self._refresh(name, state)
+
+    def _refresh(self, name: str, state: _ClassState) -> None:
+        histogram = state.histogram
+        p99 = histogram.quantile(0.99)
+        if p99 is None:
+            return
+        for label, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            metrics.set_gauge(f"upstream.latency.{name}.{label}", round(histogram.quantile(q), 4))
+        if histogram.count >= self.min_samples:
+            state.timeout = min(state.ceiling, max(state.floor, p99 * self.multiplier))
+        metrics.set_gauge(f"upstream.timeout.{name}", round(state.timeout, 3))
@@ -8,13 +8,43 @@ Each tool corresponds to a LetsCloud API operation.
 
 from mcp.types import Tool
 
+# Shared optional properties for read tools (see shaping.py)
+output_profile_property = {
+    "type": "string",
+    "enum": ["summary", "compact", "full"],
+    "description": "Level of detail: summary, compact or full (optional)"
+}
+
+cursor_property = {
+    "type": "string",
+    "description": "Continuation cursor returned by a previous truncated result (optional)"
+}
+
+idempotency_key_property = {
+    "type": "string",
+    "description": (
+        "Retry-safe key: repeated calls with the same key return the original result (optional)"
+    )
+}
+
 # Server Management Tools
 list_servers_tool = Tool(
     name="list_servers",
     description="List all instances in your LetsCloud account",
     inputSchema={
         "type": "object",
-        "properties": {},
+        "properties": {
+            "format": {
+                "type": "string",
+                "enum": ["detailed", "table", "compact", "json"],
+                "description": "Output format (default: detailed)"
+            },
+            "locale": {
+                "type": "string",
+                "enum": ["pt", "en"],
+                "description": "Output language (default: LETSCLOUD_LOCALE or pt)"
+            }
+        },
         "additionalProperties": False
     }
 )
@@ -28,7 +58,8 @@ get_server_tool = Tool(
             "server_id": {
                 "type": "integer",
                 "description": "The ID of the instance to retrieve"
-            }
+            },
+            "output_profile": output_profile_property
         },
         "required": ["server_id"],
         "additionalProperties": False
@@ -71,13 +102,179 @@ create_server_tool = Tool(
                     "type": "integer"
                 },
                 "description": "Array of SSH key IDs to add to the server (optional)"
-            }
+            },
+            "idempotency_key": idempotency_key_property
         },
         "required": ["label", "plan_slug", "image_slug", "location_slug"],
         "additionalProperties": False
     }
 )
 
+create_servers_tool = Tool(
+    name="create_servers",
+    description=(
+        "Create several identical instances from one template in parallel, optionally "
+        "waiting until they are built. The report is remembered for retries, including "
+        "any failed_labels: create those with a new call listing only their labels"
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "plan_slug": {
+                "type": "string",
+                "description": "The plan slug for every server"
+            },
+            "image_slug": {
+                "type": "string",
+                "description": "The OS image slug for every server"
+            },
+            "location_slug": {
+                "type": "string",
+                "description": "The location slug for every server"
+            },
+            "ssh_keys": {
+                "type": "array",
+                "items": {
+                    "type": "integer"
+                },
+                "description": "Array of SSH key IDs to add to every server (optional)"
+            },
+            "password": {
+                "type": "string",
+                "description": "Root password for every server (optional)"
+            },
+            "labels": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                },
+                "description": "Labels of the servers to create (use this or count)"
+            },
+            "count": {
+                "type": "integer",
+                "description": (
+                    "Number of servers to create, labelled <label_prefix>-1..N "
+                    "(use this or labels)"
+                )
+            },
+            "label_prefix": {
+                "type": "string",
+                "description": "Label prefix used with count (optional, defaults to 'server')"
+            },
+            "wait": {
+                "type": "boolean",
+                "description": "Wait until all servers are built before returning (optional)"
+            },
+            "wait_timeout": {
+                "type": "integer",
+                "description": (
+                    "Maximum seconds to wait when wait is true (optional, defaults to 600)"
+                )
+            },
+            "idempotency_key": idempotency_key_property
+        },
+        "required": ["plan_slug", "image_slug", "location_slug"],
+        "additionalProperties": False
+    }
+)
+
+reconcile_fleet_tool = Tool(
+    name="reconcile_fleet",
+    description=(
+        "Converge servers to a desired state: plan creates, power changes and deletions, "
+        "then apply them (dry run by default). SSH keys are only attached to new servers; "
+        "key differences on existing servers are reported as drift"
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "servers": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "label": {
+                            "type": "string",
+                            "description": "Server label, used to match existing servers"
+                        },
+                        "plan_slug": {
+                            "type": "string",
+                            "description": (
+                                "Plan slug (used when creating; differences are reported as drift)"
+                            )
+                        },
+                        "image_slug": {
+                            "type": "string",
+                            "description": "OS image slug (used when creating)"
+                        },
+                        "location_slug": {
+                            "type": "string",
+                            "description": (
+                                "Location slug (used when creating; differences "
+                                "are reported as drift)"
+                            )
+                        },
+                        "ssh_keys": {
+                            "type": "array",
+                            "items": {
+                                "type": "integer"
+                            },
+                            "description": (
+                                "SSH key IDs added when creating; not changed "
+                                "on existing servers (optional)"
+                            )
+                        },
+                        "power": {
+                            "type": "string",
+                            "enum": ["on", "off"],
+                            "description": "Desired power state (optional, defaults to on)"
+                        }
+                    },
+                    "required": ["label"],
+                    "additionalProperties": False
+                },
+                "description": "Desired servers"
+            },
+            "prune": {
+                "type": "boolean",
+                "description": (
+                    "Delete servers in scope that are not in the desired "
+                    "state (optional, defaults to false)"
+                )
+            },
+            "label_prefix": {
+                "type": "string",
+                "description": (
+                    "Only servers whose label starts with this prefix are pruned (optional)"
+                )
+            },
+            "confirm_delete_all": {
+                "type": "boolean",
+                "description": (
+                    "Allow prune with no desired servers and no label_prefix, "
+                    "deleting every server (optional, defaults to false)"
+                )
+            },
+            "dry_run": {
+                "type": "boolean",
+                "description": (
+                    "Only return the plan without changing anything (optional, defaults to true)"
+                )
+            },
+            "build_timeout": {
+                "type": "integer",
+                "description": (
+                    "Maximum seconds to wait for new servers to build before "
+                    "powering them off (optional, defaults to 600)"
+                )
+            },
+            "idempotency_key": idempotency_key_property
+        },
+        "required": ["servers"],
+        "additionalProperties": False
+    }
+)
+
 delete_server_tool = Tool(
     name="delete_server",
     description="Delete a server permanently (cannot be undone)",
@@ -148,7 +345,10 @@ list_ssh_keys_tool = Tool(
     description="List all SSH keys in your account",
     inputSchema={
         "type": "object",
-        "properties": {},
+        "properties": {
+            "output_profile": output_profile_property,
+            "cursor": cursor_property
+        },
         "additionalProperties": False
     }
 )
@@ -162,7 +362,8 @@ get_ssh_key_tool = Tool(
             "key_id": {
                 "type": "integer",
                 "description": "The ID of the SSH key to retrieve"
-            }
+            },
+            "output_profile": output_profile_property
         },
         "required": ["key_id"],
         "additionalProperties": False
@@ -182,7 +383,8 @@ create_ssh_key_tool = Tool(
             "key": {
                 "type": "string",
                 "description": "The public key content (ssh-rsa, ssh-ed25519, etc.)"
-            }
+            },
+            "idempotency_key": idempotency_key_property
         },
         "required": ["title", "key"],
         "additionalProperties": False
@@ -215,7 +417,9 @@ list_snapshots_tool = Tool(
             "server_id": {
                 "type": "integer",
                 "description": "The ID of the server to list snapshots for"
-            }
+            },
+            "output_profile": output_profile_property,
+            "cursor": cursor_property
         },
         "required": ["server_id"],
         "additionalProperties": False
@@ -235,7 +439,8 @@ get_snapshot_tool = Tool(
             "snapshot_id": {
                 "type": "integer",
                 "description": "The ID of the snapshot to retrieve"
-            }
+            },
+            "output_profile": output_profile_property
         },
         "required": ["server_id", "snapshot_id"],
         "additionalProperties": False
@@ -259,7 +464,8 @@ create_snapshot_tool = Tool(
             "description": {
                 "type": "string",
                 "description": "A description for the snapshot (optional)"
-            }
+            },
+            "idempotency_key": idempotency_key_property
         },
         "required": ["server_id", "label"],
         "additionalProperties": False
@@ -306,13 +512,117 @@ restore_snapshot_tool = Tool(
     }
 )
 
+list_all_snapshots_tool = Tool(
+    name="list_all_snapshots",
+    description=(
+        "List snapshots across all servers (or a selection) as one sortable, filterable table"
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "server_ids": {
+                "type": "array",
+                "items": {
+                    "type": ["integer", "string"]
+                },
+                "description": "Only include these servers (optional, defaults to all)"
+            },
+            "older_than_days": {
+                "type": "number",
+                "description": "Only snapshots at least this many days old (optional)"
+            },
+            "newer_than_days": {
+                "type": "number",
+                "description": "Only snapshots at most this many days old (optional)"
+            },
+            "label_contains": {
+                "type": "string",
+                "description": "Only snapshots whose label contains this text (optional)"
+            },
+            "min_size": {
+                "type": "number",
+                "description": "Only snapshots at least this large (optional)"
+            },
+            "sort_by": {
+                "type": "string",
+                "enum": ["age", "size", "server", "label", "created_at"],
+                "description": "Sort column (optional, defaults to age)"
+            },
+            "descending": {
+                "type": "boolean",
+                "description": "Sort in descending order (optional, defaults to true)"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of rows to return (optional)"
+            },
+            "refresh": {
+                "type": "boolean",
+                "description": "Bypass cached per-server snapshot lists (optional)"
+            }
+        },
+        "additionalProperties": False
+    }
+)
+
+apply_snapshot_retention_tool = Tool(
+    name="apply_snapshot_retention",
+    description=(
+        "Prune snapshots across servers with keep-last/daily/weekly rules (dry run by default)"
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "server_ids": {
+                "type": "array",
+                "items": {
+                    "type": ["integer", "string"]
+                },
+                "description": "Only apply to these servers (optional, defaults to all)"
+            },
+            "keep_last": {
+                "type": "integer",
+                "description": "Keep the N newest snapshots of each server (optional)"
+            },
+            "keep_daily": {
+                "type": "integer",
+                "description": (
+                    "Keep the newest snapshot for each of the last N days that have one (optional)"
+                )
+            },
+            "keep_weekly": {
+                "type": "integer",
+                "description": (
+                    "Keep the newest snapshot for each of the last N weeks "
+                    "that have one (optional)"
+                )
+            },
+            "label_contains": {
+                "type": "string",
+                "description": "Only consider snapshots whose label contains this text (optional)"
+            },
+            "dry_run": {
+                "type": "boolean",
+                "description": (
+                    "Only return the deletion plan without deleting "
+                    "anything (optional, defaults to true)"
+                )
+            }
+        },
+        "additionalProperties": False
+    }
+)
+
 # Resource Information Tools
 list_plans_tool = Tool(
     name="list_plans",
     description="List all available server plans",
     inputSchema={
         "type": "object",
-        "properties": {},
+        "properties": {
+            "output_profile": output_profile_property,
+            "cursor": cursor_property
+        },
         "additionalProperties": False
     }
 )
@@ -322,7 +632,10 @@ list_images_tool = Tool(
     description="List all available OS images",
     inputSchema={
         "type": "object",
-        "properties": {},
+        "properties": {
+            "output_profile": output_profile_property,
+            "cursor": cursor_property
+        },
         "additionalProperties": False
     }
 )
@@ -332,7 +645,10 @@ list_locations_tool = Tool(
     description="List all available server locations",
     inputSchema={
         "type": "object",
-        "properties": {},
+        "properties": {
+            "output_profile": output_profile_property,
+            "cursor": cursor_property
+        },
         "additionalProperties": False
     }
 )
@@ -342,7 +658,97 @@ get_account_info_tool = Tool(
     description="Get your LetsCloud account information",
     inputSchema={
         "type": "object",
-        "properties": {},
+        "properties": {
+            "output_profile": output_profile_property
+        },
+        "additionalProperties": False
+    }
+)
+
+fleet_summary_tool = Tool(
+    name="fleet_summary",
+    description=(
+        "Summarize vCPU, RAM, disk and monthly cost of all "
+        "instances grouped by location, plan or status"
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "group_by": {
+                "type": "string",
+                "enum": ["location", "plan", "status"],
+                "description": "Grouping dimension (optional, defaults to location)"
+            }
+        },
+        "additionalProperties": False
+    }
+)
+
+# Background Job Tools
+submit_job_tool = Tool(
+    name="submit_job",
+    description="Run any other tool in the background and return a job id immediately",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "tool_name": {
+                "type": "string",
+                "description": "Name of the tool to run"
+            },
+            "arguments": {
+                "type": "object",
+                "description": "Arguments for the tool (optional)"
+            }
+        },
+        "required": ["tool_name"],
+        "additionalProperties": False
+    }
+)
+
+get_job_tool = Tool(
+    name="get_job",
+    description="Get the status, progress and result of a background job",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "job_id": {
+                "type": "string",
+                "description": "The job ID returned by submit_job"
+            }
+        },
+        "required": ["job_id"],
+        "additionalProperties": False
+    }
+)
+
+list_jobs_tool = Tool(
+    name="list_jobs",
+    description="List background jobs, newest first",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "status": {
+                "type": "string",
+                "enum": ["queued", "running", "succeeded", "failed", "cancelled"],
+                "description": "Only list jobs with this status (optional)"
+            }
+        },
         "additionalProperties": False
     }
-) 
\ No newline at end of file
+)
+
+cancel_job_tool = Tool(
+    name="cancel_job",
+    description="Cancel a queued or running background job",
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "job_id": {
+                "type": "string",
+                "description": "The job ID to cancel"
+            }
+        },
+        "required": ["job_id"],
+        "additionalProperties": False
+    }
+)
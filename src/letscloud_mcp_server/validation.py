@@ -0,0 +1,208 @@
+"""
+Pre-flight Validation
+~~~~~~~~~~~~~~~~~~~~~
+
+Checks ``create_server``/``create_servers`` arguments against hash indexes
+built over the cached catalog (plans, images, locations) and SSH keys.
+
+A typo in a slug is rejected locally with "did you mean" suggestions
+instead of costing an upstream round trip and an opaque HTTP error. Indexes
+are rebuilt only when the underlying catalog lists change, so a warm
+validation is a handful of dict lookups. The account's SSH key IDs are kept
+briefly alongside them and refetched once when a requested key is missing,
+so a key created moments ago is not rejected.
+
+Settings:
+    LETSCLOUD_SSH_KEY_TTL: Seconds the SSH key IDs are reused (default 60)
+"""
+
+import asyncio
+import difflib
+import logging
+import time
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+
+from .config import env_float
+from .letscloud_client import LetsCloudClient
+from .metrics import metrics
+from .models import Image, Location, Model, Plan
+
+logger = logging.getLogger(__name__)
+
+SLUG_FIELDS = (
+    ("plan_slug", "plans"),
+    ("image_slug", "images"),
+    ("location_slug", "locations"),
+)
+
+
+class SlugIndex:
+    """Exact and case-folded lookup of catalog items by slug."""
+
+    def __init__(self, items: Iterable[Model], keys: Tuple[str, ...] = ("slug",)):
+        """
+        Build the index.
+
+        Args:
+            items: Catalog models
+            keys: Model fields that may hold the slug
+        """
+        self.by_slug: Dict[str, Model] = {}
+        self.by_folded: Dict[str, str] = {}
+        for item in items:
+            for key in keys:
+                value = getattr(item, key, None)
+                if value:
+                    self.by_slug[str(value)] = item
+                    self.by_folded.setdefault(str(value).casefold(), str(value))
+
+    def __contains__(self, slug: Any) -> bool:
+        return str(slug) in self.by_slug
+
+    def __len__(self) -> int:
+        return len(self.by_slug)
+
+    def get(self, slug: Any) -> Optional[Model]:
+        """Look up an item by exact slug."""
+        return self.by_slug.get(str(slug))
+
+    def suggest(self, slug: Any, limit: int = 3) -> List[str]:
+        """Return close matches for an unknown slug."""
+        folded = self.by_folded.get(str(slug).casefold())
+        if folded:
+            return [folded]
+        return difflib.get_close_matches(str(slug), list(self.by_slug), n=limit, cutoff=0.6)
+
+
+class CatalogIndex:
+    """Indexes over plans, images and locations."""
+
+    def __init__(self, plans: List[Dict[str, Any]], images: List[Dict[str, Any]],
+                 locations: List[Dict[str, Any]]):
+        """Build indexes from catalog lists."""
+        self.sources = (plans, images, locations)
+        self.plans = SlugIndex(Plan.from_list(plans), ("slug", "shortcode"))
+        self.images = SlugIndex(Image.from_list(images))
+        self.locations = SlugIndex(Location.from_list(locations))
+
+
+_indexes: "weakref.WeakKeyDictionary[LetsCloudClient, CatalogIndex]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Client -> (expiry, SSH key IDs)
+_ssh_keys: "weakref.WeakKeyDictionary[LetsCloudClient, Tuple[float, Set[str]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def get_catalog_index(client: LetsCloudClient) -> CatalogIndex:
+    """
+    Return catalog indexes for a client, rebuilding only when data changed.
+
+    Catalog lists come from the client's TTL cache, so this normally makes
+    no network requests at all.
+    """
+    plans, images, locations = await asyncio.gather(
+        client.list_plans(), client.list_images(), client.list_locations()
+    )
+    index = _indexes.get(client)
+    if index is None or any(a is not b for a, b in zip(index.sources, (plans, images, locations))):
+        index = CatalogIndex(plans, images, locations)
+        _indexes[client] = index
+    return index
+
+
+def _unknown(field: str, value: Any, index: SlugIndex) -> str:
+    message = f"Unknown {field} '{value}'"
+    suggestions = index.suggest(value)
+    if suggestions:
+        message += f". Did you mean: {', '.join(suggestions)}?"
+    return message
+
+
+def check_slugs(index: CatalogIndex, args: Dict[str, Any]) -> List[str]:
+    """
+    Validate slug fields against the catalog indexes (no I/O).
+
+    Returns:
+        List of problems (empty when valid)
+    """
+    problems = []
+    for field, attribute in SLUG_FIELDS:
+        value = args.get(field)
+        slug_index: SlugIndex = getattr(index, attribute)
+        if not value:
+            problems.append(f"{field} is required")
+        elif len(slug_index) and value not in slug_index:
+            problems.append(_unknown(field, value, slug_index))
+
+    # Plans may list the locations they are sold in
+    plan = index.plans.get(args.get("plan_slug"))
+    location = args.get("location_slug")
+    if isinstance(plan, Plan) and plan.locations and location in index.locations:
+        offered = {str(loc.slug) for loc in plan.locations}
+        if offered and location not in offered:
+            problems.append(
+                f"Plan '{args['plan_slug']}' is not available in '{location}'. "
+                f"Available in: {', '.join(sorted(offered))}"
+            )
+    return problems
+
+
+async def get_ssh_key_ids(client: LetsCloudClient, refresh: bool = False) -> Set[str]:
+    """Return the account's SSH key IDs, reused for LETSCLOUD_SSH_KEY_TTL seconds."""
+    cached = _ssh_keys.get(client)
+    if cached is not None and not refresh and cached[0] > time.monotonic():
+        return cached[1]
+    known = {str(key.get("id")) for key in await client.list_ssh_keys()}
+    _ssh_keys[client] = (time.monotonic() + env_float("LETSCLOUD_SSH_KEY_TTL", 60.0), known)
+    return known
+
+
+async def check_ssh_keys(client: LetsCloudClient, key_ids: Iterable[Any]) -> List[str]:
+    """Validate that SSH key IDs exist in the account."""
+    wanted = [str(key_id) for key_id in key_ids]
+    if not wanted:
+        return []
+    known = await get_ssh_key_ids(client)
+    missing = [key_id for key_id in wanted if key_id not in known]
+    if missing:
+        # The key may have been added since the IDs were cached
+        known = await get_ssh_key_ids(client, refresh=True)
+        missing = [key_id for key_id in wanted if key_id not in known]
+    if not missing:
+        return []
+    available = ", ".join(sorted(known)) or "none"
+    return [f"Unknown ssh_keys: {', '.join(missing)}. Available: {available}"]
+
+
+async def validate_server_request(client: LetsCloudClient, args: Dict[str, Any]) -> List[str]:
+    """
+    Validate create arguments before any mutation reaches the API.
+
+    Slugs are checked first against cached indexes; SSH keys are only
+    looked up when the slugs are valid and keys were requested. If the
+    catalog or the SSH keys cannot be loaded, that check is skipped and
+    the API decides.
+
+    Returns:
+        List of problems (empty when the request is valid)
+    """
+    try:
+        index = await get_catalog_index(client)
+    except httpx.HTTPError as e:
+        logger.warning("Skipping pre-flight validation, catalog unavailable: %s", e)
+        return []
+    problems = check_slugs(index, args)
+    if not problems and args.get("ssh_keys"):
+        try:
+            problems = await check_ssh_keys(client, args["ssh_keys"])
+        except httpx.HTTPError as e:
+            logger.warning("Skipping SSH key validation, keys unavailable: %s", e)
+    if problems:
+        metrics.inc("validation.rejected")
+    return problems
@@ -0,0 +1,84 @@
+"""
+Tests for admission control and load shedding
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.letscloud_mcp_server import http_server
+from src.letscloud_mcp_server.admission import BUSY_ERROR_CODE, AdmissionController, Overloaded
+from src.letscloud_mcp_server.scheduler import BULK, READ
+
+
+class TestAdmission:
+    """Test cases for AdmissionController."""
+
+    def test_sheds_over_limits(self):
+        """Test in-flight and lag limits, with bulk calls shed first."""
+        admission = AdmissionController(max_in_flight=4, bulk_fraction=0.5, max_lag=0.5)
+        with admission.admit(READ), admission.admit(BULK):
+            with pytest.raises(Overloaded):
+                with admission.admit(BULK):
+                    pass
+            with admission.admit(READ):
+                pass
+        assert admission.in_flight == 0
+
+        admission.lag = 2.0
+        with pytest.raises(Overloaded) as error:
+            admission.check(READ)
+        assert error.value.retry_after == 8
+
+    @pytest.mark.asyncio
+    async def test_measures_loop_lag(self):
+        """Test a blocked event loop shows up as lag."""
+        admission = AdmissionController(interval=0.05)
+        admission.start()
+        await asyncio.sleep(0.01)
+        time.sleep(0.3)
+        await asyncio.sleep(0.1)
+        await admission.stop()
+        assert admission.lag > 0.1
+
+    def test_http_and_websocket_busy(self, monkeypatch):
+        """Test overload maps to 503 with Retry-After and a JSON-RPC busy error."""
+        monkeypatch.setenv("MCP_API_KEY", "secret")
+        admission = AdmissionController(max_in_flight=1, ws_max_pause=0)
+        admission.in_flight = 1
+        monkeypatch.setattr(http_server, "admission", admission)
+        client = TestClient(http_server.app)
+
+        response = client.post(
+            "/tools/get_server", json={"arguments": {"server_id": "1"}},
+            headers={"Authorization": "Bearer secret"}
+        )
+        assert response.status_code == 503 and response.headers["retry-after"] == "1"
+
+        with client.websocket_connect("/mcp") as websocket:
+            websocket.send_text(json.dumps({
+                "id": 7, "method": "tools/call", "params": {"name": "list_plans"}}))
+            reply = json.loads(websocket.receive_text())
+        assert reply["id"] == 7 and reply["error"]["code"] == BUSY_ERROR_CODE
+        assert reply["error"]["data"] == {"retryAfter": 1}
+
+    def test_websocket_progress_busy(self, monkeypatch):
+        """Test a call shed while streaming progress gets the same busy error."""
+        monkeypatch.setenv("MCP_API_KEY", "secret")
+        monkeypatch.setattr(http_server, "admission", AdmissionController())
+
+        async def shed(*args):
+            raise Overloaded("Server busy", retry_after=3)
+
+        monkeypatch.setattr(http_server, "_scheduled_call", shed)
+        client = TestClient(http_server.app)
+        with client.websocket_connect("/mcp") as websocket:
+            websocket.send_text(json.dumps({
+                "id": 8, "method": "tools/call",
+                "params": {"name": "list_plans", "_meta": {"progressToken": "tok"}}}))
+            reply = json.loads(websocket.receive_text())
+        assert reply["id"] == 8 and reply["error"]["code"] == BUSY_ERROR_CODE
+        assert reply["error"]["data"] == {"retryAfter": 3}
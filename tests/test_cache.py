@@ -0,0 +1,79 @@
+"""
+Tests for the persistent catalog cache
+"""
+
+import os
+import sqlite3
+
+import httpx
+import pytest
+from src.letscloud_mcp_server.cache import CacheEntry, PersistentCache
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+
+
+def _mock_client(cache, handler, ttl=900.0):
+    """Build a client whose HTTP traffic goes to a mock transport."""
+    client = LetsCloudClient("test-token", cache=cache, catalog_ttl=ttl)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+@pytest.mark.asyncio
+class TestPersistentCache:
+    """Test cases for the SQLite-backed cache."""
+
+    async def test_entries_survive_new_instances(self, tmp_path):
+        """Test that a second process-like instance sees stored entries."""
+        first = PersistentCache(str(tmp_path), "ns")
+        await first.put("plans", CacheEntry([{"slug": "p1"}], etag='"v1"', expires_at=1e12))
+        first.close()
+
+        second = PersistentCache(str(tmp_path), "ns")
+        entry = await second.get("plans")
+        assert entry.data == [{"slug": "p1"}]
+        assert entry.etag == '"v1"'
+        assert await PersistentCache(str(tmp_path), "other").get("plans") is None
+
+    async def test_upgrades_old_schema(self, tmp_path):
+        """Test a database created before the size column keeps working."""
+        conn = sqlite3.connect(os.path.join(str(tmp_path), "letscloud-cache.sqlite3"))
+        conn.execute(
+            "CREATE TABLE entries (key TEXT PRIMARY KEY, data TEXT NOT NULL, etag TEXT, "
+            "last_modified TEXT, stored_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO entries VALUES ('ns:plans', '[1]', NULL, NULL, 0, 1e12)")
+        conn.commit()
+        conn.close()
+
+        cache = PersistentCache(str(tmp_path), "ns")
+        assert (await cache.get("plans")).data == [1]
+        await cache.put("images", CacheEntry([2], expires_at=1e12, size=3))
+        assert (await cache.get("images")).size == 3
+
+    async def test_fresh_entry_served_without_network(self, tmp_path):
+        """Test that a restarted client answers from disk."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json={"data": [{"slug": "ubuntu"}]}, headers={"ETag": '"a"'})
+
+        cache = PersistentCache(str(tmp_path), "ns")
+        assert await _mock_client(cache, handler).list_images() == [{"slug": "ubuntu"}]
+        assert await _mock_client(cache, handler).list_images() == [{"slug": "ubuntu"}]
+        assert len(calls) == 1
+
+    async def test_stale_entry_is_revalidated(self, tmp_path):
+        """Test that stale entries send validators and reuse data on 304."""
+        seen_headers = []
+
+        def handler(request):
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"a"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"data": [{"slug": "mia1"}]}, headers={"ETag": '"a"'})
+
+        client = _mock_client(PersistentCache(str(tmp_path), "ns"), handler, ttl=0)
+        assert await client.list_locations() == [{"slug": "mia1"}]
+        assert await client.list_locations() == [{"slug": "mia1"}]
+        assert seen_headers == [None, '"a"']
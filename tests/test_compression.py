@@ -0,0 +1,58 @@
+"""
+Tests for HTTP response compression
+"""
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from src.letscloud_mcp_server.compression import CompressionMiddleware, choose_encoding
+
+
+def _app(minimum_size=100):
+    async def big(request):
+        return JSONResponse({"items": ["x" * 50] * 20}, headers={"ETag": '"abc"'})
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def stream(request):
+        async def chunks():
+            yield b"data: 1\n\n"
+            yield b"data: 2\n\n"
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route("/big", big), Route("/small", small), Route("/stream", stream)])
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    return TestClient(app)
+
+
+class TestCompression:
+    """Test cases for the compression middleware."""
+
+    def test_large_json_is_gzipped(self):
+        """Test that large responses are compressed."""
+        response = _app().get("/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < 1000
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.headers["etag"] == 'W/"abc"'
+        assert response.json()["items"][0] == "x" * 50
+
+    def test_small_response_is_not_compressed(self):
+        """Test that bodies under the threshold are sent as-is."""
+        response = _app().get("/small", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_response_passes_through(self):
+        """Test that streamed bodies are never buffered for compression."""
+        response = _app(minimum_size=1).get("/stream", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.text == "data: 1\n\ndata: 2\n\n"
+
+    def test_choose_encoding(self):
+        """Test Accept-Encoding negotiation."""
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, identity") is None
+        assert choose_encoding("") is None
@@ -0,0 +1,97 @@
+"""
+Tests for graceful shutdown and draining
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.letscloud_mcp_server import http_server
+from src.letscloud_mcp_server.drain import Drainer, ServerDraining
+from src.letscloud_mcp_server.jobs import JobQueue
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+
+
+class TestDrainer:
+    """Test cases for in-flight tracking."""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_in_flight_calls(self):
+        """Test drain waits for running calls and refuses new ones."""
+        drainer = Drainer(timeout=1)
+        finished = []
+
+        async def call():
+            with drainer.track():
+                await asyncio.sleep(0.05)
+                finished.append(True)
+
+        task = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        assert await drainer.drain() is True
+        assert finished == [True] and drainer.in_flight == 0
+        with pytest.raises(ServerDraining):
+            with drainer.track():
+                pass
+        await task
+
+    @pytest.mark.asyncio
+    async def test_deadline(self):
+        """Test drain gives up at the deadline."""
+        drainer = Drainer()
+        with drainer.track():
+            assert await drainer.drain(timeout=0.01) is False
+
+    @pytest.mark.asyncio
+    async def test_concurrent_drains_all_wake(self):
+        """Test every drain() waiter wakes when the last call finishes."""
+        drainer = Drainer(timeout=5)
+        release = asyncio.Event()
+
+        async def call():
+            with drainer.track():
+                await release.wait()
+
+        task = asyncio.create_task(call())
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(drainer.drain()) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.wait_for(asyncio.gather(*waiters), timeout=1) == [True, True]
+        await task
+
+    @pytest.mark.asyncio
+    async def test_one_deadline_across_stages(self):
+        """Test later shutdown stages only get what is left of the deadline."""
+        drainer = Drainer(timeout=0.1)
+        assert drainer.remaining() == 0.1
+        with drainer.track():
+            assert await drainer.drain() is False
+            started = asyncio.get_running_loop().time()
+            assert await drainer.drain() is False
+        assert asyncio.get_running_loop().time() - started < 0.05
+        assert drainer.remaining() == 0.0
+
+    def test_lifespan_shutdown(self, monkeypatch):
+        """Test draining rejects calls and shutdown closes the upstream client."""
+        monkeypatch.setenv("MCP_API_KEY", "secret")
+        drainer = Drainer(timeout=1)
+        upstream = LetsCloudClient("token")
+        upstream.close = AsyncMock()
+        monkeypatch.setattr(http_server, "drainer", drainer)
+        monkeypatch.setattr(http_server, "job_queue", JobQueue(AsyncMock()))
+        monkeypatch.setattr(http_server.health_monitor, "start", lambda: None)
+        monkeypatch.setattr(http_server.mcp_server, "letscloud_client", upstream)
+
+        with TestClient(http_server.app) as client:
+            drainer.draining = True
+            assert client.get("/readyz").status_code == 503
+            response = client.post(
+                "/tools/list_plans", json={}, headers={"Authorization": "Bearer secret"}
+            )
+            assert response.status_code == 503
+            assert response.headers["retry-after"] == "1"
+        upstream.close.assert_awaited_once()
+        assert http_server.job_queue.closing
@@ -0,0 +1,67 @@
+"""
+Tests for fleet cost and capacity aggregation
+"""
+
+import copy
+
+from src.letscloud_mcp_server.fleet import FleetSummary
+from src.letscloud_mcp_server.models import Instance
+
+
+PLANS = [
+    {"slug": "1vcpu-1gb", "core": 1, "memory": 1024, "disk": 25,
+     "monthly_value": "5.10", "currency": "USD"},
+    {"slug": "2vcpu-4gb", "core": 2, "memory": 4096, "disk": 80,
+     "monthly_value": 20.2, "currency": "USD"},
+]
+
+
+def _instance(identifier, city, cpus=1, memory=1024, disk=25, **extra):
+    return {"identifier": identifier, "built": True, "booted": True, "cpus": cpus,
+            "memory": memory, "disk": disk, "location": {"slug": city}, **extra}
+
+
+class TestFleetSummary:
+    """Test cases for FleetSummary."""
+
+    def test_grouped_totals(self):
+        """Test instances are priced by slug or by shape and grouped."""
+        summary = FleetSummary()
+        instances = Instance.from_list([
+            _instance("a", "MIA1"),
+            _instance("b", "MIA1", plan={"slug": "2vcpu-4gb"}),
+            _instance("c", "SAO1", cpus=8, memory=16384, disk=320),
+        ])
+        assert summary.update(instances, PLANS) == 3
+        table = summary.table("location")
+        assert table["columns"] == ["location", "servers", "vcpus", "memory_gb", "disk_gb",
+                                    "monthly_cost"]
+        assert table["rows"][0] == ["MIA1", 2, 2, 2.0, 50, 25.3]
+        assert table["rows"][1] == ["SAO1", 1, 8, 16.0, 320, 0.0]
+        assert table["unpriced"] == 1 and table["currency"] == "USD"
+        assert [row[0] for row in summary.table("plan")["rows"]] == [
+            "2vcpu-4gb", "1vcpu-1gb", "unknown"]
+
+    def test_incremental_update(self):
+        """Test only changed instances are reprocessed and totals stay exact."""
+        summary = FleetSummary()
+        fleet = [_instance(str(i), "MIA1") for i in range(100)]
+        summary.update(Instance.from_list(fleet), PLANS)
+        fleet[0] = {**fleet[0], "booted": False}
+        del fleet[1]
+        assert summary.update(Instance.from_list(fleet), PLANS) == 2
+        status = dict((row[0], row[1:]) for row in summary.table("status")["rows"])
+        assert status["stopped"][0] == 1 and status["running"][0] == 98
+        assert summary.total.cells()[-1] == 504.9
+        assert summary.update(Instance.from_list(fleet), PLANS) == 0
+
+    def test_equal_catalog_copy_stays_incremental(self):
+        """Test a freshly decoded but identical catalog does not force a recompute."""
+        summary = FleetSummary()
+        fleet = Instance.from_list([_instance(str(i), "MIA1") for i in range(10)])
+        summary.update(fleet, PLANS)
+        assert summary.update(fleet, copy.deepcopy(PLANS)) == 0
+        cheaper = copy.deepcopy(PLANS)
+        cheaper[0]["monthly_value"] = "4.00"
+        assert summary.update(fleet, cheaper) == 10
+        assert summary.total.cells()[-1] == 40.0
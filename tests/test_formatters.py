@@ -0,0 +1,71 @@
+"""
+Tests for output formatters
+"""
+
+import json
+
+import pytest
+
+from src.letscloud_mcp_server.formatters import render_servers
+from src.letscloud_mcp_server.models import Instance
+
+
+SERVERS = Instance.from_list([
+    {
+        "identifier": "abc123",
+        "label": "web|1",
+        "built": True,
+        "booted": True,
+        "cpus": 2,
+        "memory": 2048,
+        "location": {"city": "Miami", "country": "US"},
+        "ip_addresses": [{"address": "203.0.113.10"}],
+    },
+    {"identifier": "def456", "built": False, "memory": 512},
+])
+
+
+class TestFormatters:
+    """Test cases for list_servers rendering."""
+
+    def test_detailed_portuguese(self):
+        """Test the default output keeps the historical layout."""
+        pieces = list(render_servers(SERVERS, locale="pt"))
+        assert pieces[0] == "🖥️  **SUAS 2 INSTÂNCIAS LETSCLOUD:**\n\n"
+        assert pieces[1] == (
+            "**1. web|1**\n"
+            "   🆔 ID: abc123\n"
+            "   📍 Local: Miami, US\n"
+            "   🌐 IP: 203.0.113.10\n"
+            "   ⚡ Recursos: 2 vCPU, 2GB RAM\n"
+            "   📊 Status: ✅ Ativa\n\n"
+        )
+        assert "Sem nome" in pieces[2] and "512MB" in pieces[2] and "Construindo" in pieces[2]
+
+    def test_table_and_compact_english(self):
+        """Test markdown table escaping and compact lines."""
+        table = "".join(render_servers(SERVERS, "table", "en"))
+        row = "| 1 | web\\|1 | abc123 | Miami, US | 203.0.113.10 | 2 vCPU, 2GB | ✅ Running |"
+        assert row in table
+        compact = "".join(render_servers(SERVERS, "compact", "en")).splitlines()
+        assert compact[0] == "YOUR 2 LETSCLOUD INSTANCES"
+        assert compact[2] == "2. Unnamed [def456] N/A/N/A N/A 0c/512MB building"
+
+    def test_json(self):
+        """Test JSON rows carry raw values."""
+        rows = json.loads("".join(render_servers(SERVERS, "json")))
+        assert rows[0]["memory_mb"] == 2048 and rows[1]["status"] == "building"
+        assert rows[1]["label"] is None
+
+    def test_unknown_format(self):
+        """Test unknown formats and locales are rejected."""
+        with pytest.raises(ValueError):
+            list(render_servers(SERVERS, "xml"))
+        with pytest.raises(ValueError):
+            list(render_servers(SERVERS, locale="de"))
+
+    def test_linear_for_large_fleets(self):
+        """Test thousands of instances render one piece per row."""
+        fleet = SERVERS[:1] * 5000
+        pieces = list(render_servers(fleet, "compact", "en"))
+        assert len(pieces) == 5001
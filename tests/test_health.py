@@ -0,0 +1,105 @@
+"""
+Tests for the circuit breaker and cached readiness probes
+"""
+
+import httpx
+import pytest
+from src.letscloud_mcp_server.breaker import CircuitBreaker, CircuitOpenError
+from src.letscloud_mcp_server.health import HealthMonitor
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_and_half_opens(self):
+        """Test the closed -> open -> half-open -> closed cycle."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        # reset_timeout=0 makes the open circuit immediately eligible for a trial
+        assert breaker.state == "half_open"
+        assert breaker.allow() is True
+        breaker.record_success()
+        assert breaker.state == "closed" and breaker.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_client_fails_fast_when_open(self):
+        """Test that 5xx responses open the circuit and later calls are not sent."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        client = LetsCloudClient("test-token")
+        client.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.delete_server(1)
+        with pytest.raises(CircuitOpenError):
+            await client.delete_server(1)
+        assert len(calls) == 2 and client.in_flight == 0
+
+
+@pytest.mark.asyncio
+class TestHealthMonitor:
+    """Test cases for HealthMonitor."""
+
+    async def test_readiness_uses_cached_probe(self):
+        """Test readiness before, after a good and after a failing probe."""
+        calls = []
+        status = {"code": 200}
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(status["code"], json={"data": {"name": "Test"}})
+
+        client = LetsCloudClient("test-token")
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monitor = HealthMonitor(lambda: client)
+
+        ready, details = monitor.readiness()
+        assert not ready and details["reasons"] == ["upstream not probed yet"]
+
+        assert await monitor.probe() is True
+        for _ in range(3):
+            ready, details = monitor.readiness()
+        assert ready and details["upstream"] == "ok" and details["circuit"] == "closed"
+        assert len(calls) == 1
+
+        status["code"] = 500
+        assert await monitor.probe() is False
+        ready, details = monitor.readiness()
+        assert not ready and details["upstream"] == "failing"
+
+    async def test_pool_saturation(self):
+        """Test that a saturated connection pool reports not ready."""
+        client = LetsCloudClient("test-token")
+        monitor = HealthMonitor(lambda: client, max_saturation=0.5)
+        monitor.last_ok, monitor.last_checked, monitor.last_latency = True, 1e12, 0.01
+        client.in_flight = client.max_connections
+        ready, details = monitor.readiness()
+        assert not ready and "connection pool saturated" in details["reasons"]
+
+    async def test_probe_bypasses_sidecar(self):
+        """Test the probe reaches the API even when the sidecar cache would answer."""
+        calls = []
+
+        class CachingSidecar:
+            available = True
+
+            async def get(self, *args):
+                return {"data": {"name": "Cached"}}
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        client = LetsCloudClient("test-token", sidecar=CachingSidecar())
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        monitor = HealthMonitor(lambda: client)
+        assert await monitor.probe() is False
+        assert len(calls) == 1 and monitor.last_error
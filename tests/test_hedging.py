@@ -0,0 +1,72 @@
+"""
+Tests for hedged GET requests
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.letscloud_mcp_server.hedging import HedgePolicy, hedged
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+from src.letscloud_mcp_server.metrics import metrics
+from src.letscloud_mcp_server.timeouts import TimeoutPolicy
+
+
+def _warm(policy, timeouts, samples=40, latency=0.01):
+    for _ in range(samples):
+        timeouts.observe("GET", "instances", latency)
+        policy.delay_for("GET", "instances", timeouts)
+
+
+def _funded(policy):
+    policy._tokens = policy.max_tokens
+    return policy
+
+
+@pytest.mark.asyncio
+class TestHedging:
+    """Test cases for hedging and its budget."""
+
+    async def test_slow_first_attempt_is_hedged(self):
+        """Test a stalled request is overtaken by the hedge."""
+        delays = [1.0, 0.0]
+        started = []
+
+        async def attempt():
+            started.append(True)
+            await asyncio.sleep(delays[len(started) - 1])
+            return len(started)
+
+        before = metrics.get("upstream.hedges.won")
+        result = await hedged(attempt, 0.01, _funded(HedgePolicy(enabled=True)))
+        assert result == 2 and len(started) == 2
+        assert metrics.get("upstream.hedges.won") == before + 1
+
+    async def test_budget_and_warmup(self):
+        """Test hedging waits for samples and spends at most the budget."""
+        policy = HedgePolicy(enabled=True, budget=0.05)
+        timeouts = TimeoutPolicy()
+        assert policy.delay_for("GET", "instances", timeouts) is None
+        assert policy.delay_for("POST", "instances", timeouts) is None
+        _warm(policy, timeouts)
+        assert policy.delay_for("GET", "instances", timeouts) == 0.05
+        # 41 eligible requests at a 5% budget pay for two hedges
+        assert [policy.try_spend() for _ in range(3)] == [True, True, False]
+
+    async def test_client_hedges_slow_get(self):
+        """Test the client returns the faster of two identical GETs."""
+        calls = []
+
+        async def handler(request):
+            calls.append(request.url.path)
+            if len(calls) == 1:
+                await asyncio.sleep(1.0)
+            return httpx.Response(200, json={"data": [{"identifier": str(len(calls))}]})
+
+        client = LetsCloudClient("token")
+        client.hedging = _funded(HedgePolicy(enabled=True))
+        _warm(client.hedging, client.timeouts)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        assert await client.list_servers() == [{"identifier": "2"}]
+        assert calls == ["/api/instances", "/api/instances"]
@@ -0,0 +1,77 @@
+"""
+Tests for HTTP response caching and ETags
+"""
+
+from unittest.mock import AsyncMock
+
+from mcp.types import CallToolResult, TextContent
+from starlette.testclient import TestClient
+
+from src.letscloud_mcp_server import http_server
+from src.letscloud_mcp_server.http_cache import ResponseCache, etag_matches, strong_etag
+
+
+HEADERS = {"Authorization": "Bearer secret"}
+
+
+def _result(text="[]"):
+    return CallToolResult(content=[TextContent(type="text", text=text)], isError=False)
+
+
+class TestHttpCache:
+    """Test cases for validators and the tool response cache."""
+
+    def test_etag_matching(self):
+        """Test If-None-Match uses weak comparison over a list."""
+        etag = strong_etag(b"body")
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_cache_key_and_expiry(self):
+        """Test keys ignore argument order and entries expire."""
+        cache = ResponseCache(ttl=30)
+        key = cache.key("t1", "list_plans", {"a": 1, "b": 2})
+        assert key == cache.key("t1", "list_plans", {"b": 2, "a": 1})
+        assert key != cache.key("t2", "list_plans", {"a": 1, "b": 2})
+        cache.put(key, b"{}")
+        assert cache.get(key).body == b"{}"
+        assert ResponseCache(ttl=0).get(key) is None
+        assert not ResponseCache(enabled=False).cacheable("list_plans")
+        assert not cache.cacheable("delete_server")
+
+    def test_tools_revalidation(self, monkeypatch):
+        """Test GET /tools carries a strong ETag and answers 304."""
+        monkeypatch.setenv("MCP_API_KEY", "secret")
+        client = TestClient(http_server.app)
+        first = client.get("/tools", headers=HEADERS)
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and first.json()["total"] > 0
+        assert first.headers["cache-control"].startswith("private")
+        second = client.get("/tools", headers={**HEADERS, "If-None-Match": etag})
+        assert second.status_code == 304 and second.content == b""
+
+    def test_read_only_tool_cached(self, monkeypatch):
+        """Test cached tool calls skip the handler and revalidate."""
+        monkeypatch.setenv("MCP_API_KEY", "secret")
+        call = AsyncMock(return_value=_result())
+        monkeypatch.setattr(http_server, "call_mcp_tool", call)
+        monkeypatch.setattr(http_server, "response_cache", ResponseCache(ttl=60))
+        client = TestClient(http_server.app)
+        body = {"arguments": {}}
+
+        first = client.post("/tools/list_plans", json=body, headers=HEADERS)
+        second = client.post("/tools/list_plans", json=body, headers=HEADERS)
+        assert first.json() == second.json()
+        assert call.await_count == 1
+        etag = second.headers["etag"]
+        revalidated = client.post(
+            "/tools/list_plans", json=body, headers={**HEADERS, "If-None-Match": etag}
+        )
+        assert revalidated.status_code == 304
+
+        no_cache = {**HEADERS, "Cache-Control": "no-cache"}
+        client.post("/tools/list_plans", json=body, headers=no_cache)
+        client.post("/tools/get_server", json={"arguments": {"server_id": "1"}}, headers=HEADERS)
+        assert call.await_count == 3
@@ -0,0 +1,97 @@
+"""
+Tests for idempotent mutating calls
+"""
+
+import asyncio
+
+import pytest
+from src.letscloud_mcp_server.idempotency import IdempotencyStore
+
+
+@pytest.mark.asyncio
+class TestIdempotencyStore:
+    """Test cases for call deduplication."""
+
+    async def test_concurrent_duplicates_share_one_call(self):
+        """Test that a retry arriving mid-flight joins the original call."""
+        store = IdempotencyStore()
+        calls = []
+
+        async def create():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"id": len(calls)}
+
+        args = {"label": "web-1"}
+        results = await asyncio.gather(
+            store.run("create_server", args, create),
+            store.run("create_server", dict(args), create),
+        )
+        assert results == [{"id": 1}, {"id": 1}]
+        assert len(calls) == 1
+
+    async def test_explicit_key_overrides_arguments(self):
+        """Test that explicit keys dedupe regardless of arguments."""
+        store = IdempotencyStore(window=0)
+        counter = iter(range(10))
+
+        async def create():
+            return next(counter)
+
+        assert await store.run("create_snapshot", {"label": "a"}, create, "k1") == 0
+        assert await store.run("create_snapshot", {"label": "b"}, create, "k1") == 0
+        assert await store.run("create_snapshot", {"label": "a"}, create, "k2") == 1
+        # Without a key and with derived keys disabled every call runs
+        assert await store.run("create_snapshot", {"label": "a"}, create) == 2
+        assert await store.run("create_snapshot", {"label": "a"}, create) == 3
+
+    async def test_failures_are_not_remembered(self):
+        """Test that a failed call can be retried."""
+        store = IdempotencyStore()
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("upstream down")
+            return "ok"
+
+        with pytest.raises(RuntimeError):
+            await store.run("create_ssh_key", {"title": "k"}, flaky)
+        assert await store.run("create_ssh_key", {"title": "k"}, flaky) == "ok"
+
+        async def error_result():
+            return "error"
+
+        assert await store.run("create_ssh_key", {"title": "x"}, error_result,
+                               is_failure=lambda r: r == "error") == "error"
+        assert await store.run("create_ssh_key", {"title": "x"}, flaky) == "ok"
+
+    async def test_keys_are_scoped_to_tenants(self):
+        """Test tenants never share results, by explicit or derived key."""
+        store = IdempotencyStore()
+        counter = iter(range(10))
+
+        async def create():
+            return next(counter)
+
+        args = {"label": "web-1"}
+        assert await store.run("create_server", args, create, "k1", tenant="a") == 0
+        assert await store.run("create_server", args, create, "k1", tenant="b") == 1
+        assert await store.run("create_server", args, create, tenant="a") == 2
+        assert await store.run("create_server", args, create, tenant="b") == 3
+        assert await store.run("create_server", args, create, "k1", tenant="a") == 0
+
+    async def test_reconcile_needs_explicit_key(self):
+        """Test identical reconcile calls re-plan unless an explicit key is given."""
+        store = IdempotencyStore()
+        counter = iter(range(10))
+
+        async def reconcile():
+            return next(counter)
+
+        args = {"servers": [], "dry_run": True}
+        assert await store.run("reconcile_fleet", args, reconcile) == 0
+        assert await store.run("reconcile_fleet", args, reconcile) == 1
+        assert await store.run("reconcile_fleet", args, reconcile, "k1") == 2
+        assert await store.run("reconcile_fleet", args, reconcile, "k1") == 2
@@ -0,0 +1,110 @@
+"""
+Tests for the background job queue
+"""
+
+import asyncio
+
+import pytest
+from mcp.types import CallToolResult, TextContent
+from starlette.testclient import TestClient
+
+from src.letscloud_mcp_server import http_server
+from src.letscloud_mcp_server.admission import AdmissionController
+from src.letscloud_mcp_server.jobs import JobQueue, JobQueueFull
+from src.letscloud_mcp_server.progress import report_progress
+from src.letscloud_mcp_server.scheduler import BULK, FairScheduler
+
+
+def _result(text, is_error=False):
+    return CallToolResult(content=[TextContent(type="text", text=text)], isError=is_error)
+
+
+@pytest.mark.asyncio
+class TestJobQueue:
+    """Test cases for JobQueue."""
+
+    async def test_runs_jobs_and_records_progress(self):
+        """Test that jobs run on workers and keep progress and results."""
+        async def runner(name, arguments):
+            report_progress(1, 2, "halfway")
+            await asyncio.sleep(0)
+            if name == "broken":
+                return _result("Failed to do it", is_error=True)
+            return _result(f"{name}:{arguments['n']}")
+
+        queue = JobQueue(runner, workers=2)
+        ok = await queue.submit("list_servers", {"n": 1})
+        bad = await queue.submit("broken", {"n": 2})
+        assert ok.status == "queued"
+        await asyncio.sleep(0.05)
+
+        assert ok.describe(include_result=True)["result"] == ["list_servers:1"]
+        assert ok.status == "succeeded" and ok.progress["message"] == "halfway"
+        assert bad.status == "failed" and bad.error == "Failed to do it"
+        assert [job.id for job in queue.list("failed")] == [bad.id]
+        await queue.close()
+
+    async def test_cancel_and_backpressure(self):
+        """Test cancelling running/queued jobs and refusing when full."""
+        started = asyncio.Event()
+
+        async def runner(name, arguments):
+            started.set()
+            await asyncio.sleep(10)
+
+        queue = JobQueue(runner, workers=1, max_queued=1)
+        running = await queue.submit("slow", {})
+        await started.wait()
+        waiting = await queue.submit("slow", {})
+        with pytest.raises(JobQueueFull):
+            await queue.submit("slow", {})
+
+        assert queue.cancel(waiting.id).status == "cancelled"
+        queue.cancel(running.id)
+        await asyncio.sleep(0.01)
+        assert running.status == "cancelled" and running.error is None
+        assert queue.cancel("missing") is None
+        await queue.close()
+
+    async def test_result_retention(self):
+        """Test that finished jobs expire after the TTL."""
+        async def runner(name, arguments):
+            return _result("done")
+
+        queue = JobQueue(runner, result_ttl=0)
+        job = await queue.submit("list_plans", {})
+        await asyncio.sleep(0.01)
+        assert job.status == "succeeded"
+        job.finished_at -= 1
+        assert queue.get(job.id) is None
+        await queue.close()
+
+    async def test_jobs_pass_scheduler_and_admission(self, monkeypatch):
+        """Test HTTP-gated jobs run as bulk work of their tenant and are shed when busy."""
+        seen = []
+
+        class RecordingScheduler(FairScheduler):
+            async def run(self, tenant, connection, priority, call):
+                seen.append((tenant, priority, admission.in_flight))
+                return await super().run(tenant, connection, priority, call)
+
+        admission = AdmissionController()
+        monkeypatch.setattr(http_server, "admission", admission)
+        monkeypatch.setattr(http_server, "scheduler", RecordingScheduler())
+
+        async def runner(name, arguments):
+            return _result("done")
+
+        queue = JobQueue(runner)
+        queue.gate = http_server._gated_job
+        job = await queue.submit("list_plans", {}, tenant="t1")
+        await asyncio.sleep(0.01)
+        assert job.status == "succeeded" and seen == [("t1", BULK, 1)]
+        await queue.close()
+
+        monkeypatch.setenv("MCP_API_KEY", "secret")
+        admission.in_flight = admission.max_in_flight
+        response = TestClient(http_server.app).post(
+            "/jobs", json={"tool_name": "list_plans"}, headers={"Authorization": "Bearer secret"}
+        )
+        assert response.status_code == 503 and "retry-after" in response.headers
@@ -4,7 +4,7 @@ Tests for LetsCloud API Client
 
 import pytest
 import httpx
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
 
 
@@ -20,17 +20,15 @@ class TestLetsCloudClient:
     @pytest.fixture
     def mock_response(self):
         """Mock HTTP response."""
-        response = AsyncMock()
-        response.json.return_value = {"test": "data"}
-        response.content = b'{"test": "data"}'
-        response.raise_for_status.return_value = None
-        return response
+        return httpx.Response(
+            200, json={"test": "data"}, request=httpx.Request("GET", "https://api.test")
+        )
 
     async def test_init(self):
         """Test client initialization."""
         assert self.client.api_token == self.api_token
         assert self.client.base_url == "https://core.letscloud.io/api"
-        assert "Bearer test-token-123" in self.client.headers["Authorization"]
+        assert self.client.headers["api-token"] == self.api_token
 
     async def test_custom_base_url(self):
         """Test client initialization with custom base URL."""
@@ -61,7 +59,7 @@ class TestLetsCloudClient:
     async def test_list_servers(self, mock_request):
         """Test listing servers."""
         expected_servers = [{"id": 1, "name": "server1"}, {"id": 2, "name": "server2"}]
-        mock_request.return_value = expected_servers
+        mock_request.return_value = {"data": expected_servers}
         
         result = await self.client.list_servers()
         
@@ -73,7 +71,7 @@ class TestLetsCloudClient:
         """Test getting server details."""
         server_id = 123
         expected_server = {"id": server_id, "name": "test-server"}
-        mock_request.return_value = expected_server
+        mock_request.return_value = {"data": expected_server}
         
         result = await self.client.get_server(server_id)
         
@@ -90,7 +88,7 @@ class TestLetsCloudClient:
             "location_slug": "nyc1"
         }
         expected_response = {"id": 123, **server_data}
-        mock_request.return_value = expected_response
+        mock_request.return_value = {"data": expected_response}
         
         result = await self.client.create_server(server_data)
         
@@ -112,7 +110,7 @@ class TestLetsCloudClient:
     async def test_list_ssh_keys(self, mock_request):
         """Test listing SSH keys."""
         expected_keys = [{"id": 1, "title": "key1"}, {"id": 2, "title": "key2"}]
-        mock_request.return_value = expected_keys
+        mock_request.return_value = {"data": expected_keys}
         
         result = await self.client.list_ssh_keys()
         
@@ -124,7 +122,7 @@ class TestLetsCloudClient:
         """Test creating an SSH key."""
         key_data = {"title": "test-key", "key": "ssh-rsa AAAAB3..."}
         expected_response = {"id": 123, **key_data}
-        mock_request.return_value = expected_response
+        mock_request.return_value = {"data": expected_response}
         
         result = await self.client.create_ssh_key(key_data)
         
@@ -137,7 +135,7 @@ class TestLetsCloudClient:
         """Test listing snapshots."""
         server_id = 123
         expected_snapshots = [{"id": 1, "label": "snap1"}, {"id": 2, "label": "snap2"}]
-        mock_request.return_value = expected_snapshots
+        mock_request.return_value = {"data": expected_snapshots}
         
         result = await self.client.list_snapshots(server_id)
         
@@ -150,7 +148,7 @@ class TestLetsCloudClient:
         server_id = 123
         snapshot_data = {"label": "test-snapshot", "description": "Test snapshot"}
         expected_response = {"id": 456, **snapshot_data}
-        mock_request.return_value = expected_response
+        mock_request.return_value = {"data": expected_response}
         
         result = await self.client.create_snapshot(server_id, snapshot_data)
         
@@ -162,7 +160,7 @@ class TestLetsCloudClient:
     async def test_list_plans(self, mock_request):
         """Test listing plans."""
         expected_plans = [{"slug": "basic-1gb", "memory": 1024}, {"slug": "standard-2gb", "memory": 2048}]
-        mock_request.return_value = expected_plans
+        mock_request.return_value = {"data": expected_plans}
         
         result = await self.client.list_plans()
         
@@ -173,7 +171,7 @@ class TestLetsCloudClient:
     async def test_list_images(self, mock_request):
         """Test listing images."""
         expected_images = [{"slug": "ubuntu-22-04", "name": "Ubuntu 22.04"}, {"slug": "centos-8", "name": "CentOS 8"}]
-        mock_request.return_value = expected_images
+        mock_request.return_value = {"data": expected_images}
         
         result = await self.client.list_images()
         
@@ -184,7 +182,7 @@ class TestLetsCloudClient:
     async def test_list_locations(self, mock_request):
         """Test listing locations."""
         expected_locations = [{"slug": "nyc1", "name": "New York 1"}, {"slug": "fra1", "name": "Frankfurt 1"}]
-        mock_request.return_value = expected_locations
+        mock_request.return_value = {"data": expected_locations}
         
         result = await self.client.list_locations()
         
@@ -196,4 +194,31 @@ class TestLetsCloudClient:
         # This test ensures the client can be properly cleaned up
         client = LetsCloudClient("test-token")
         await client.close()
-        assert client._client is None 
\ No newline at end of file
+        assert client._client is None 
+
+@pytest.mark.asyncio
+class TestConditionalRequests:
+    """Test cases for ETag-based conditional GETs."""
+
+    async def test_not_modified_reuses_parsed_object(self):
+        """Test that a 304 returns the cached object and records bytes saved."""
+        from src.letscloud_mcp_server.metrics import metrics
+
+        body = b'{"data": [{"id": 1}]}'
+
+        def handler(request):
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=body, headers={"ETag": '"v1"'})
+
+        client = LetsCloudClient("test-token")
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        saved_before = metrics.get("upstream.bytes_saved")
+
+        first = await client.list_servers()
+        second = await client.list_servers()
+
+        assert first == [{"id": 1}]
+        assert second is first
+        assert metrics.get("upstream.bytes_saved") - saved_before == len(body)
+        await client.close()
@@ -0,0 +1,63 @@
+"""
+Tests for structured, sampled logging
+"""
+
+import json
+import logging
+
+from src.letscloud_mcp_server.logging_config import (
+    ContextFilter,
+    DeferredQueueHandler,
+    JsonFormatter,
+    SamplingFilter,
+    parse_levels,
+    request_context,
+)
+
+
+def _record(message="GET %s -> %d", args=("instances", 200), level=logging.INFO, **extra):
+    record = logging.LogRecord("letscloud", level, __file__, 1, message, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+class TestLoggingConfig:
+    """Test cases for the logging subsystem."""
+
+    def test_json_format_with_request_id(self):
+        """Test JSON lines carry the request id and extra fields."""
+        record = _record(duration_ms=12.5, sampled=True)
+        with request_context("req-1"):
+            ContextFilter().filter(record)
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry["message"] == "GET instances -> 200"
+        assert entry["request_id"] == "req-1"
+        assert entry["duration_ms"] == 12.5
+        assert "sampled" not in entry and "args" not in entry
+
+    def test_sampling(self):
+        """Test only sampled low-level records are dropped, per request."""
+        keep_none = SamplingFilter(rate=0.0)
+        assert keep_none.filter(_record(sampled=True)) is False
+        assert keep_none.filter(_record()) is True
+        assert keep_none.filter(_record(level=logging.ERROR, sampled=True)) is True
+
+        half = SamplingFilter(rate=0.5)
+        decisions = {half.filter(_record(sampled=True, request_id="r-42")) for _ in range(5)}
+        assert len(decisions) == 1
+        kept = sum(half.filter(_record(sampled=True, request_id=f"r-{i}")) for i in range(1000))
+        assert 350 < kept < 650
+
+    def test_deferred_formatting(self):
+        """Test primitive arguments stay unformatted until emitted."""
+        handler = DeferredQueueHandler(None)
+        lazy = handler.prepare(_record())
+        assert lazy.msg == "GET %s -> %d" and lazy.args == ("instances", 200)
+        eager = handler.prepare(_record("servers: %s", ([1, 2],)))
+        assert eager.msg == "servers: [1, 2]" and eager.args is None
+
+    def test_parse_levels(self):
+        """Test per-logger level parsing ignores bad entries."""
+        assert parse_levels("httpx=warning, a.b=DEBUG,bad=LOUD,=INFO") == {
+            "httpx": logging.WARNING, "a.b": logging.DEBUG}
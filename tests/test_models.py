@@ -0,0 +1,45 @@
+"""
+Tests for typed API models
+"""
+
+import json
+
+from src.letscloud_mcp_server.models import Instance, Plan, SshKey
+
+
+INSTANCE = {
+    "identifier": "abc123",
+    "label": "web-1",
+    "built": True,
+    "booted": False,
+    "memory": 2048,
+    "location": {"slug": "MIA1", "city": "Miami", "country": "US", "timezone": "EST"},
+    "ip_addresses": [{"address": "203.0.113.10", "version": 4}],
+    "os_name": "Ubuntu",
+}
+
+
+class TestModels:
+    """Test cases for model decoding and round-tripping."""
+
+    def test_instance_fields_and_helpers(self):
+        """Test nested decoding and derived properties."""
+        instance = Instance.from_api(INSTANCE)
+        assert instance.location.city == "Miami"
+        assert instance.primary_ip == "203.0.113.10"
+        assert instance.status == "stopped"
+        assert instance.key == "abc123"
+        assert instance.extra == {"os_name": "Ubuntu"}
+        assert not hasattr(instance, "__dict__")
+
+    def test_round_trip_keeps_unknown_fields(self):
+        """Test that to_dict reproduces the original payload."""
+        assert Instance.from_api(INSTANCE).to_dict() == INSTANCE
+
+    def test_decode_from_bytes(self):
+        """Test decoding response bodies with and without the data envelope."""
+        body = json.dumps({"data": [{"slug": "1vcpu-1gb", "locations": [{"slug": "MIA1"}]}]})
+        plans = Plan.decode(body.encode())
+        assert [location.slug for location in plans[0].locations] == ["MIA1"]
+        key = SshKey.decode(b'{"id": 7, "title": "laptop"}')
+        assert key.id == 7 and key.extra is None
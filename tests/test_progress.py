@@ -0,0 +1,55 @@
+"""
+Tests for progress reporting and streaming
+"""
+
+import asyncio
+
+import pytest
+from src.letscloud_mcp_server.progress import (
+    ProgressReporter,
+    emit_chunk,
+    report_progress,
+    sse_event,
+)
+
+
+@pytest.mark.asyncio
+class TestProgressReporter:
+    """Test cases for streamed tool progress."""
+
+    async def test_events_arrive_before_result(self):
+        """Test that progress and chunks are yielded as they happen."""
+
+        async def work():
+            report_progress(1, 2, "half way")
+            emit_chunk("partial")
+            await asyncio.sleep(0)
+            report_progress(2, 2)
+            return "done"
+
+        events = [event async for event in ProgressReporter("tok").run(work)]
+
+        assert events[0]["params"] == {"progressToken": "tok", "progress": 1, "total": 2,
+                                       "message": "half way"}
+        assert events[1]["params"]["text"] == "partial"
+        assert events[2]["params"]["progress"] == 2
+        assert events[-1] == {"result": "done"}
+
+    async def test_errors_are_reported_as_final_event(self):
+        """Test that a failing call ends the stream with an error event."""
+
+        async def work():
+            raise ValueError("boom")
+
+        events = [event async for event in ProgressReporter().run(work)]
+        assert events == [{"error": {"code": -32603, "message": "boom"}}]
+
+    async def test_reporting_without_listener_is_noop(self):
+        """Test that handlers can report progress outside streaming calls."""
+        report_progress(1)
+        emit_chunk("ignored")
+
+    async def test_sse_event_format(self):
+        """Test server-sent event framing."""
+        frame = sse_event({"jsonrpc": "2.0", "result": {"ok": True}})
+        assert frame == 'event: result\ndata: {"jsonrpc":"2.0","result":{"ok":true}}\n\n'
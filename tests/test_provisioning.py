@@ -0,0 +1,75 @@
+"""
+Tests for bulk server provisioning
+"""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from src.letscloud_mcp_server import server
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+from src.letscloud_mcp_server.provisioning import (
+    build_labels,
+    create_batch,
+    wait_until_built,
+)
+
+
+@pytest.mark.asyncio
+class TestProvisioning:
+    """Test cases for create_servers building blocks."""
+
+    def setup_method(self):
+        """Set up a client and a server template."""
+        self.client = LetsCloudClient("test-token")
+        self.template = {"plan_slug": "1vcpu-1gb", "image_slug": "ubuntu-22.04-x86_64",
+                         "location_slug": "MIA1", "ssh_keys": [7]}
+
+    async def test_build_labels(self):
+        """Test label generation from count or explicit labels."""
+        assert build_labels({"count": 3, "label_prefix": "worker"}) == [
+            "worker-1", "worker-2", "worker-3"]
+        assert build_labels({"labels": ["a", "b"]}) == ["a", "b"]
+        with pytest.raises(ValueError):
+            build_labels({"labels": ["a", "a"]})
+        with pytest.raises(ValueError):
+            build_labels({})
+        for count in (0, -2):
+            with pytest.raises(ValueError, match="at least 1"):
+                build_labels({"count": count})
+
+    async def test_create_and_wait(self):
+        """Test parallel creation and batch build polling."""
+        async def create(data):
+            if data["label"] == "w-2":
+                raise RuntimeError("quota exceeded")
+            return {"identifier": f"id-{data['label']}"}
+
+        self.client.create_server = AsyncMock(side_effect=create)
+        report = await create_batch(self.client, self.template, ["w-1", "w-2", "w-3"])
+        assert [item["status"] for item in report] == ["created", "failed", "created"]
+        assert self.client.create_server.await_args_list[0].args[0] == {
+            **self.template, "label": "w-1"}
+
+        self.client.list_servers = AsyncMock(side_effect=[
+            [{"identifier": "id-w-1", "built": True}, {"identifier": "id-w-3", "built": False}],
+            [{"identifier": "id-w-1", "built": True}, {"identifier": "id-w-3", "built": True}],
+        ])
+        assert await wait_until_built(self.client, report, timeout=5, interval=0) is True
+        assert report[0]["built"] and report[2]["built"]
+        assert self.client.list_servers.await_count == 2
+
+    async def test_wait_failure_keeps_report(self, monkeypatch):
+        """Test a polling error after creation still returns the creation report."""
+        monkeypatch.setattr(server, "validate_server_request", AsyncMock(return_value=[]))
+        self.client.create_server = AsyncMock(return_value={"identifier": "id-1"})
+        self.client.list_servers = AsyncMock(side_effect=RuntimeError("api down"))
+
+        result = await server._handle_create_servers(
+            self.client, {**self.template, "labels": ["w-1"], "wait": True})
+
+        summary = json.loads(result.content[0].text)
+        assert not result.isError
+        assert summary["created"] == 1 and summary["all_built"] is False
+        assert summary["wait_error"] == "api down"
+        assert summary["servers"][0]["id"] == "id-1"
@@ -0,0 +1,102 @@
+"""
+Tests for declarative fleet reconciliation
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+from src.letscloud_mcp_server.reconcile import apply_plan, build_plan
+
+
+INVENTORY = [
+    {"identifier": "web-a", "label": "web-1", "booted": False, "built": True,
+     "plan": {"slug": "1vcpu-1gb"}},
+    {"identifier": "web-b", "label": "web-2", "booted": True, "built": True},
+    {"identifier": "db-a", "label": "db-1", "booted": True, "built": True},
+    {"identifier": "old-a", "label": "web-9", "booted": True, "built": True},
+]
+
+TEMPLATE = {"plan_slug": "1vcpu-1gb", "image_slug": "ubuntu-22.04-x86_64", "location_slug": "MIA1"}
+
+
+class TestBuildPlan:
+    """Test cases for diffing desired state against the inventory."""
+
+    def test_plan_actions(self):
+        """Test creates, power changes, drift and scoped pruning."""
+        spec = [
+            {"label": "web-1", **TEMPLATE, "plan_slug": "2vcpu-2gb"},
+            {"label": "web-2", "power": "off"},
+            {"label": "web-3", **TEMPLATE, "power": "off"},
+        ]
+        plan = build_plan(spec, INVENTORY, prune=True, label_prefix="web-")
+        actions = {action.id: action for action in plan.actions}
+
+        assert set(actions) == {
+            "start:web-1", "shutdown:web-2", "create:web-3", "shutdown:web-3", "delete:old-a"}
+        assert actions["start:web-1"].server_id == "web-a"
+        assert actions["shutdown:web-3"].depends_on == ["create:web-3"]
+        assert actions["create:web-3"].params == TEMPLATE
+        assert plan.drift[0]["label"] == "web-1"
+        # db-1 is outside the prune scope
+        assert "delete:db-a" not in actions
+
+    def test_unchanged_and_invalid_spec(self):
+        """Test no-op servers and malformed specs."""
+        plan = build_plan([{"label": "db-1"}], INVENTORY)
+        assert plan.actions == [] and plan.unchanged == ["db-1"]
+        with pytest.raises(ValueError):
+            build_plan([{"label": "a"}, {"label": "a"}], INVENTORY)
+        with pytest.raises(ValueError):
+            build_plan([{"label": "a", "power": "sleep"}], INVENTORY)
+
+    def test_prune_guards(self):
+        """Test an empty spec cannot prune the whole account by accident."""
+        with pytest.raises(ValueError, match="confirm_delete_all"):
+            build_plan([], INVENTORY, prune=True)
+        plan = build_plan([], INVENTORY, prune=True, confirm_delete_all=True)
+        assert len(plan.actions) == len(INVENTORY)
+        with pytest.raises(ValueError, match="limit of 2"):
+            build_plan([], INVENTORY, prune=True, confirm_delete_all=True, delete_limit=2)
+
+    def test_ssh_key_drift(self):
+        """Test differing SSH keys on existing servers are reported as drift."""
+        inventory = [{"identifier": "k-a", "label": "k-1", "booted": True,
+                      "ssh_keys": [{"id": 1}]}]
+        plan = build_plan([{"label": "k-1", "ssh_keys": [1, 2]}], inventory)
+        assert plan.actions == [] and "ssh keys" in plan.drift[0]["issue"]
+        assert build_plan([{"label": "k-1", "ssh_keys": [1]}], inventory).drift == []
+
+
+class TestApplyPlan:
+    """Test cases for executing a plan as a DAG."""
+
+    @pytest.mark.asyncio
+    async def test_dependencies_and_failures(self, monkeypatch):
+        """Test that dependents wait for, and are skipped after, failed actions."""
+        monkeypatch.setenv("LETSCLOUD_RECONCILE_RATE", "0")
+        monkeypatch.setenv("LETSCLOUD_POLL_INTERVAL", "0")
+        client = LetsCloudClient("test-token")
+
+        async def create(data):
+            if data["label"] == "web-4":
+                raise RuntimeError("quota exceeded")
+            return {"identifier": f"new-{data['label']}"}
+
+        client.create_server = AsyncMock(side_effect=create)
+        client.shutdown_server = AsyncMock(return_value={})
+        client.delete_server = AsyncMock(return_value={})
+        client.list_servers = AsyncMock(return_value=[{"identifier": "new-web-3", "built": True}])
+
+        spec = [{"label": "web-3", **TEMPLATE, "power": "off"},
+                {"label": "web-4", **TEMPLATE, "power": "off"}]
+        plan = build_plan(spec, INVENTORY, prune=True, label_prefix="web-9")
+        results = {item["id"]: item for item in await apply_plan(client, plan)}
+
+        assert results["create:web-3"]["server_id"] == "new-web-3"
+        assert results["shutdown:web-3"]["status"] == "done"
+        client.shutdown_server.assert_awaited_once_with("new-web-3")
+        assert results["create:web-4"]["status"] == "failed"
+        assert results["shutdown:web-4"]["status"] == "skipped"
+        client.delete_server.assert_awaited_once_with("old-a")
@@ -0,0 +1,81 @@
+"""
+Tests for the record/replay transport
+"""
+
+import gzip
+
+import httpx
+import pytest
+
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+from src.letscloud_mcp_server.metrics import metrics
+from src.letscloud_mcp_server.replay import (
+    RecordingTransport,
+    ReplayMissError,
+    ReplayTransport,
+    load_recording,
+)
+
+
+def _api(request):
+    if request.url.path.endswith("/profile"):
+        return httpx.Response(200, json={"data": {"name": "Ana"}}, headers={"ETag": '"p1"'})
+    return httpx.Response(200, json={"data": [{"identifier": "abc", "label": "web-1"}]})
+
+
+@pytest.mark.asyncio
+class TestReplay:
+    """Test cases for recording and replaying API traffic."""
+
+    async def test_record_then_replay(self, tmp_path):
+        """Test recorded exchanges are served offline in order."""
+        path = str(tmp_path / "traffic.jsonl.gz")
+        recorder = RecordingTransport(path, httpx.MockTransport(_api))
+        client = LetsCloudClient("secret-token", transport=recorder)
+        assert (await client.get_account_info())["name"] == "Ana"
+        servers = await client.list_servers()
+        await client.close()
+
+        entries = load_recording(path)
+        assert [entry["target"] for entry in entries] == ["/api/profile", "/api/instances"]
+        assert entries[0]["headers"]["etag"] == '"p1"'
+        assert "secret-token" not in repr(entries)
+
+        replay = ReplayTransport(entries, latency_scale=0)
+        offline = LetsCloudClient("other-token", transport=replay)
+        assert await offline.list_servers() == servers
+        assert await offline.list_servers() == servers
+        assert (await offline.get_account_info())["name"] == "Ana"
+        assert [step[1:] for step in replay.schedule()] == [
+            ("GET", "/api/profile"), ("GET", "/api/instances")]
+
+    async def test_miss_and_latency(self):
+        """Test unknown requests fail and latency injection is applied."""
+        entry = {"t": 0, "method": "GET", "target": "/api/plans", "status": 200,
+                 "latency": 5.0, "body": '{"data": []}'}
+        client = LetsCloudClient(
+            "token", transport=ReplayTransport([entry], latency_scale=0, extra_latency=0.01)
+        )
+        assert await client.list_plans() == []
+        with pytest.raises(ReplayMissError):
+            await client.get_server(1)
+
+    async def test_recording_keeps_upstream_encoding(self, tmp_path):
+        """Test compression metrics still see the wire encoding while recording."""
+        body = b'{"data": [{"identifier": "abc", "label": "web-1"}]}' * 20
+
+        def gzipped(request):
+            return httpx.Response(
+                200, content=gzip.compress(body), headers={"Content-Encoding": "gzip"})
+
+        metrics.reset()
+        path = str(tmp_path / "traffic.jsonl")
+        client = LetsCloudClient(
+            "token", transport=RecordingTransport(path, httpx.MockTransport(gzipped)))
+        response = await client._send("GET", "instances")
+        await client.close()
+
+        assert response.content == body
+        assert metrics.get("upstream.compressed_responses") == 1
+        assert metrics.get("upstream.wire_bytes") == len(gzip.compress(body))
+        assert load_recording(path)[0]["body"] == body.decode()
@@ -0,0 +1,127 @@
+"""
+Tests for fair scheduling of tool calls
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from src.letscloud_mcp_server.http_server import _http_connection, _websocket_tenant
+from src.letscloud_mcp_server.scheduler import (
+    BULK,
+    READ,
+    WRITE,
+    FairScheduler,
+    classify,
+    parse_weights,
+    tenant_id,
+)
+
+
+class TestClassification:
+    """Test cases for priority classes and configuration parsing."""
+
+    def test_classify(self):
+        """Test reads, mutations and bulk tools."""
+        assert classify("list_servers") == READ
+        assert classify("get_server") == READ
+        assert classify("delete_server") == WRITE
+        assert classify("list_all_snapshots") == BULK
+        assert classify("reconcile_fleet") == BULK
+
+    def test_parse_weights(self):
+        """Test tenant weight parsing ignores bad entries."""
+        assert parse_weights("a=2, b=0.5,c=x") == {"a": 2.0, "b": 0.5}
+        assert parse_weights(None) == {}
+
+
+@pytest.mark.asyncio
+class TestFairScheduler:
+    """Test cases for FairScheduler."""
+
+    async def _admission_order(self, scheduler, requests):
+        """Block the scheduler, queue requests, then record admission order."""
+        order = []
+        gate = asyncio.Event()
+
+        async def blocker():
+            async with scheduler.slot("blocker"):
+                await gate.wait()
+
+        async def request(name, tenant, priority):
+            async with scheduler.slot(tenant, priority=priority):
+                order.append(name)
+                await asyncio.sleep(0)
+
+        holder = asyncio.ensure_future(blocker())
+        await asyncio.sleep(0)
+        tasks = []
+        for name, tenant, priority in requests:
+            tasks.append(asyncio.ensure_future(request(name, tenant, priority)))
+            await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(holder, *tasks)
+        return order
+
+    async def test_priority_then_fairness(self):
+        """Test reads beat bulk work and tenants alternate within a class."""
+        scheduler = FairScheduler(max_in_flight=1)
+        order = await self._admission_order(scheduler, [
+            ("bulk", "c", BULK),
+            ("a1", "a", READ), ("a2", "a", READ), ("a3", "a", READ),
+            ("b1", "b", READ),
+        ])
+        assert order[:3] == ["a1", "b1", "a2"]
+        assert order[-1] == "bulk"
+        assert scheduler.in_flight == 0 and scheduler.queued == 0
+
+    async def test_tenant_limit_and_cancellation(self):
+        """Test per-tenant quotas and that cancelled waiters free their place."""
+        scheduler = FairScheduler(max_in_flight=4, tenant_limit=1)
+        gate = asyncio.Event()
+
+        async def hold(tenant):
+            async with scheduler.slot(tenant):
+                await gate.wait()
+
+        first = asyncio.ensure_future(hold("a"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(hold("a"))
+        other = asyncio.ensure_future(hold("b"))
+        await asyncio.sleep(0)
+        assert scheduler.in_flight == 2 and scheduler.queued == 1
+
+        second.cancel()
+        await asyncio.sleep(0)
+        assert scheduler.queued == 0
+        gate.set()
+        await asyncio.gather(first, other)
+        assert scheduler.in_flight == 0
+
+
+class TestTransportIdentity:
+    """Test cases for how the HTTP server names tenants and connections."""
+
+    def test_websocket_tenant_matches_http(self, monkeypatch):
+        """Test one key is one tenant on both transports and bad keys are refused."""
+        monkeypatch.setenv("MCP_API_KEY", "secret")
+
+        class FakeSocket:
+            def __init__(self, headers):
+                self.headers = headers
+                self.client = None
+
+        assert _websocket_tenant(FakeSocket({"authorization": "Bearer secret"})) == \
+            tenant_id("secret")
+        for header in ("Bearer forged", "Basic secret"):
+            with pytest.raises(HTTPException):
+                _websocket_tenant(FakeSocket({"authorization": header}))
+
+    def test_http_connections_include_port(self):
+        """Test requests through one proxy host are separate connections."""
+        def request(port):
+            return Request({"type": "http", "client": ("10.0.0.1", port), "headers": []})
+
+        assert _http_connection(request(1000)) != _http_connection(request(1001))
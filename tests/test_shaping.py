@@ -0,0 +1,77 @@
+"""
+Tests for response shaping
+"""
+
+import json
+
+import pytest
+from src.letscloud_mcp_server.shaping import (
+    CursorError,
+    decode_cursor,
+    encode_cursor,
+    project_fields,
+    shape_result,
+)
+
+
+class TestShaping:
+    """Test cases for output profiles and truncation."""
+
+    def test_project_fields_nested_and_lists(self):
+        """Test dotted whitelists over nested dicts and lists."""
+        item = {
+            "identifier": "abc",
+            "secret": "x",
+            "location": {"slug": "mia1", "city": "Miami", "extra": 1},
+            "ip_addresses": [{"address": "1.2.3.4", "gateway": "1.2.3.1"}],
+        }
+        shaped = project_fields(item, ["identifier", "location.slug", "ip_addresses.address"])
+        assert shaped == {
+            "identifier": "abc",
+            "location": {"slug": "mia1"},
+            "ip_addresses": [{"address": "1.2.3.4"}],
+        }
+
+    def test_project_fields_falls_back_when_nothing_matches(self):
+        """Test that unknown schemas are passed through untouched."""
+        item = {"unexpected": 1}
+        assert project_fields(item, ["slug"]) == item
+
+    def test_full_profile_matches_legacy_output(self):
+        """Test that the full profile keeps the pretty-printed payload."""
+        data = {"name": "Jane", "email": "jane@example.com", "phone": "123"}
+        text = shape_result("get_account_info", data, {"output_profile": "full"})
+        assert text == json.dumps(data, indent=2)
+
+    def test_summary_profile_is_compact(self):
+        """Test that summary drops fields and whitespace."""
+        plans = [{"slug": "p1", "core": 1, "memory": 1024, "notes": "long text"}]
+        text = shape_result("list_plans", plans, {"output_profile": "summary"})
+        assert text == '[{"slug":"p1","core":1,"memory":1024}]'
+
+    def test_truncation_and_cursor_roundtrip(self, monkeypatch):
+        """Test that oversized lists are paged with continuation cursors."""
+        monkeypatch.setenv("LETSCLOUD_MAX_RESULT_CHARS", "120")
+        monkeypatch.setenv("LETSCLOUD_MAX_RESULT_TOKENS", "0")
+        images = [{"slug": f"image-{i}", "distro": "ubuntu"} for i in range(10)]
+
+        seen = []
+        args = {"output_profile": "summary"}
+        while True:
+            page = json.loads(shape_result("list_images", images, args))
+            seen.extend(item["slug"] for item in page["items"])
+            assert page["total"] == 10
+            if page["next_cursor"] is None:
+                break
+            args = {"output_profile": "summary", "cursor": page["next_cursor"]}
+
+        assert seen == [image["slug"] for image in images]
+
+    def test_cursor_is_bound_to_tool(self):
+        """Test that cursors from another tool are rejected."""
+        cursor = encode_cursor("list_plans", 5)
+        assert decode_cursor("list_plans", cursor) == 5
+        with pytest.raises(CursorError):
+            decode_cursor("list_images", cursor)
+        with pytest.raises(CursorError):
+            decode_cursor("list_images", "not-a-cursor")
@@ -0,0 +1,99 @@
+"""
+Tests for the sidecar cache daemon
+"""
+
+import asyncio
+import os
+
+import httpx
+import pytest
+
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+from src.letscloud_mcp_server.sidecar import CacheDaemon, SidecarClient
+
+
+class _Upstream:
+    """Stand-in for the daemon's LetsCloudClient."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def _make_request(self, method, endpoint, params=None):
+        self.calls.append(endpoint)
+        await asyncio.sleep(0.05)
+        if endpoint == "instances/404":
+            request = httpx.Request("GET", "https://api/instances/404")
+            httpx.Response(404, request=request).raise_for_status()
+        return {"data": [{"identifier": "abc"}]}
+
+    async def close(self):
+        pass
+
+
+@pytest.mark.asyncio
+class TestSidecar:
+    """Test cases for shared caching through the daemon."""
+
+    async def test_processes_share_one_upstream_call(self, tmp_path):
+        """Test concurrent clients coalesce, then hit the cache, then see invalidation."""
+        upstream = _Upstream()
+        daemon = CacheDaemon(lambda token: upstream, ttl=60, rate=0)
+        path = str(tmp_path / "s.sock")
+        server = await daemon.serve(path)
+        try:
+            clients = [LetsCloudClient("token", sidecar=SidecarClient(path)) for _ in range(10)]
+            results = await asyncio.gather(*(client.list_servers() for client in clients))
+            assert all(result == [{"identifier": "abc"}] for result in results)
+            await clients[0].list_servers()
+            assert upstream.calls == ["instances"]
+
+            with pytest.raises(httpx.HTTPStatusError) as error:
+                await clients[0]._make_request("GET", "instances/404")
+            assert error.value.response.status_code == 404
+
+            await SidecarClient(path).invalidate("token", "instances")
+            await clients[1].list_servers()
+            assert upstream.calls.count("instances") == 2
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def test_falls_back_without_daemon(self, tmp_path):
+        """Test requests go direct when the socket is missing."""
+        sidecar = SidecarClient(str(tmp_path / "missing.sock"))
+        client = LetsCloudClient("token", sidecar=sidecar)
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"data": [{"identifier": "direct"}]})
+        ))
+        assert await client.list_servers() == [{"identifier": "direct"}]
+        assert not sidecar.available
+
+    async def test_oversized_reply_falls_back(self, tmp_path, monkeypatch):
+        """Test a reply over the message limit makes the client go direct."""
+        monkeypatch.setenv("LETSCLOUD_SIDECAR_MAX_MESSAGE", "1024")
+        upstream = _Upstream()
+        upstream_data = {"data": [{"identifier": str(i)} for i in range(200)]}
+        upstream._make_request = lambda *args, **kwargs: asyncio.sleep(0, upstream_data)
+        path = str(tmp_path / "s.sock")
+        server = await CacheDaemon(lambda token: upstream, rate=0).serve(path)
+        try:
+            client = LetsCloudClient("token", sidecar=SidecarClient(path))
+            client._client = httpx.AsyncClient(transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json={"data": [{"identifier": "direct"}]})
+            ))
+            assert await client.list_servers() == [{"identifier": "direct"}]
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def test_ignores_socket_open_to_other_users(self, tmp_path):
+        """Test tokens are never sent to a socket other users can reach."""
+        path = str(tmp_path / "s.sock")
+        server = await CacheDaemon(lambda token: _Upstream(), rate=0).serve(path)
+        try:
+            assert SidecarClient(path).available
+            os.chmod(path, 0o666)
+            assert not SidecarClient(path).available
+        finally:
+            server.close()
+            await server.wait_closed()
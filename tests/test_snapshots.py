@@ -0,0 +1,122 @@
+"""
+Tests for fleet-wide snapshot aggregation
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+from src.letscloud_mcp_server.snapshots import (
+    collect_fleet_snapshots,
+    delete_snapshots,
+    filter_rows,
+    plan_retention,
+    sort_rows,
+    to_table,
+)
+
+
+def _days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@pytest.mark.asyncio
+class TestFleetSnapshots:
+    """Test cases for list_all_snapshots building blocks."""
+
+    def setup_method(self):
+        """Set up a client with two servers and mocked API calls."""
+        self.client = LetsCloudClient("test-token")
+        self.client.list_servers = AsyncMock(return_value=[
+            {"identifier": "a", "label": "web"},
+            {"identifier": "b", "label": "db"},
+        ])
+        self.responses = {
+            "instances/a/snapshots": {"data": [{"id": 1, "label": "nightly", "size": 10,
+                                                "created_at": _days_ago(40)}]},
+            "instances/b/snapshots": {"data": [{"id": 2, "label": "manual", "size": 30,
+                                                "created_at": _days_ago(2)}]},
+        }
+        self.client._make_request = AsyncMock(side_effect=lambda method, endpoint, **kw:
+                                              self.responses[endpoint if method == "GET"
+                                                             else f"{method} {endpoint}"])
+
+    async def test_collects_filters_and_sorts(self):
+        """Test merging per-server snapshots into one table."""
+        rows, errors = await collect_fleet_snapshots(self.client)
+        assert errors == {}
+        assert [row["snapshot_id"] for row in sort_rows(rows, "size")] == [2, 1]
+        old = filter_rows(rows, older_than_days=30)
+        assert [(row["server_label"], row["label"]) for row in old] == [("web", "nightly")]
+        table = to_table(old)
+        assert table["rows"][0][:4] == ["a", "web", 1, "nightly"]
+
+    async def test_per_server_cache_and_invalidation(self):
+        """Test that cached lists are reused until a snapshot is created."""
+        await collect_fleet_snapshots(self.client)
+        await collect_fleet_snapshots(self.client)
+        assert self.client._make_request.await_count == 2
+
+        self.responses["POST instances/a/snapshots"] = {"data": {"id": 3}}
+        await self.client.create_snapshot("a", {"label": "new"})
+        await collect_fleet_snapshots(self.client)
+        assert self.client._make_request.await_count == 4
+
+    async def test_failures_are_reported_per_server(self):
+        """Test that one failing server does not hide the others."""
+        del self.responses["instances/b/snapshots"]
+        rows, errors = await collect_fleet_snapshots(self.client, refresh=True)
+        assert [row["server_id"] for row in rows] == ["a"]
+        assert list(errors) == ["b"]
+
+
+def _row(server_id, snapshot_id, created_at):
+    return {"server_id": server_id, "server_label": server_id, "snapshot_id": snapshot_id,
+            "label": f"snap-{snapshot_id}", "size": 1, "created_at": created_at, "age_days": None}
+
+
+class TestSnapshotRetention:
+    """Test cases for the retention policy engine."""
+
+    def test_keep_last_is_per_server(self):
+        """Test that keep_last applies to each server separately."""
+        rows = [_row("a", i, f"2024-01-0{i} 00:00:00") for i in range(1, 5)]
+        rows += [_row("b", 9, "2024-01-01 00:00:00")]
+        keep, delete = plan_retention(rows, keep_last=2)
+        assert sorted(row["snapshot_id"] for row in keep) == [3, 4, 9]
+        assert sorted(row["snapshot_id"] for row in delete) == [1, 2]
+
+    def test_daily_and_weekly_buckets(self):
+        """Test that daily/weekly rules keep the newest snapshot per period."""
+        rows = [
+            _row("a", 1, "2024-01-08 20:00:00"),  # Monday, week 2
+            _row("a", 2, "2024-01-08 08:00:00"),
+            _row("a", 3, "2024-01-07 08:00:00"),  # Sunday, week 1
+            _row("a", 4, "2024-01-01 08:00:00"),  # Monday, week 1
+            _row("a", 5, "2023-12-25 08:00:00"),  # week 52
+            _row("a", 6, None),
+        ]
+        keep, delete = plan_retention(rows, keep_daily=2, keep_weekly=3)
+        assert sorted(row["snapshot_id"] for row in keep) == [1, 3, 5, 6]
+        assert sorted(row["snapshot_id"] for row in delete) == [2, 4]
+
+    def test_requires_a_keep_rule(self):
+        """Test that an empty policy never deletes everything."""
+        with pytest.raises(ValueError):
+            plan_retention([_row("a", 1, "2024-01-01 00:00:00")])
+
+    @pytest.mark.asyncio
+    async def test_delete_reports_each_item(self, monkeypatch):
+        """Test that deletions run and report per-item status."""
+        monkeypatch.setenv("LETSCLOUD_DELETE_RATE", "0")
+        client = LetsCloudClient("test-token")
+
+        async def delete(server_id, snapshot_id):
+            if snapshot_id == 2:
+                raise RuntimeError("locked")
+
+        client.delete_snapshot = AsyncMock(side_effect=delete)
+        report = await delete_snapshots(client, [_row("a", 1, None), _row("a", 2, None)])
+        assert [item["status"] for item in report] == ["deleted", "failed"]
+        assert report[1]["error"] == "locked"
@@ -0,0 +1,69 @@
+"""
+Tests for adaptive per-endpoint timeouts
+"""
+
+import httpx
+import pytest
+
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+from src.letscloud_mcp_server.timeouts import (
+    LatencyHistogram,
+    TimeoutPolicy,
+    endpoint_class,
+    parse_limits,
+)
+
+
+class TestTimeouts:
+    """Test cases for TimeoutPolicy."""
+
+    def test_endpoint_classes(self):
+        """Test requests are grouped by cost."""
+        assert endpoint_class("GET", "profile") == "catalog"
+        assert endpoint_class("GET", "instances/abc") == "read"
+        assert endpoint_class("POST", "instances") == "slow"
+        assert endpoint_class("POST", "instances/1/snapshots/2/restore") == "slow"
+        assert endpoint_class("DELETE", "instances/1") == "write"
+
+    def test_histogram_quantiles(self):
+        """Test quantiles land in the right buckets."""
+        histogram = LatencyHistogram()
+        for _ in range(99):
+            histogram.record(0.1)
+        histogram.record(5.0)
+        assert 0.1 <= histogram.quantile(0.5) < 0.13
+        assert 5.0 <= histogram.quantile(1.0) < 6.1
+        assert LatencyHistogram().quantile(0.99) is None
+
+    def test_adapts_within_limits(self):
+        """Test the timeout follows p99 but stays between floor and ceiling."""
+        policy = TimeoutPolicy(multiplier=3, min_samples=20)
+        assert policy.timeout_for("GET", "plans") == 10.0
+        for _ in range(50):
+            policy.observe("GET", "plans", 0.05)
+        assert policy.timeout_for("GET", "plans") == 1.0
+        for _ in range(50):
+            policy.observe("GET", "instances", 1.5)
+        assert 4.5 <= policy.timeout_for("GET", "instances") <= 6.0
+        assert policy.timeout_for("POST", "instances") == 300.0
+
+    def test_parse_limits(self):
+        """Test config overrides and bad entries."""
+        assert parse_limits("catalog=0.5:5, read=15,slow=9:1,bogus=1,write=x") == {
+            "catalog": (0.5, 5.0), "read": (15.0, 15.0)}
+
+    @pytest.mark.asyncio
+    async def test_client_uses_policy(self):
+        """Test the client sends the class timeout and records latency."""
+        seen = []
+
+        def handler(request):
+            seen.append(request.extensions["timeout"]["read"])
+            return httpx.Response(200, json={"data": {}})
+
+        client = LetsCloudClient("token")
+        client.timeouts = TimeoutPolicy(limits={"catalog": (0.5, 2.0)})
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        await client.get_account_info()
+        assert seen == [2.0]
+        assert client.timeouts.histogram("catalog").count == 1
@@ -0,0 +1,75 @@
+"""
+Tests for pre-flight create_server validation
+"""
+
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from src.letscloud_mcp_server.letscloud_client import LetsCloudClient
+from src.letscloud_mcp_server.validation import get_catalog_index, validate_server_request
+
+
+@pytest.mark.asyncio
+class TestValidation:
+    """Test cases for catalog-backed validation."""
+
+    def setup_method(self):
+        """Set up a client with a mocked catalog."""
+        self.plans = [{"slug": "1vcpu-1gb", "locations": [{"slug": "MIA1"}]},
+                      {"slug": "2vcpu-4gb"}]
+        self.client = LetsCloudClient("test-token")
+        self.client.list_plans = AsyncMock(return_value=self.plans)
+        self.client.list_images = AsyncMock(return_value=[{"slug": "ubuntu-22.04-x86_64"}])
+        self.client.list_locations = AsyncMock(return_value=[{"slug": "MIA1"}, {"slug": "SAO1"}])
+        self.client.list_ssh_keys = AsyncMock(return_value=[{"id": 7}])
+        self.args = {"label": "web", "plan_slug": "1vcpu-1gb",
+                     "image_slug": "ubuntu-22.04-x86_64", "location_slug": "MIA1"}
+
+    async def test_valid_request(self):
+        """Test that a valid request passes without fetching SSH keys."""
+        assert await validate_server_request(self.client, self.args) == []
+        self.client.list_ssh_keys.assert_not_awaited()
+
+    async def test_typos_get_suggestions(self):
+        """Test did-you-mean suggestions for close and case-only typos."""
+        problems = await validate_server_request(
+            self.client, {**self.args, "plan_slug": "1vcpu-1g", "location_slug": "mia1"})
+        assert problems == [
+            "Unknown plan_slug '1vcpu-1g'. Did you mean: 1vcpu-1gb, 2vcpu-4gb?",
+            "Unknown location_slug 'mia1'. Did you mean: MIA1?",
+        ]
+
+    async def test_plan_location_and_ssh_keys(self):
+        """Test plan availability per location and SSH key existence."""
+        problems = await validate_server_request(
+            self.client, {**self.args, "location_slug": "SAO1"})
+        assert problems == ["Plan '1vcpu-1gb' is not available in 'SAO1'. Available in: MIA1"]
+        problems = await validate_server_request(self.client, {**self.args, "ssh_keys": [7, 8]})
+        assert problems == ["Unknown ssh_keys: 8. Available: 7"]
+
+    async def test_index_reused_until_catalog_changes(self):
+        """Test that indexes are rebuilt only for new catalog data."""
+        first = await get_catalog_index(self.client)
+        assert await get_catalog_index(self.client) is first
+        self.client.list_plans.return_value = list(self.plans)
+        assert await get_catalog_index(self.client) is not first
+
+    async def test_catalog_outage_fails_open(self):
+        """Test that validation is skipped when the catalog is unreachable."""
+        self.client.list_plans.side_effect = httpx.ConnectError("down")
+        assert await validate_server_request(self.client, {**self.args, "plan_slug": "x"}) == []
+
+    async def test_ssh_keys_cached_and_fail_open(self):
+        """Test SSH key IDs are reused, refetched for new keys, and outages pass."""
+        args = {**self.args, "ssh_keys": [7]}
+        assert await validate_server_request(self.client, args) == []
+        assert await validate_server_request(self.client, args) == []
+        assert self.client.list_ssh_keys.await_count == 1
+
+        self.client.list_ssh_keys.return_value = [{"id": 7}, {"id": 9}]
+        assert await validate_server_request(self.client, {**args, "ssh_keys": [9]}) == []
+        assert self.client.list_ssh_keys.await_count == 2
+
+        self.client.list_ssh_keys.side_effect = httpx.ConnectError("down")
+        assert await validate_server_request(self.client, {**args, "ssh_keys": [10]}) == []